@@ -0,0 +1,88 @@
+import argparse
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+from revision import git_commit
+from world import World
+
+
+def gen0_collections():
+    return gc.get_stats()[0]["collections"]
+
+
+def measure(boid_count, steps, seed):
+    # 建立 boids 時保留的記憶體 (tracemalloc 只追蹤 Python 物件的配置)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    world = World(boid_count, engine="objects", use_spatial_grid=True, seed=seed)
+    retained = tracemalloc.get_traced_memory()[0] - before
+
+    # 每一步的暫時配置: 峰值減去步驟開始時的用量
+    peaks = []
+    for _ in range(steps):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        world.step()
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    # 計時與 GC 次數另外量，避免 tracemalloc 本身的開銷
+    samples = []
+    collections = gen0_collections()
+    for _ in range(steps):
+        start = time.perf_counter()
+        world.step()
+        samples.append(time.perf_counter() - start)
+    collections = gen0_collections() - collections
+    return {
+        "boids": boid_count,
+        "steps": steps,
+        "bytes_per_boid": retained / boid_count,
+        "transient_peak_kb": statistics.median(peaks) / 1024,
+        "gen0_collections_per_step": collections / steps,
+        "step_ms": statistics.median(samples) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure memory use and GC pressure of the object engine."
+    )
+    parser.add_argument("--counts", type=int, nargs="+", default=[5000])
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_memory.json")
+    args = parser.parse_args()
+
+    results = []
+    print(
+        f"{'boids':>6} {'B/boid':>8} {'peak KB/step':>13}"
+        f" {'gen0 GC/step':>13} {'ms/step':>10}"
+    )
+    for count in args.counts:
+        result = measure(count, args.steps, args.seed)
+        results.append(result)
+        print(
+            f"{count:>6} {result['bytes_per_boid']:>8.0f}"
+            f" {result['transient_peak_kb']:>13.1f}"
+            f" {result['gen0_collections_per_step']:>13.1f}"
+            f" {result['step_ms']:>10.2f}"
+        )
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import random
+import time
+
+from simulation import Boid
+
+
+# --- 分開三個方法 vs. 單一迴圈 的每幀成本 ---
+def separate_forces(boids):
+    return [(b.separation(boids), b.alignment(boids), b.cohesion(boids)) for b in boids]
+
+
+def fused_forces(boids):
+    return [b.flock_forces(boids) for b in boids]
+
+
+def time_per_frame(function, boids, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(boids)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare separation/alignment/cohesion with the fused loop."
+    )
+    parser.add_argument("--counts", type=int, nargs="+", default=[75, 300, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'boids':>6} {'separate ms':>12} {'fused ms':>10} {'speedup':>8}")
+    for count in args.counts:
+        random.seed(args.seed)
+        boids = [Boid() for _ in range(count)]
+        if separate_forces(boids) != fused_forces(boids):
+            raise SystemExit("fused loop does not match the separate methods")
+        separate = time_per_frame(separate_forces, boids, args.repeat)
+        fused = time_per_frame(fused_forces, boids, args.repeat)
+        print(
+            f"{count:>6} {separate * 1000:>12.2f} {fused * 1000:>10.2f}"
+            f" {separate / fused:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import dataclasses
+import json
+import platform
+import random
+import statistics
+import time
+
+import numpy as np
+
+from headless import run_headless
+from numpy_flock import NumpyFlock
+from revision import git_commit
+from simulation import (
+    DEFAULT_CONFIG,
+    MAX_SPEED,
+    NEIGHBOR_MODES,
+    SAMPLE_CANDIDATE_FACTOR,
+    Boid,
+    SpatialGrid,
+)
+from world import World
+
+# 密集群體中各 boid 飛行方向的標準差 (弧度)
+HEADING_SPREAD = 0.5
+
+
+def dense_state(boid_count, area, seed):
+    # 所有 boids 擠在 area x area 的正方形裡，大致朝同一個方向飛 (例如被捕食者追趕時)
+    rng = np.random.default_rng(seed)
+    config = DEFAULT_CONFIG
+    center = np.array([config.world_width, config.world_height]) / 2
+    positions = center + rng.uniform(-area / 2, area / 2, (boid_count, 2))
+    headings = rng.uniform(0, 2 * np.pi) + rng.normal(0, HEADING_SPREAD, boid_count)
+    velocities = MAX_SPEED * np.column_stack([np.cos(headings), np.sin(headings)])
+    return positions, velocities
+
+
+def combine(separation, alignment, cohesion, config):
+    # 三種規則加權後的加速度 (與 step 中的權重相同)
+    return (
+        separation * config.separation_factor
+        + alignment * config.alignment_factor
+        + cohesion * config.cohesion_factor
+    )
+
+
+def numpy_forces(positions, velocities, config, seed):
+    flock = NumpyFlock(positions, velocities, config)
+    flock.rng = np.random.default_rng(seed)
+    return combine(*flock.flock_forces(), config)
+
+
+def object_forces(positions, velocities, config, seed):
+    # 與 Boid.steer 相同的鄰居查詢與挑選，只取三種規則的力道
+    boids = [
+        Boid.from_state(position, velocity, config)
+        for position, velocity in zip(positions.tolist(), velocities.tolist())
+    ]
+    grid = SpatialGrid(config.visual_range + MAX_SPEED)
+    grid.rebuild(boids)
+    rng = random.Random(seed)
+    forces = []
+    for boid in boids:
+        if config.neighbor_mode == "sample":
+            budget = config.neighbor_limit * SAMPLE_CANDIDATE_FACTOR
+            neighbors = grid.sample_neighbors(boid, budget, rng)
+        else:
+            neighbors = grid.query(boid.position)
+        if config.neighbor_mode != "metric":
+            neighbors = boid.select_neighbors(neighbors, rng)
+        separation, alignment, cohesion = boid.flock_forces(neighbors)
+        force = combine(separation, alignment, cohesion, config)
+        forces.append((force.x, force.y))
+    return np.array(forces).reshape(-1, 2)
+
+
+def deviation(forces, reference):
+    # 與 metric 模式的差距: 平均差距 / 平均大小，以及方向差超過 45 度的比例
+    error = np.hypot(*(forces - reference).T)
+    magnitude = np.hypot(*reference.T)
+    dot = np.einsum("ij,ij->i", forces, reference)
+    norms = np.hypot(*forces.T) * magnitude
+    cosine = np.divide(dot, norms, out=np.ones_like(dot), where=norms > 0)
+    return {
+        "relative_error": float(error.mean() / magnitude.mean()),
+        "p95_relative_error": float(np.percentile(error, 95) / magnitude.mean()),
+        "turned_over_45": float(np.mean(cosine < np.cos(np.pi / 4))),
+    }
+
+
+def time_step(engine, positions, velocities, config, steps, seed):
+    samples = []
+    for _ in range(steps):
+        world = World(0, engine=engine, config=config, seed=seed, synchronous=True)
+        world.set_boids(positions, velocities)
+        start = time.perf_counter()
+        world.step()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the topological and sampled neighbor modes with the "
+        "full metric radius in a dense flock."
+    )
+    parser.add_argument("--boids", type=int, default=1500)
+    parser.add_argument("--area", type=float, default=200, help="side of the square")
+    parser.add_argument("--limits", type=int, nargs="+", default=[7, 15])
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=["objects", "numpy"],
+        choices=["objects", "numpy"],
+    )
+    parser.add_argument("--steps", type=int, default=3)
+    parser.add_argument(
+        "--run-steps",
+        type=int,
+        default=300,
+        help="length of the headless runs compared by flock metrics (0 to skip)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_neighbor_modes.json")
+    args = parser.parse_args()
+
+    positions, velocities = dense_state(args.boids, args.area, args.seed)
+    force_functions = {"objects": object_forces, "numpy": numpy_forces}
+    results = []
+    print(
+        f"{'engine':>8} {'mode':>12} {'k':>4} {'step ms':>9}"
+        f" {'rel err':>8} {'p95 err':>8} {'>45 deg':>8} {'polar':>6}"
+    )
+    for engine in args.engines:
+        forces = force_functions[engine]
+        reference = forces(positions, velocities, DEFAULT_CONFIG, args.seed)
+        runs = [("metric", None)] + [
+            (mode, limit)
+            for mode in NEIGHBOR_MODES
+            if mode != "metric"
+            for limit in args.limits
+        ]
+        for mode, limit in runs:
+            config = dataclasses.replace(
+                DEFAULT_CONFIG,
+                neighbor_mode=mode,
+                neighbor_limit=limit or DEFAULT_CONFIG.neighbor_limit,
+            )
+            step_time = time_step(
+                engine, positions, velocities, config, args.steps, args.seed
+            )
+            result = {
+                "engine": engine,
+                "mode": mode,
+                "limit": limit,
+                "boids": args.boids,
+                "area": args.area,
+                "step_ms": step_time * 1000,
+                **deviation(
+                    forces(positions, velocities, config, args.seed), reference
+                ),
+            }
+            if args.run_steps and engine == "numpy":
+                # 整體行為的差距: 同一個種子跑一段時間後的群體統計
+                run = run_headless(
+                    args.boids,
+                    args.run_steps,
+                    seed=args.seed,
+                    engine=engine,
+                    config=config,
+                    include_state=False,
+                )
+                result["polarization"] = run["polarization"]
+                result["mean_nearest_neighbor_distance"] = run[
+                    "mean_nearest_neighbor_distance"
+                ]
+            results.append(result)
+            print(
+                f"{engine:>8} {mode:>12} {limit or '-':>4} {step_time * 1000:>9.2f}"
+                f" {result['relative_error']:>8.3f}"
+                f" {result['p95_relative_error']:>8.3f}"
+                f" {result['turned_over_45']:>8.3f}"
+                f" {result.get('polarization', float('nan')):>6.3f}"
+            )
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import json
+import platform
+import statistics
+import time
+
+import numpy as np
+
+from revision import git_commit
+from simulation import OBSTACLE_DETECTION_BUFFER, OBSTACLE_RADIUS, ObstacleField
+from world import World
+
+
+def add_wall(world, count):
+    # 橫跨世界中央、間隔一個半徑的障礙物牆 (大部分 boids 都在好幾個障礙物的範圍內)
+    config = world.config
+    spacing = OBSTACLE_RADIUS
+    columns = max(1, int(config.world_width // spacing))
+    for index in range(count):
+        row, column = divmod(index, columns)
+        world.obstacles.add(
+            (
+                (column + 0.5) * spacing,
+                config.world_height / 2 + (row - 1) * spacing,
+            )
+        )
+
+
+def time_steps(world, steps):
+    samples = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        world.step()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def field_error(world, samples, seed):
+    # 在障礙物附近隨機取點，比較網格內插與逐一計算的力道
+    obstacles = world.obstacles
+    field = obstacles.field
+    centers, _ = obstacles.arrays()
+    rng = np.random.default_rng(seed)
+    picked = centers[rng.integers(len(centers), size=samples)]
+    points = picked + rng.uniform(
+        -OBSTACLE_RADIUS - OBSTACLE_DETECTION_BUFFER,
+        OBSTACLE_RADIUS + OBSTACLE_DETECTION_BUFFER,
+        size=(samples, 2),
+    )
+    approx = field.sample_many(points)
+    field.close()
+    exact = world.flock.obstacle_forces(obstacles, points)
+    ObstacleField(obstacles, (world.config.world_width, world.config.world_height))
+    error = np.hypot(*(approx - exact).T)
+    magnitude = np.hypot(*exact.T)
+    return {
+        "mean_error": float(error.mean()),
+        "max_error": float(error.max()),
+        "mean_force": float(magnitude.mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time obstacle avoidance with the precomputed field "
+        "against the per-obstacle computation."
+    )
+    parser.add_argument("--boids", type=int, default=2000)
+    parser.add_argument("--obstacles", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=["objects", "numpy"],
+        choices=["objects", "numpy"],
+    )
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_obstacle_field.json")
+    args = parser.parse_args()
+
+    results = []
+    print(
+        f"{'engine':>8} {'obstacles':>10} {'exact ms':>9} {'field ms':>9}"
+        f" {'build ms':>9} {'mean err':>9} {'max err':>8}"
+    )
+    for engine in args.engines:
+        for obstacle_count in args.obstacles:
+            timings = {}
+            for enabled in (False, True):
+                world = World(
+                    args.boids, engine=engine, use_spatial_grid=True, seed=args.seed
+                )
+                add_wall(world, obstacle_count)
+                start = time.perf_counter()
+                world.set_obstacle_field(enabled)
+                build = time.perf_counter() - start
+                timings[enabled] = time_steps(world, args.steps)
+            # 誤差只與障礙物有關，用 NumPy 引擎的陣列版本計算
+            probe = World(0, engine="numpy", obstacle_field=True)
+            add_wall(probe, obstacle_count)
+            error = field_error(probe, 2000, args.seed)
+            results.append(
+                {
+                    "engine": engine,
+                    "boids": args.boids,
+                    "obstacles": obstacle_count,
+                    "steps": args.steps,
+                    "exact_ms": timings[False] * 1000,
+                    "field_ms": timings[True] * 1000,
+                    "build_ms": build * 1000,
+                    **error,
+                }
+            )
+            print(
+                f"{engine:>8} {obstacle_count:>10}"
+                f" {timings[False] * 1000:>9.2f} {timings[True] * 1000:>9.2f}"
+                f" {build * 1000:>9.2f} {error['mean_error']:>9.4f}"
+                f" {error['max_error']:>8.3f}"
+            )
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
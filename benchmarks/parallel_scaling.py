@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import time
+
+from numpy_flock import NumpyFlock
+from parallel_flock import ShardedFlock
+from revision import git_commit
+from simulation import SCREEN_HEIGHT, SCREEN_WIDTH, Boid, ObstacleStore
+
+
+def time_steps(flock, obstacles, steps):
+    samples = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        flock.step([], obstacles)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the sharded flock step with 1..N worker threads."
+    )
+    parser.add_argument("--counts", type=int, nargs="+", default=[2000, 10000])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=list(range(1, (os.cpu_count() or 1) + 1)),
+    )
+    parser.add_argument("--obstacles", type=int, default=0)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_parallel.json")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'boids':>6} {'workers':>8} {'ms/step':>10} {'speedup':>8}")
+    for count in args.counts:
+        random.seed(args.seed)
+        boids = [Boid() for _ in range(count)]
+        obstacles = ObstacleStore()
+        obstacles.add_many(
+            (random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT))
+            for _ in range(args.obstacles)
+        )
+
+        # 單執行緒的 NumPy 引擎作為參考
+        baseline = time_steps(NumpyFlock.from_boids(boids), obstacles, args.steps)
+        print(f"{count:>6} {'numpy':>8} {baseline * 1000:>10.2f} {'-':>8}")
+        single = None
+        for workers in args.workers:
+            flock = ShardedFlock.from_boids(boids, workers=workers)
+            elapsed = time_steps(flock, obstacles, args.steps)
+            flock.close()
+            if single is None:
+                single = elapsed
+            results.append(
+                {
+                    "boids": count,
+                    "workers": workers,
+                    "obstacles": args.obstacles,
+                    "steps": args.steps,
+                    "step_ms": elapsed * 1000,
+                    "numpy_step_ms": baseline * 1000,
+                    "speedup": single / elapsed,
+                }
+            )
+            print(
+                f"{count:>6} {workers:>8} {elapsed * 1000:>10.2f}"
+                f" {single / elapsed:>7.2f}x"
+            )
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+
+# 不開真正的視窗，在沒有螢幕的機器上也能執行
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from main import draw_world
+from revision import git_commit
+from simulation import (
+    ENGINES,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    SIMULATION_ENGINE,
+)
+from sprites import ObstacleLayer
+from ui import FONT_SIZE, UIPanel
+from world import World
+
+DEFAULT_SIZES = [75, 300, 1000, 5000, 20000]
+PHASES = ["physics", "draw_entities", "draw_ui", "flip"]
+
+
+def build_world(boid_count, obstacle_count, predator_count, engine, seed):
+    world = World(boid_count, engine=engine, seed=seed)
+    rng = world.rng
+    # 不吃 boids，讓每一幀的數量固定
+    world.set_predators(predator_count, False)
+    world.obstacles.add_many(
+        (rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT))
+        for _ in range(obstacle_count)
+    )
+    return world
+
+
+def time_phases(screen, ui_panel, world, steps):
+    # 分別量測每一幀的物理、實體繪製、UI 繪製與 display.flip
+    samples = {phase: [] for phase in PHASES}
+    obstacle_layer = ObstacleLayer(world.obstacles)
+    for _ in range(steps):
+        start = time.perf_counter()
+        world.step()
+        physics = time.perf_counter()
+        draw_world(screen, world, obstacle_layer)
+        entities = time.perf_counter()
+        ui_panel.draw(
+            screen,
+            (0, 0),
+            ui_visible=True,
+            predator_active=bool(world.predators),
+            predator_can_eat=False,
+            mouse_mode="add_obstacle",
+            continuous_obstacle_placement=False,
+            input_text="10",
+            input_active=False,
+        )
+        ui = time.perf_counter()
+        pygame.display.flip()
+        flip = time.perf_counter()
+
+        samples["physics"].append(physics - start)
+        samples["draw_entities"].append(entities - physics)
+        samples["draw_ui"].append(ui - entities)
+        samples["flip"].append(flip - ui)
+        pygame.event.pump()
+    return {
+        f"{phase}_ms": statistics.median(values) * 1000
+        for phase, values in samples.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time physics, entity drawing, UI drawing and display flip."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--obstacles", type=int, default=0)
+    parser.add_argument("--predators", type=int, default=0)
+    parser.add_argument("--steps", type=int, default=5, help="frames per size")
+    parser.add_argument("--engine", choices=ENGINES, default=SIMULATION_ENGINE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_phases.json")
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    ui_panel = UIPanel(pygame.font.Font(None, FONT_SIZE))
+
+    results = []
+    print(f"{'boids':>6} " + " ".join(f"{phase + ' ms':>16}" for phase in PHASES))
+    for size in args.sizes:
+        world = build_world(
+            size, args.obstacles, args.predators, args.engine, args.seed
+        )
+        timings = time_phases(screen, ui_panel, world, args.steps)
+        world.close()
+        results.append(
+            {
+                "boids": size,
+                "obstacles": args.obstacles,
+                "predators": args.predators,
+                "engine": args.engine,
+                "steps": args.steps,
+                **timings,
+            }
+        )
+        print(
+            f"{size:>6} "
+            + " ".join(f"{timings[phase + '_ms']:>16.2f}" for phase in PHASES)
+        )
+
+    pygame.quit()
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
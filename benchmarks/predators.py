@@ -0,0 +1,93 @@
+import argparse
+import json
+import platform
+import statistics
+import time
+
+import numpy as np
+import pygame
+
+from revision import git_commit
+from simulation import PreyIndex, hunt_prey
+from world import World
+
+
+def scan_predators(predators, positions, obstacles, eat_distance, dt=1.0):
+    # 對照組: 每個捕食者各掃描一次所有 boids (找最近的與吃得到的)
+    eaten = np.zeros(len(positions), dtype=bool)
+    for predator in predators:
+        diff = positions - (predator.position.x, predator.position.y)
+        closest = int(np.argmin(np.einsum("ij,ij->i", diff, diff)))
+        predator.hunt(pygame.math.Vector2(*positions[closest]), obstacles, dt)
+        diff = positions - (predator.position.x, predator.position.y)
+        eaten |= np.einsum("ij,ij->i", diff, diff) < eat_distance**2
+    return np.flatnonzero(eaten)
+
+
+def time_predators(world, steps, shared_index):
+    positions = world.flock.positions
+    config = world.config
+    samples = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        if shared_index:
+            hunt_prey(world.predators, PreyIndex(positions), world.obstacles)
+        else:
+            scan_predators(
+                world.predators,
+                positions,
+                world.obstacles,
+                config.predator_eat_distance,
+            )
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the predator update with a shared prey index "
+        "against one full scan per predator."
+    )
+    parser.add_argument("--boids", type=int, nargs="+", default=[10000])
+    parser.add_argument("--predators", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_predators.json")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'boids':>6} {'predators':>10} {'scan ms':>9} {'index ms':>9}")
+    for boid_count in args.boids:
+        for predator_count in args.predators:
+            # 兩種方法都從同一個狀態開始 (boids 不動，只比較捕食者的更新)
+            timings = {}
+            for shared_index in (False, True):
+                world = World(boid_count, engine="numpy", seed=args.seed)
+                world.set_predators(predator_count, True)
+                timings[shared_index] = time_predators(world, args.steps, shared_index)
+            results.append(
+                {
+                    "boids": boid_count,
+                    "predators": predator_count,
+                    "steps": args.steps,
+                    "scan_ms": timings[False] * 1000,
+                    "index_ms": timings[True] * 1000,
+                }
+            )
+            print(
+                f"{boid_count:>6} {predator_count:>10}"
+                f" {timings[False] * 1000:>9.2f} {timings[True] * 1000:>9.2f}"
+            )
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
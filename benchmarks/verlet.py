@@ -0,0 +1,99 @@
+import argparse
+import json
+import platform
+import time
+
+from revision import git_commit
+from verlet import VERLET_SKIN, VerletList, VerletPairs
+from world import World
+
+
+def time_run(boid_count, engine, steps, seed, skin):
+    # skin 為 None 時使用每一步重建的空間網格 (NumPy 引擎則是每一步重新配對)
+    world = World(boid_count, engine=engine, use_spatial_grid=True, seed=seed)
+    if skin is not None:
+        verlet = VerletList if world.flock is None else VerletPairs
+        world.verlet = verlet(world.config.visual_range, skin)
+        if world.flock is not None:
+            world.flock.verlet = world.verlet
+    # 先跑幾步讓群體成形 (不計時)
+    for _ in range(10):
+        world.step()
+    rebuilds = world.verlet.rebuilds if world.verlet is not None else 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        world.step()
+    elapsed = time.perf_counter() - start
+    if world.verlet is not None:
+        rebuilds = world.verlet.rebuilds - rebuilds
+    return elapsed / steps, rebuilds
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time Verlet neighbor lists against rebuilding the neighbor "
+        "search every step, and count how often the lists are rebuilt."
+    )
+    parser.add_argument("--counts", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=["objects", "numpy"],
+        choices=["objects", "numpy"],
+    )
+    parser.add_argument("--skins", type=float, nargs="+", default=[15, VERLET_SKIN, 50])
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_verlet.json")
+    args = parser.parse_args()
+
+    results = []
+    print(
+        f"{'engine':>8} {'boids':>6} {'skin':>6} {'ms/step':>9}"
+        f" {'rebuilds':>9} {'speedup':>8}"
+    )
+    for engine in args.engines:
+        for count in args.counts:
+            baseline, _ = time_run(count, engine, args.steps, args.seed, None)
+            print(f"{engine:>8} {count:>6} {'-':>6} {baseline * 1000:>9.2f}")
+            results.append(
+                {
+                    "engine": engine,
+                    "boids": count,
+                    "skin": None,
+                    "steps": args.steps,
+                    "step_ms": baseline * 1000,
+                }
+            )
+            for skin in args.skins:
+                step_time, rebuilds = time_run(
+                    count, engine, args.steps, args.seed, skin
+                )
+                results.append(
+                    {
+                        "engine": engine,
+                        "boids": count,
+                        "skin": skin,
+                        "steps": args.steps,
+                        "step_ms": step_time * 1000,
+                        "rebuilds": rebuilds,
+                        "speedup": baseline / step_time,
+                    }
+                )
+                print(
+                    f"{engine:>8} {count:>6} {skin:>6g} {step_time * 1000:>9.2f}"
+                    f" {rebuilds:>4}/{args.steps:<4} {baseline / step_time:>8.2f}"
+                )
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
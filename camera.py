@@ -0,0 +1,136 @@
+import numpy as np
+import pygame
+
+from simulation import SCREEN_HEIGHT, SCREEN_WIDTH, WORLD_HEIGHT, WORLD_WIDTH
+
+# 滑鼠滾輪依序切換的縮放倍率
+ZOOM_LEVELS = (0.125, 0.25, 0.5, 1.0, 2.0, 4.0)
+# 縮放倍率小於這個值時，boids 只畫成一個像素 (直接寫進畫面的像素陣列)
+PIXEL_LOD_ZOOM = 0.5
+# 方向鍵平移的速度 (每秒幾個畫面像素)
+PAN_SPEED = 800
+
+
+# --- 攝影機 ---
+class Camera:
+    # 世界座標與畫面座標的轉換: 畫面座標 = (世界座標 - 左上角) * zoom。
+    # 檢視範圍比世界大時置中，否則限制在世界範圍內。
+    def __init__(
+        self,
+        world_size=(WORLD_WIDTH, WORLD_HEIGHT),
+        screen_size=(SCREEN_WIDTH, SCREEN_HEIGHT),
+        zoom=1.0,
+    ):
+        self.world_width, self.world_height = world_size
+        self.screen_width, self.screen_height = screen_size
+        self.zoom = zoom
+        # 畫面左上角的世界座標
+        self.x = 0.0
+        self.y = 0.0
+        self.clamp()
+
+    @property
+    def identity(self):
+        # 與沒有攝影機時相同 (世界座標就是畫面座標)
+        return self.zoom == 1.0 and self.x == 0.0 and self.y == 0.0
+
+    @property
+    def pixel_lod(self):
+        return self.zoom < PIXEL_LOD_ZOOM
+
+    def view(self, margin=0.0):
+        # 畫面看得到的世界範圍 (x0, y0, x1, y1)，四周多留 margin
+        return (
+            self.x - margin,
+            self.y - margin,
+            self.x + self.screen_width / self.zoom + margin,
+            self.y + self.screen_height / self.zoom + margin,
+        )
+
+    def visible(self, point, margin=0.0):
+        x0, y0, x1, y1 = self.view(margin)
+        return x0 <= point[0] <= x1 and y0 <= point[1] <= y1
+
+    def visible_mask(self, positions, margin=0.0):
+        x0, y0, x1, y1 = self.view(margin)
+        x = positions[:, 0]
+        y = positions[:, 1]
+        return (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+
+    def to_screen(self, point):
+        return pygame.math.Vector2(
+            (point[0] - self.x) * self.zoom, (point[1] - self.y) * self.zoom
+        )
+
+    def to_screen_array(self, positions):
+        return (positions - (self.x, self.y)) * self.zoom
+
+    def to_world(self, point):
+        return pygame.math.Vector2(
+            point[0] / self.zoom + self.x, point[1] / self.zoom + self.y
+        )
+
+    def clamp(self):
+        for axis, world, screen in (
+            ("x", self.world_width, self.screen_width),
+            ("y", self.world_height, self.screen_height),
+        ):
+            extent = screen / self.zoom
+            if extent >= world:
+                setattr(self, axis, (world - extent) / 2)
+            else:
+                setattr(self, axis, min(max(getattr(self, axis), 0.0), world - extent))
+
+    def pan(self, dx, dy):
+        # 以畫面像素為單位移動
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+        self.clamp()
+
+    def zoom_at(self, steps, screen_point):
+        # 切換到前後第 steps 個縮放倍率，滑鼠下的世界座標保持不動
+        levels = ZOOM_LEVELS
+        current = min(range(len(levels)), key=lambda i: abs(levels[i] - self.zoom))
+        zoom = levels[min(max(current + steps, 0), len(levels) - 1)]
+        anchor = self.to_world(screen_point)
+        self.zoom = zoom
+        self.x = anchor.x - screen_point[0] / zoom
+        self.y = anchor.y - screen_point[1] / zoom
+        self.clamp()
+
+    def reset(self):
+        self.zoom = 1.0
+        self.x = 0.0
+        self.y = 0.0
+        self.clamp()
+
+    def handle_event(self, event):
+        # 滾輪縮放、按住中鍵拖曳平移，回傳是否處理了這個事件
+        if event.type == pygame.MOUSEWHEEL:
+            self.zoom_at(event.y, pygame.mouse.get_pos())
+            return True
+        if event.type == pygame.MOUSEMOTION and event.buttons[1]:
+            self.pan(-event.rel[0], -event.rel[1])
+            return True
+        return False
+
+    def follow_keys(self, pressed, seconds):
+        # 按住方向鍵時持續平移
+        distance = PAN_SPEED * seconds
+        dx = (pressed[pygame.K_RIGHT] - pressed[pygame.K_LEFT]) * distance
+        dy = (pressed[pygame.K_DOWN] - pressed[pygame.K_UP]) * distance
+        if dx or dy:
+            self.pan(dx, dy)
+
+
+def pixel_points(camera, positions):
+    # 畫面內的點轉成整數像素座標 (給像素 LOD 使用)
+    points = camera.to_screen_array(positions[camera.visible_mask(positions)])
+    points = points.astype(np.intp)
+    inside = (
+        (points[:, 0] >= 0)
+        & (points[:, 0] < camera.screen_width)
+        & (points[:, 1] >= 0)
+        & (points[:, 1] < camera.screen_height)
+    )
+    return points[inside]
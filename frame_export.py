@@ -0,0 +1,175 @@
+import os
+import queue
+import threading
+
+import numpy as np
+import pygame
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow 只有匯出 GIF 時才需要
+    Image = None
+
+GIF_EXPORT_AVAILABLE = Image is not None
+
+# 等待編碼的幀數上限，佇列滿時 capture() 才會等待
+EXPORT_QUEUE_SIZE = 16
+# 等待佇列時每隔多久確認一次編碼執行緒還在運作 (秒)
+EXPORT_POLL_SECONDS = 0.1
+# 匯出的每秒幀數 (GIF 每一幀的顯示時間)
+EXPORT_FPS = 60
+# GIF 最多的幀數。Pillow 寫出 GIF 前會把所有幀留在記憶體中
+# (量化後每個像素 1 byte，1280x720 約 0.9 MB)，超過後的幀會被捨棄
+GIF_MAX_FRAMES = 300
+# 圖片序列的格式: png 檔案最小；tga (RLE 壓縮) 的編碼快好幾倍，適合離線大量匯出
+EXPORT_IMAGE_FORMATS = ("png", "tga", "bmp")
+EXPORT_IMAGE_FORMAT = "png"
+
+
+# --- 畫面匯出 ---
+class FrameExporter:
+    # capture() 只把 surface 的像素記憶體原樣複製到預先配置的陣列 (不轉換格式)，
+    # 編碼交給背景執行緒。路徑以 .gif 結尾時寫成動畫 (需要 Pillow)，
+    # 否則在該目錄下寫出 frame_000000.png (或 image_format 指定的格式) 序列。
+    # 陣列最多 queue_size + 1 個，全部都在等待編碼時 capture() 才會等待。
+    # GIF 最多 max_frames 幀，之後的 capture() 不擷取，只計入 dropped
+    def __init__(
+        self,
+        path,
+        fps=EXPORT_FPS,
+        queue_size=EXPORT_QUEUE_SIZE,
+        image_format=EXPORT_IMAGE_FORMAT,
+        max_frames=GIF_MAX_FRAMES,
+    ):
+        if image_format not in EXPORT_IMAGE_FORMATS:
+            raise ValueError(f"unsupported image format {image_format!r}")
+        self.path = path
+        self.image_format = image_format
+        self.gif = path.lower().endswith(".gif")
+        if self.gif and Image is None:
+            raise RuntimeError("exporting a GIF requires Pillow (pip install pillow)")
+        if not self.gif:
+            os.makedirs(path, exist_ok=True)
+        self.fps = fps
+        self.max_frames = max_frames if self.gif else None
+        self.dropped = 0
+        self.pending = queue.Queue(maxsize=queue_size)
+        self.free = queue.Queue()
+        self.capacity = queue_size + 1
+        self.allocated = 0
+        # 與第一幀相同格式的 surface，編碼時把陣列寫回這裡
+        self.template = None
+        self.count = 0
+        self.gif_frames = []
+        self.error = None
+        self.thread = threading.Thread(target=self.encode_loop, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def take_buffer(self):
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            pass
+        if self.allocated < self.capacity:
+            self.allocated += 1
+            size = self.template.get_pitch() * self.template.get_height()
+            return np.empty(size, np.uint8)
+        return self.wait(self.free.get)
+
+    def check(self):
+        # 編碼失敗或執行緒意外結束時在主執行緒拋出，而不是一直等待佇列
+        if self.error is not None:
+            raise self.error
+        if not self.thread.is_alive():
+            raise RuntimeError("the frame encoder thread has stopped")
+
+    def wait(self, operation):
+        # 以 timeout 反覆呼叫佇列的 get / put，每次之間確認編碼執行緒的狀態
+        while True:
+            self.check()
+            try:
+                return operation(timeout=EXPORT_POLL_SECONDS)
+            except (queue.Empty, queue.Full):
+                pass
+
+    def capture(self, surface):
+        # 回傳這一幀是否被擷取 (GIF 已達 max_frames 時為 False)
+        self.check()
+        if self.max_frames is not None and self.count >= self.max_frames:
+            self.dropped += 1
+            return False
+        if self.template is None:
+            self.template = pygame.Surface(surface.get_size(), 0, surface)
+        elif surface.get_size() != self.template.get_size():
+            raise ValueError(
+                f"frame size {surface.get_size()} differs from "
+                f"{self.template.get_size()}"
+            )
+        buffer = self.take_buffer()
+        # 直接讀取 surface 的像素記憶體 (複製期間 surface 會被鎖住)
+        view = surface.get_view("0")
+        np.copyto(buffer, np.frombuffer(view, np.uint8))
+        del view
+        item = (self.count, buffer)
+        self.wait(lambda timeout: self.pending.put(item, timeout=timeout))
+        self.count += 1
+        return True
+
+    def encode_loop(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            index, buffer = item
+            if self.error is None:
+                try:
+                    self.encode(index, buffer)
+                except Exception as e:  # noqa: BLE001 -- 交給主執行緒拋出
+                    # 在主執行緒下一次 capture() 或 close() 時拋出；
+                    # 之後的幀不再編碼，但仍然歸還緩衝區，capture() 不會卡住
+                    self.error = e
+            self.free.put(buffer)
+
+    def encode(self, index, buffer):
+        view = self.template.get_view("0")
+        memoryview(view)[:] = buffer
+        del view
+        if self.gif:
+            image = Image.frombytes(
+                "RGB",
+                self.template.get_size(),
+                pygame.image.tobytes(self.template, "RGB"),
+            )
+            self.gif_frames.append(image.quantize())
+        else:
+            pygame.image.save(
+                self.template,
+                os.path.join(self.path, f"frame_{index:06d}.{self.image_format}"),
+            )
+
+    def close(self):
+        # 等待所有幀編碼完成，回傳匯出的幀數
+        while self.thread.is_alive():
+            try:
+                self.pending.put(None, timeout=EXPORT_POLL_SECONDS)
+            except queue.Full:
+                continue
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+        if self.gif and self.gif_frames:
+            self.gif_frames[0].save(
+                self.path,
+                save_all=True,
+                append_images=self.gif_frames[1:],
+                duration=round(1000 / self.fps),
+                loop=0,
+            )
+            self.gif_frames = []
+        return self.count
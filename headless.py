@@ -0,0 +1,143 @@
+import json
+import time
+
+import numpy as np
+
+from profiling import PROFILER
+from simulation import (
+    BOID_COUNT,
+    DEFAULT_CONFIG,
+    SIMULATION_ENGINE,
+    SYNCHRONOUS_UPDATE,
+    USE_OBSTACLE_FIELD,
+    USE_VERLET_LIST,
+)
+from trajectory import TrajectoryRecorder
+from world import World
+
+
+# --- 群體統計 ---
+def mean_nearest_neighbor_distance(positions, chunk_size=1024):
+    # 分批計算距離矩陣，避免 boids 很多時一次佔用太多記憶體
+    count = len(positions)
+    if count < 2:
+        return float("nan")
+    nearest = np.empty(count)
+    for start in range(0, count, chunk_size):
+        chunk = positions[start : start + chunk_size]
+        diff = chunk[:, None, :] - positions[None, :, :]
+        dist_sq = np.einsum("ijk,ijk->ij", diff, diff)
+        rows = np.arange(len(chunk))
+        dist_sq[rows, start + rows] = np.inf
+        nearest[start : start + len(chunk)] = np.sqrt(dist_sq.min(axis=1))
+    return float(nearest.mean())
+
+
+def polarization(velocities):
+    # 所有速度方向的平均向量長度: 1 表示完全同向，0 表示方向雜亂
+    if len(velocities) == 0:
+        return float("nan")
+    speed = np.linalg.norm(velocities, axis=1)
+    moving = speed > 0
+    headings = velocities[moving] / speed[moving, None]
+    return float(np.linalg.norm(headings.mean(axis=0)))
+
+
+def flock_metrics(world):
+    positions, velocities = world.arrays()
+    return {
+        "mean_nearest_neighbor_distance": mean_nearest_neighbor_distance(positions),
+        "polarization": polarization(velocities),
+        "survivors": world.boid_count(),
+    }
+
+
+# --- 無畫面模式 ---
+def run_headless(
+    boid_count=BOID_COUNT,
+    steps=1000,
+    seed=None,
+    output=None,
+    engine=SIMULATION_ENGINE,
+    predators=0,
+    can_eat=False,
+    config=DEFAULT_CONFIG,
+    include_state=True,
+    synchronous=SYNCHRONOUS_UPDATE,
+    record=None,
+    profile=None,
+    on_step=None,
+    use_verlet_list=USE_VERLET_LIST,
+    setup=None,
+    obstacle_field=USE_OBSTACLE_FIELD,
+):
+    # 不開視窗、不限制幀率，盡可能快地推進模擬
+    world = World(
+        boid_count,
+        engine=engine,
+        config=config,
+        seed=seed,
+        synchronous=synchronous,
+        use_verlet_list=use_verlet_list,
+        obstacle_field=obstacle_field,
+    )
+    world.set_predators(predators, can_eat)
+    # setup(world) 在第一步之前呼叫 (例如放置場景的障礙物)，不計入執行時間
+    if setup is not None:
+        setup(world)
+    # profile 不為 None 時計時各階段，是檔案路徑時結束後匯出每一步的紀錄
+    if profile is not None:
+        PROFILER.enabled = True
+        PROFILER.reset()
+    # on_step(world) 在每一步之後呼叫 (例如離線繪製並匯出畫面)
+    # record 為檔案路徑時，把初始狀態與每一步之後的狀態寫進軌跡檔
+    recorder = TrajectoryRecorder.for_world(record, world) if record else None
+
+    eaten = 0
+    start = time.perf_counter()
+    if recorder is not None:
+        with recorder:
+            recorder.record(world)
+            for _ in range(steps):
+                eaten += world.step()
+                recorder.record(world)
+                if on_step is not None:
+                    on_step(world)
+                PROFILER.end_frame()
+    else:
+        for _ in range(steps):
+            eaten += world.step()
+            if on_step is not None:
+                on_step(world)
+            PROFILER.end_frame()
+    elapsed = time.perf_counter() - start
+    world.close()
+
+    result = {
+        "seed": seed,
+        "engine": engine,
+        "synchronous": synchronous,
+        "steps": steps,
+        "initial_boids": boid_count,
+        "predators": predators,
+        "eaten": eaten,
+        # 每個捕食者吃到的數量 (同一個 boid 只算給最近的捕食者)
+        "predator_kills": [p.kills for p in world.predators],
+        "elapsed": elapsed,
+        "steps_per_second": steps / elapsed if elapsed > 0 else float("inf"),
+        **flock_metrics(world),
+    }
+    if world.verlet is not None:
+        # 鄰居清單重建的次數 (其餘步數都直接使用快取的清單)
+        result["verlet_rebuilds"] = world.verlet.rebuilds
+    if profile is not None:
+        result["profile"] = PROFILER.averages(len(PROFILER.history))
+        if profile:
+            PROFILER.export(profile)
+        PROFILER.enabled = False
+    if include_state:
+        result["state"] = world.state()
+    if output:
+        with open(output, "w") as f:
+            json.dump(result, f)
+    return result
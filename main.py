@@ -1,285 +1,169 @@
-import pygame
-import random
-import math
+import argparse
+import dataclasses
 import sys
 
-# --- 常數設定 ---
-SCREEN_WIDTH = 1280
-SCREEN_HEIGHT = 720
-BOID_COUNT = 75
-BOID_SIZE = 5
-MAX_SPEED = 4
-MIN_SPEED = 2
-
-# Boids 演算法參數
-VISUAL_RANGE = 75
-SEPARATION_DISTANCE = 25
-
-# 規則權重
-SEPARATION_FACTOR = 0.05
-ALIGNMENT_FACTOR = 0.05
-COHESION_FACTOR = 0.0005
-EDGE_MARGIN = 50
-TURN_FACTOR = 0.2
-# 提高避障的權重，讓它成為更優先的行為
-OBSTACLE_AVOIDANCE_FACTOR = 0.5
-
-# 捕食者參數
-PREDATOR_SIZE = 10
-PREDATOR_SPEED = 4.5
-PREDATOR_COLOR = (255, 60, 60)
-PREDATOR_PEACEFUL_COLOR = (150, 0, 255)
-PREDATOR_DETECTION_RANGE = 150
-PREDATOR_AVOIDANCE_FACTOR = 0.25
-HUNTING_FACTOR = 0.05
-PREDATOR_EAT_DISTANCE = 7
-
-# 環境參數
-OBSTACLE_COLOR = (120, 120, 120)
-OBSTACLE_RADIUS = 20
-
-# UI 介面參數
-FONT_SIZE = 20
-BUTTON_TEXT_COLOR = (255, 255, 255)
-BUTTON_COLOR = (80, 80, 100)
-BUTTON_HOVER_COLOR = (120, 120, 150)
-INPUT_BOX_COLOR = (50, 50, 60)
-INPUT_BOX_ACTIVE_COLOR = (150, 150, 180)
-
-
-PREDATOR_BUTTON_RECT = pygame.Rect(10, 10, 180, 40)
-ADD_BOID_BUTTON_RECT = pygame.Rect(200, 10, 140, 40)
-REMOVE_BOID_BUTTON_RECT = pygame.Rect(350, 10, 140, 40)
-EAT_MODE_BUTTON_RECT = pygame.Rect(500, 10, 180, 40)
-OBSTACLE_MODE_BUTTON_RECT = pygame.Rect(690, 10, 220, 40)
-CONTINUOUS_PLACEMENT_BUTTON_RECT = pygame.Rect(920, 10, 200, 40)
-TOGGLE_UI_BUTTON_RECT = pygame.Rect(SCREEN_WIDTH - 150, 10, 140, 40)
-
-# 新增輸入框和其確認按鈕
-INPUT_BOX_RECT = pygame.Rect(200, 60, 140, 40)
-ADD_N_BOIDS_BUTTON_RECT = pygame.Rect(350, 60, 140, 40)
-
-
-# --- Boid 類別 (獵物) ---
-class Boid:
-    def __init__(self):
-        self.position = pygame.math.Vector2(
-            random.uniform(EDGE_MARGIN, SCREEN_WIDTH - EDGE_MARGIN),
-            random.uniform(EDGE_MARGIN, SCREEN_HEIGHT - EDGE_MARGIN),
-        )
-        angle = random.uniform(0, 2 * math.pi)
-        self.velocity = pygame.math.Vector2(
-            math.cos(angle), math.sin(angle)
-        ) * random.uniform(MIN_SPEED, MAX_SPEED)
-        self.acceleration = pygame.math.Vector2(0, 0)
-
-    def update(self, boids, predators, obstacles):
-        self.acceleration = pygame.math.Vector2(0, 0)
-
-        separation_force = self.separation(boids)
-        alignment_force = self.alignment(boids)
-        cohesion_force = self.cohesion(boids)
-        edge_force = self.avoid_edges()
-        predator_force = self.avoid_predators(predators)
-        obstacle_force = self.avoid_obstacles(obstacles)
-
-        # 將避障力道的權重設為最高
-        self.acceleration += obstacle_force * OBSTACLE_AVOIDANCE_FACTOR
-        self.acceleration += separation_force * SEPARATION_FACTOR
-        self.acceleration += alignment_force * ALIGNMENT_FACTOR
-        self.acceleration += cohesion_force * COHESION_FACTOR
-        self.acceleration += edge_force * TURN_FACTOR
-        self.acceleration += predator_force * PREDATOR_AVOIDANCE_FACTOR
-
-        self.velocity += self.acceleration
-
-        speed = self.velocity.length()
-        if speed > MAX_SPEED:
-            self.velocity.scale_to_length(MAX_SPEED)
-        elif speed < MIN_SPEED:
-            self.velocity.scale_to_length(MIN_SPEED)
-
-        self.position += self.velocity
-        return []  # Return empty list for consistency
-
-    def avoid_obstacles(self, obstacles):
-        steering = pygame.math.Vector2(0, 0)
+import pygame
+
+from camera import Camera
+from frame_export import (
+    EXPORT_IMAGE_FORMAT,
+    EXPORT_IMAGE_FORMATS,
+    GIF_EXPORT_AVAILABLE,
+    GIF_MAX_FRAMES,
+    FrameExporter,
+)
+from headless import run_headless
+from profiling import PROFILER
+from replay import ReplayPlayer
+from simulation import (
+    BOID_COUNT,
+    DEFAULT_CONFIG,
+    ENGINES,
+    MAX_PREDATORS,
+    NEIGHBOR_LIMIT,
+    NEIGHBOR_MODE,
+    NEIGHBOR_MODES,
+    OBSTACLE_COLOR,
+    OBSTACLE_RADIUS,
+    PREDATOR_COUNT,
+    PREDATOR_SIZE,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    SIMULATION_ENGINE,
+    SYNCHRONOUS_UPDATE,
+    USE_OBSTACLE_FIELD,
+    USE_VERLET_LIST,
+)
+from snapshot import load_snapshot, save_snapshot
+from sprites import BACKGROUND_COLOR, ObstacleLayer, SpriteRenderer
+from ui import (
+    ADD_BOID_BUTTON_RECT,
+    ADD_N_BOIDS_BUTTON_RECT,
+    ADD_PREDATOR_BUTTON_RECT,
+    CONTINUOUS_PLACEMENT_BUTTON_RECT,
+    EAT_MODE_BUTTON_RECT,
+    FONT_SIZE,
+    INPUT_BOX_RECT,
+    OBSTACLE_MODE_BUTTON_RECT,
+    PREDATOR_BUTTON_RECT,
+    REMOVE_BOID_BUTTON_RECT,
+    REMOVE_PREDATOR_BUTTON_RECT,
+    TOGGLE_UI_BUTTON_RECT,
+    ProfilerOverlay,
+    TextCache,
+    UIPanel,
+    draw_replay_status,
+    replay_seek_index,
+)
+from world import PHYSICS_RATE, FixedTimestep, World
+
+# True 時用預先旋轉好的三角形圖片批次繪製，False 時每個 boid 各畫一次多邊形
+USE_SPRITE_RENDERING = True
+SPRITE_RENDERER = SpriteRenderer()
+# F5 存檔 / F9 讀檔的檔案位置
+SNAPSHOT_PATH = "snapshot.npz"
+# F4 匯出效能紀錄的檔案
+PROFILE_EXPORT_PATHS = ("profile.csv", "profile.json")
+# True 時在上一個與目前的物理步之間插值繪製，畫面幀率與物理頻率不同時移動較平滑
+INTERPOLATE_RENDERING = True
+
+
+# --- 繪製 ---
+def draw_obstacles(screen, obstacles, camera=None):
+    if camera is None:
         for obs in obstacles:
-            dist = self.position.distance_to(obs["center"])
-            # 設定一個緩衝區，讓 boid 提早反應
-            detection_buffer = 40
-            detection_radius = obs["radius"] + detection_buffer
-
-            if dist < detection_radius:
-                # 計算一個遠離障礙物中心的力
-                diff = self.position - obs["center"]
-                # 距離越近，力道越強
-                # 當 boid 在緩衝區邊緣時，力道為 0
-                # 當 boid 接觸到障礙物時，力道最強
-                if dist > 0:
-                    strength = (detection_radius - dist) / detection_radius
-                    diff.scale_to_length(strength * MAX_SPEED)
-
-                steering += diff
-        return steering
-
-    def separation(self, boids):
-        steering = pygame.math.Vector2(0, 0)
-        count = 0
-        for other in boids:
-            if self is not other:
-                distance = self.position.distance_to(other.position)
-                if 0 < distance < SEPARATION_DISTANCE:
-                    diff = self.position - other.position
-                    diff /= distance
-                    steering += diff
-                    count += 1
-        if count > 0:
-            steering /= count
-        return steering
-
-    def alignment(self, boids):
-        steering = pygame.math.Vector2(0, 0)
-        count = 0
-        for other in boids:
-            if self is not other:
-                distance = self.position.distance_to(other.position)
-                if 0 < distance < VISUAL_RANGE:
-                    steering += other.velocity
-                    count += 1
-        if count > 0:
-            steering /= count
-            if steering.length() > 0:
-                steering.scale_to_length(MAX_SPEED)
-            steering -= self.velocity
-        return steering
-
-    def cohesion(self, boids):
-        steering = pygame.math.Vector2(0, 0)
-        count = 0
-        for other in boids:
-            if self is not other:
-                distance = self.position.distance_to(other.position)
-                if 0 < distance < VISUAL_RANGE:
-                    steering += other.position
-                    count += 1
-        if count > 0:
-            steering /= count
-            steering -= self.position
-            if steering.length() > 0:
-                steering.scale_to_length(MAX_SPEED)
-            steering -= self.velocity
-        return steering
-
-    def avoid_edges(self):
-        steering = pygame.math.Vector2(0, 0)
-        if self.position.x < EDGE_MARGIN:
-            steering.x = 1
-        elif self.position.x > SCREEN_WIDTH - EDGE_MARGIN:
-            steering.x = -1
-        if self.position.y < EDGE_MARGIN:
-            steering.y = 1
-        elif self.position.y > SCREEN_HEIGHT - EDGE_MARGIN:
-            steering.y = -1
-        return steering
-
-    def avoid_predators(self, predators):
-        steering = pygame.math.Vector2(0, 0)
-        for predator in predators:
-            distance = self.position.distance_to(predator.position)
-            if 0 < distance < PREDATOR_DETECTION_RANGE:
-                diff = self.position - predator.position
-                diff /= distance
-                steering += diff
-        return steering
-
-    def draw(self, screen):
-        angle = self.velocity.angle_to(pygame.math.Vector2(1, 0))
-        p1 = self.position + pygame.math.Vector2(BOID_SIZE * 2, 0).rotate(-angle)
-        p2 = self.position + pygame.math.Vector2(-BOID_SIZE, BOID_SIZE).rotate(-angle)
-        p3 = self.position + pygame.math.Vector2(-BOID_SIZE, -BOID_SIZE).rotate(-angle)
-        pygame.draw.polygon(screen, (255, 255, 255), [p1, p2, p3])
-
-
-# --- Predator 類別 (捕食者) ---
-class Predator(Boid):
-    def __init__(self):
-        super().__init__()
-        self.velocity = (
-            pygame.math.Vector2(
-                random.uniform(-1, 1), random.uniform(-1, 1)
-            ).normalize()
-            * PREDATOR_SPEED
-        )
-        self.can_eat = False
-
-    def update(self, boids, predators, obstacles):
-        self.acceleration = pygame.math.Vector2(0, 0)
-
-        closest_boid = None
-        min_dist = float("inf")
-        if boids:
-            for boid in boids:
-                dist = self.position.distance_to(boid.position)
-                if dist < min_dist:
-                    min_dist = dist
-                    closest_boid = boid
-
-        seek_force = pygame.math.Vector2(0, 0)
-        if closest_boid:
-            desired_velocity = closest_boid.position - self.position
-            if desired_velocity.length() > 0:
-                desired_velocity.scale_to_length(PREDATOR_SPEED)
-                seek_force = desired_velocity - self.velocity
-
-        edge_force = self.avoid_edges()
-        obstacle_force = self.avoid_obstacles(obstacles)
-
-        # 捕食者也需要避障
-        self.acceleration += obstacle_force * OBSTACLE_AVOIDANCE_FACTOR * 1.5
-        self.acceleration += edge_force * TURN_FACTOR * 2
-        self.acceleration += seek_force * HUNTING_FACTOR
-
-        self.velocity += self.acceleration
-        if self.velocity.length() > PREDATOR_SPEED:
-            self.velocity.scale_to_length(PREDATOR_SPEED)
-
-        self.position += self.velocity
-
-        boids_eaten = []
-        if self.can_eat:
-            for boid in boids:
-                if self.position.distance_to(boid.position) < PREDATOR_EAT_DISTANCE:
-                    boids_eaten.append(boid)
-        return boids_eaten
-
-    def draw(self, screen):
-        current_color = PREDATOR_COLOR if self.can_eat else PREDATOR_PEACEFUL_COLOR
-        angle = self.velocity.angle_to(pygame.math.Vector2(1, 0))
-        p1 = self.position + pygame.math.Vector2(PREDATOR_SIZE * 2, 0).rotate(-angle)
-        p2 = self.position + pygame.math.Vector2(-PREDATOR_SIZE, PREDATOR_SIZE).rotate(
-            -angle
-        )
-        p3 = self.position + pygame.math.Vector2(-PREDATOR_SIZE, -PREDATOR_SIZE).rotate(
-            -angle
+            pygame.draw.circle(screen, OBSTACLE_COLOR, obs["center"], obs["radius"])
+        return
+    for obs in obstacles:
+        if camera.visible(obs["center"], obs["radius"]):
+            pygame.draw.circle(
+                screen,
+                OBSTACLE_COLOR,
+                camera.to_screen(obs["center"]),
+                obs["radius"] * camera.zoom,
+            )
+
+
+def draw_world(screen, world, obstacle_layer=None, alpha=1.0, camera=None):
+    # camera 不為 None 時只畫看得到的部分 (平移、縮放後的世界)
+    if obstacle_layer is not None and (camera is None or camera.identity):
+        # 背景和障礙物已經預先畫好，只需要貼一次
+        obstacle_layer.draw(screen)
+    else:
+        screen.fill(BACKGROUND_COLOR)
+        draw_obstacles(screen, world.obstacles, camera)
+
+    if USE_SPRITE_RENDERING:
+        SPRITE_RENDERER.draw(
+            screen, world.boids, world.predators, world.flock, alpha, camera
         )
-        pygame.draw.polygon(screen, current_color, [p1, p2, p3])
+        return
+
+    if world.flock is not None:
+        world.flock.draw(screen, alpha, camera)
+    all_entities = world.boids + world.predators
+    for entity in all_entities:
+        if camera is None:
+            entity.draw(screen, alpha)
+        elif camera.visible(entity.render_position(alpha), PREDATOR_SIZE * 2):
+            entity.draw(screen, alpha, camera)
 
 
 # --- 主程式 ---
-def main():
+def main(
+    boid_count=BOID_COUNT,
+    seed=None,
+    engine=SIMULATION_ENGINE,
+    synchronous=SYNCHRONOUS_UPDATE,
+    profile=False,
+    predators=0,
+    can_eat=False,
+    config=DEFAULT_CONFIG,
+    obstacle_field=USE_OBSTACLE_FIELD,
+    export=None,
+    export_every=1,
+    export_format=EXPORT_IMAGE_FORMAT,
+    use_verlet_list=USE_VERLET_LIST,
+):
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Boids Simulation - Interactive World Builder")
     clock = pygame.time.Clock()
     font = pygame.font.Font(None, FONT_SIZE)
-
-    boids = [Boid() for _ in range(BOID_COUNT)]
-    predators = []
-    obstacles = []
-
-    predator_active = False
-    predator_can_eat = False
+    ui_panel = UIPanel(font)
+    # F3 顯示效能資訊，顯示時才開始計時
+    profiler_overlay = ProfilerOverlay(font)
+    show_profiler = profile
+    PROFILER.enabled = profile
+
+    world = World(
+        boid_count,
+        engine=engine,
+        config=config,
+        seed=seed,
+        synchronous=synchronous,
+        obstacle_field=obstacle_field,
+        use_verlet_list=use_verlet_list,
+    )
+    obstacles = world.obstacles
+    obstacle_layer = ObstacleLayer(obstacles)
+    # export 不為 None 時每 export_every 個畫面幀擷取一次畫面，由背景執行緒編碼
+    exporter = None
+    if export:
+        exporter = FrameExporter(
+            export, fps=60 / export_every, image_format=export_format
+        )
+    rendered_frames = 0
+    # 滾輪縮放、中鍵拖曳或方向鍵平移，Home 回到原點
+    camera = Camera((config.world_width, config.world_height))
+    # 物理以固定步長推進，不受畫面幀率影響
+    timestep = FixedTimestep()
+    frame_seconds = timestep.step_seconds
+
+    # predator_count 是開啟捕食者時的數量
+    predator_count = min(predators, MAX_PREDATORS) or PREDATOR_COUNT
+    predator_active = predators > 0
+    predator_can_eat = can_eat
     mouse_mode = "add_obstacle"
     ui_visible = True
     continuous_obstacle_placement = False
@@ -292,19 +176,17 @@ def main():
         try:
             num = int(text_input)
             if num > 0:
-                for _ in range(num):
-                    boids.append(Boid())
+                world.add_boids(num)
             elif num < 0:
-                num_to_remove = min(abs(num), len(boids))
-                if num_to_remove > 0:
-                    for _ in range(num_to_remove):
-                        boids.pop(0)  # 移除最舊的
+                world.remove_oldest_boids(abs(num))  # 移除最舊的
         except ValueError:
             return  # 輸入無效時不執行任何操作
 
     running = True
     while running:
         mouse_pos = pygame.mouse.get_pos()
+        # 放置或移除障礙物時使用的世界座標
+        world_pos = camera.to_world(mouse_pos)
         clicked_on_ui = False
 
         # 檢查是否有任何 UI 元素被懸停
@@ -320,6 +202,8 @@ def main():
                 TOGGLE_UI_BUTTON_RECT,
                 INPUT_BOX_RECT,
                 ADD_N_BOIDS_BUTTON_RECT,
+                ADD_PREDATOR_BUTTON_RECT,
+                REMOVE_PREDATOR_BUTTON_RECT,
             ]
             for button in all_buttons:
                 if button.collidepoint(mouse_pos):
@@ -329,10 +213,66 @@ def main():
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            camera.handle_event(event)
 
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     running = False
+                if event.key == pygame.K_g and not input_active:
+                    world.use_spatial_grid = not world.use_spatial_grid
+                if event.key == pygame.K_v and not input_active:
+                    world.set_verlet_list(not world.use_verlet_list)
+                if event.key == pygame.K_o and not input_active:
+                    world.set_obstacle_field(not world.obstacle_field)
+                if event.key == pygame.K_HOME:
+                    camera.reset()
+                if event.key == pygame.K_F3:
+                    show_profiler = not show_profiler
+                    PROFILER.enabled = show_profiler
+                    PROFILER.reset()
+                if event.key == pygame.K_F4 and PROFILER.history:
+                    for path in PROFILE_EXPORT_PATHS:
+                        PROFILER.export(path)
+                if event.key == pygame.K_F5:
+                    save_snapshot(
+                        SNAPSHOT_PATH,
+                        world,
+                        {
+                            "predator_active": predator_active,
+                            "predator_count": predator_count,
+                            "predator_can_eat": predator_can_eat,
+                            "mouse_mode": mouse_mode,
+                            "ui_visible": ui_visible,
+                            "continuous_obstacle_placement": (
+                                continuous_obstacle_placement
+                            ),
+                            "input_text": input_text,
+                        },
+                    )
+                if event.key == pygame.K_F9:
+                    try:
+                        loaded, settings = load_snapshot(SNAPSHOT_PATH)
+                    except (OSError, ValueError) as e:
+                        print(f"could not load {SNAPSHOT_PATH}: {e}")
+                    else:
+                        world.close()
+                        world = loaded
+                        obstacles = world.obstacles
+                        obstacle_layer = ObstacleLayer(obstacles)
+                        camera = Camera(
+                            (world.config.world_width, world.config.world_height)
+                        )
+                        predator_active = settings["predator_active"]
+                        predator_count = settings.get(
+                            "predator_count", len(world.predators) or PREDATOR_COUNT
+                        )
+                        predator_can_eat = settings["predator_can_eat"]
+                        mouse_mode = settings["mouse_mode"]
+                        ui_visible = settings["ui_visible"]
+                        continuous_obstacle_placement = settings[
+                            "continuous_obstacle_placement"
+                        ]
+                        input_text = settings["input_text"]
                 if input_active:
                     if event.key == pygame.K_RETURN:
                         handle_boid_count_change(input_text)
@@ -354,12 +294,17 @@ def main():
                         if PREDATOR_BUTTON_RECT.collidepoint(mouse_pos):
                             predator_active = not predator_active
                             clicked_on_ui = True
+                        elif ADD_PREDATOR_BUTTON_RECT.collidepoint(mouse_pos):
+                            predator_count = min(predator_count + 1, MAX_PREDATORS)
+                            clicked_on_ui = True
+                        elif REMOVE_PREDATOR_BUTTON_RECT.collidepoint(mouse_pos):
+                            predator_count = max(predator_count - 1, 1)
+                            clicked_on_ui = True
                         elif ADD_BOID_BUTTON_RECT.collidepoint(mouse_pos):
-                            boids.append(Boid())
+                            world.add_boids(1)
                             clicked_on_ui = True
                         elif REMOVE_BOID_BUTTON_RECT.collidepoint(mouse_pos):
-                            if boids:
-                                boids.pop(0)
+                            world.remove_oldest_boids(1)
                             clicked_on_ui = True
                         elif EAT_MODE_BUTTON_RECT.collidepoint(mouse_pos):
                             predator_can_eat = not predator_can_eat
@@ -388,238 +333,357 @@ def main():
 
                     if not clicked_on_ui and not continuous_obstacle_placement:
                         if mouse_mode == "add_obstacle":
-                            obstacles.append(
-                                {
-                                    "center": pygame.math.Vector2(mouse_pos),
-                                    "radius": OBSTACLE_RADIUS,
-                                }
-                            )
+                            obstacles.add(world_pos, OBSTACLE_RADIUS)
                         elif mouse_mode == "remove_obstacle":
-                            for obs in obstacles[:]:
-                                if (
-                                    pygame.math.Vector2(mouse_pos).distance_to(
-                                        obs["center"]
-                                    )
-                                    < obs["radius"]
-                                ):
-                                    obstacles.remove(obs)
-                                    break
+                            obstacles.remove_at(world_pos)
 
         # --- 連續滑鼠操作 (新增/移除) ---
         mouse_pressed = pygame.mouse.get_pressed()
         if mouse_pressed[0] and continuous_obstacle_placement and not ui_hovered:
             if mouse_mode == "add_obstacle":
-                obstacles.append(
-                    {
-                        "center": pygame.math.Vector2(mouse_pos),
-                        "radius": OBSTACLE_RADIUS,
-                    }
-                )
+                obstacles.add(world_pos, OBSTACLE_RADIUS)
             elif mouse_mode == "remove_obstacle":
-                for obs in obstacles[:]:
-                    if (
-                        pygame.math.Vector2(mouse_pos).distance_to(obs["center"])
-                        < obs["radius"]
-                    ):
-                        obstacles.remove(obs)
-                        break  # 每幀只移除一個以獲得更好的控制
-
-        if predator_active and not predators:
-            predators.append(Predator())
-        elif not predator_active and predators:
-            predators.clear()
-            predator_can_eat = False
-
-        for p in predators:
-            p.can_eat = predator_can_eat
-
-        boids_to_remove = set()
-        all_entities = boids + predators
-        for entity in all_entities:
-            eaten = entity.update(boids, predators, obstacles)
-            if eaten:
-                for boid in eaten:
-                    boids_to_remove.add(boid)
+                obstacles.remove_at(world_pos)  # 每幀只移除一個以獲得更好的控制
 
-        if boids_to_remove:
-            boids = [boid for boid in boids if boid not in boids_to_remove]
-
-        screen.fill((10, 20, 40))
-
-        for obs in obstacles:
-            pygame.draw.circle(screen, OBSTACLE_COLOR, obs["center"], obs["radius"])
-
-        all_entities = boids + predators
-        for entity in all_entities:
-            entity.draw(screen)
+        if not predator_active and world.predators:
+            predator_can_eat = False
+        world.set_predators(predator_count if predator_active else 0, predator_can_eat)
+        camera.follow_keys(pygame.key.get_pressed(), frame_seconds)
+        PROFILER.lap("events")
+
+        for _ in range(timestep.advance(frame_seconds)):
+            world.step(timestep.dt)
+        PROFILER.lap("physics")
+
+        alpha = timestep.alpha if INTERPOLATE_RENDERING else 1.0
+        draw_world(screen, world, obstacle_layer, alpha, camera)
+        PROFILER.lap("draw_entities")
+        ui_panel.draw(
+            screen,
+            mouse_pos,
+            ui_visible=ui_visible,
+            predator_active=predator_active,
+            predator_can_eat=predator_can_eat,
+            mouse_mode=mouse_mode,
+            continuous_obstacle_placement=continuous_obstacle_placement,
+            input_text=input_text,
+            input_active=input_active,
+            predator_count=predator_count,
+        )
+        PROFILER.lap("draw_ui")
+        if show_profiler:
+            profiler_overlay.draw(screen, PROFILER)
+        if exporter is not None and rendered_frames % export_every == 0:
+            exporter.capture(screen)
+            PROFILER.lap("export")
+        rendered_frames += 1
 
-        # --- 繪製 UI ---
-        if ui_visible:
-            # ... (所有按鈕的繪製邏輯)
-            # 捕食者按鈕
-            pred_button_color = (
-                BUTTON_HOVER_COLOR
-                if PREDATOR_BUTTON_RECT.collidepoint(mouse_pos)
-                else BUTTON_COLOR
-            )
-            pygame.draw.rect(
-                screen, pred_button_color, PREDATOR_BUTTON_RECT, border_radius=5
-            )
-            pred_text_str = "Remove Predator" if predator_active else "Add Predator"
-            pred_text = font.render(pred_text_str, True, BUTTON_TEXT_COLOR)
-            screen.blit(
-                pred_text, pred_text.get_rect(center=PREDATOR_BUTTON_RECT.center)
+        pygame.display.flip()
+        PROFILER.lap("flip")
+        frame_seconds = clock.tick(60) / 1000
+        PROFILER.lap("tick_wait")
+        PROFILER.end_frame()
+
+    if exporter is not None:
+        print(f"exported {exporter.close()} frames to {export}")
+        if exporter.dropped:
+            print(
+                f"GIF limit of {GIF_MAX_FRAMES} frames reached, "
+                f"{exporter.dropped} dropped"
             )
+    world.close()
+    pygame.quit()
+    sys.exit()
 
-            # 單一增加 Boid 按鈕
-            add_button_color = (
-                BUTTON_HOVER_COLOR
-                if ADD_BOID_BUTTON_RECT.collidepoint(mouse_pos)
-                else BUTTON_COLOR
-            )
-            pygame.draw.rect(
-                screen, add_button_color, ADD_BOID_BUTTON_RECT, border_radius=5
-            )
-            add_text = font.render("+1 Boid", True, BUTTON_TEXT_COLOR)
-            screen.blit(
-                add_text, add_text.get_rect(center=ADD_BOID_BUTTON_RECT.center)
-            )
 
-            # 單一移除 Boid 按鈕
-            remove_button_color = (
-                BUTTON_HOVER_COLOR
-                if REMOVE_BOID_BUTTON_RECT.collidepoint(mouse_pos)
-                else BUTTON_COLOR
-            )
-            pygame.draw.rect(
-                screen, remove_button_color, REMOVE_BOID_BUTTON_RECT, border_radius=5
-            )
-            remove_text = font.render("-1 Boid", True, BUTTON_TEXT_COLOR)
-            screen.blit(
-                remove_text,
-                remove_text.get_rect(center=REMOVE_BOID_BUTTON_RECT.center),
-            )
+# --- 離線匯出 ---
+def headless_exporter(
+    path, every=1, config=DEFAULT_CONFIG, image_format=EXPORT_IMAGE_FORMAT
+):
+    # 無畫面模式的匯出: 畫在不顯示的 surface 上，每 every 步擷取一次。
+    # 回傳 exporter 與要傳給 run_headless 的 on_step
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    camera = Camera((config.world_width, config.world_height))
+    exporter = FrameExporter(path, fps=PHYSICS_RATE / every, image_format=image_format)
 
-            # 捕食模式按鈕
-            eat_button_color = (
-                BUTTON_HOVER_COLOR
-                if EAT_MODE_BUTTON_RECT.collidepoint(mouse_pos)
-                else BUTTON_COLOR
-            )
-            pygame.draw.rect(
-                screen, eat_button_color, EAT_MODE_BUTTON_RECT, border_radius=5
-            )
-            eat_text_str = "Disable Eating" if predator_can_eat else "Enable Eating"
-            eat_text = font.render(eat_text_str, True, BUTTON_TEXT_COLOR)
-            screen.blit(
-                eat_text, eat_text.get_rect(center=EAT_MODE_BUTTON_RECT.center)
-            )
+    def on_step(world):
+        if world.frame % every == 0:
+            draw_world(screen, world, camera=camera)
+            exporter.capture(screen)
 
-            # 滑鼠模式按鈕
-            obstacle_button_color = (
-                BUTTON_HOVER_COLOR
-                if OBSTACLE_MODE_BUTTON_RECT.collidepoint(mouse_pos)
-                else BUTTON_COLOR
-            )
-            pygame.draw.rect(
-                screen,
-                obstacle_button_color,
-                OBSTACLE_MODE_BUTTON_RECT,
-                border_radius=5,
-            )
-            obstacle_text_str = (
-                "Mouse: Remove Obstacle"
-                if mouse_mode == "remove_obstacle"
-                else "Mouse: Add Obstacle"
-            )
-            obstacle_text = font.render(obstacle_text_str, True, BUTTON_TEXT_COLOR)
-            screen.blit(
-                obstacle_text,
-                obstacle_text.get_rect(center=OBSTACLE_MODE_BUTTON_RECT.center),
-            )
-
-            # 連續放置模式按鈕
-            continuous_button_color = (
-                BUTTON_HOVER_COLOR
-                if CONTINUOUS_PLACEMENT_BUTTON_RECT.collidepoint(mouse_pos)
-                else BUTTON_COLOR
-            )
-            pygame.draw.rect(
-                screen,
-                continuous_button_color,
-                CONTINUOUS_PLACEMENT_BUTTON_RECT,
-                border_radius=5,
-            )
-            continuous_text_str = (
-                "Place: Continuous"
-                if continuous_obstacle_placement
-                else "Place: Single"
-            )
-            continuous_text = font.render(
-                continuous_text_str, True, BUTTON_TEXT_COLOR
-            )
-            screen.blit(
-                continuous_text,
-                continuous_text.get_rect(
-                    center=CONTINUOUS_PLACEMENT_BUTTON_RECT.center
-                ),
-            )
+    return exporter, on_step
 
-            # 輸入框和相關按鈕
-            input_box_color = (
-                INPUT_BOX_ACTIVE_COLOR if input_active else INPUT_BOX_COLOR
-            )
-            pygame.draw.rect(
-                screen, input_box_color, INPUT_BOX_RECT, border_radius=5
-            )
-            input_surface = font.render(input_text, True, BUTTON_TEXT_COLOR)
-            screen.blit(
-                input_surface, (INPUT_BOX_RECT.x + 10, INPUT_BOX_RECT.y + 10)
-            )
 
-            add_n_button_color = (
-                BUTTON_HOVER_COLOR
-                if ADD_N_BOIDS_BUTTON_RECT.collidepoint(mouse_pos)
-                else BUTTON_COLOR
-            )
-            pygame.draw.rect(
-                screen, add_n_button_color, ADD_N_BOIDS_BUTTON_RECT, border_radius=5
-            )
-            try:
-                num = int(input_text)
-                button_str = (
-                    f"Remove {abs(num)} Boids" if num < 0 else f"Add {num} Boids"
-                )
-            except ValueError:
-                button_str = "Execute"
-            add_n_text = font.render(button_str, True, BUTTON_TEXT_COLOR)
-            screen.blit(
-                add_n_text,
-                add_n_text.get_rect(center=ADD_N_BOIDS_BUTTON_RECT.center),
-            )
+# --- 重播 ---
+def replay(path, speed=1, start=0):
+    # 逐幀讀取錄製的軌跡並繪製，不執行物理計算
+    player = ReplayPlayer(path, speed=speed, start=start)
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Boids Simulation - Replay")
+    clock = pygame.time.Clock()
+    text_cache = TextCache(pygame.font.Font(None, FONT_SIZE))
+    camera = Camera((player.config.world_width, player.config.world_height))
+    # 翻頁鍵一次跳過全長的 10%
+    page = max(1, len(player) // 10)
 
-        # 切換 UI 可見性按鈕 (移到最上層繪製)
-        toggle_ui_button_color = (
-            BUTTON_HOVER_COLOR
-            if TOGGLE_UI_BUTTON_RECT.collidepoint(mouse_pos)
-            else BUTTON_COLOR
-        )
-        pygame.draw.rect(
-            screen, toggle_ui_button_color, TOGGLE_UI_BUTTON_RECT, border_radius=5
-        )
-        toggle_ui_text_str = "Hide UI" if ui_visible else "Show UI"
-        toggle_ui_text = font.render(toggle_ui_text_str, True, BUTTON_TEXT_COLOR)
-        screen.blit(
-            toggle_ui_text,
-            toggle_ui_text.get_rect(center=TOGGLE_UI_BUTTON_RECT.center),
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            camera.handle_event(event)
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    player.playing = not player.playing
+                elif event.key in (pygame.K_RIGHT, pygame.K_LEFT):
+                    # 逐幀前進或後退
+                    player.playing = False
+                    player.step(1 if event.key == pygame.K_RIGHT else -1)
+                elif event.key == pygame.K_UP:
+                    player.set_speed(player.speed * 2)
+                elif event.key == pygame.K_DOWN:
+                    player.set_speed(player.speed // 2)
+                elif event.key == pygame.K_PAGEUP:
+                    player.step(-page)
+                elif event.key == pygame.K_PAGEDOWN:
+                    player.step(page)
+                elif event.key == pygame.K_HOME:
+                    player.seek(0)
+                elif event.key == pygame.K_END:
+                    player.seek(len(player) - 1)
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                index = replay_seek_index(event.pos, len(player))
+                if index is not None:
+                    player.seek(index)
+
+        frame = player.current()
+        draw_world(screen, frame, camera=camera)
+        draw_replay_status(
+            screen,
+            text_cache,
+            player.index,
+            len(player),
+            player.speed,
+            player.playing,
+            frame.frame,
         )
-
         pygame.display.flip()
+        player.advance()
         clock.tick(60)
 
+    player.close()
     pygame.quit()
     sys.exit()
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Boids simulation")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without a display window, as fast as the CPU allows",
+    )
+    parser.add_argument(
+        "--boids", type=int, default=BOID_COUNT, help="initial boid count"
+    )
+    parser.add_argument(
+        "--steps", type=int, default=1000, help="number of steps in headless mode"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument(
+        "--output", default=None, help="write the headless run summary (JSON) here"
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        metavar="PATH",
+        help="record every headless step to a memory-mapped trajectory file",
+    )
+    parser.add_argument("--engine", choices=ENGINES, default=SIMULATION_ENGINE)
+    parser.add_argument(
+        "--synchronous",
+        action="store_true",
+        default=SYNCHRONOUS_UPDATE,
+        help="update every boid from the previous step's state (objects engine)",
+    )
+    parser.add_argument(
+        "--replay",
+        default=None,
+        metavar="PATH",
+        help="play back a trajectory recorded with --record instead of simulating",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=int,
+        default=1,
+        help="recorded steps advanced per displayed frame in replay mode",
+    )
+    parser.add_argument(
+        "--start",
+        type=int,
+        default=0,
+        help="first recorded step to show in replay mode",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="time each phase; in headless mode optionally export to PATH (.csv or .json)",
+    )
+    parser.add_argument(
+        "--predators",
+        type=int,
+        default=0,
+        metavar="N",
+        help=f"start with N predators (at most {MAX_PREDATORS})",
+    )
+    parser.add_argument(
+        "--predator",
+        dest="predators",
+        action="store_const",
+        const=PREDATOR_COUNT,
+        help=f"start with {PREDATOR_COUNT} predator(s)",
+    )
+    parser.add_argument(
+        "--eat", action="store_true", help="let the predators eat boids"
+    )
+    parser.add_argument(
+        "--world-size",
+        type=float,
+        nargs=2,
+        metavar=("WIDTH", "HEIGHT"),
+        help="size of the simulated world (default: the window size)",
+    )
+    parser.add_argument(
+        "--obstacle-field",
+        action="store_true",
+        default=USE_OBSTACLE_FIELD,
+        help="read obstacle avoidance from a precomputed grid (toggle with O)",
+    )
+    parser.add_argument(
+        "--verlet",
+        action="store_true",
+        default=USE_VERLET_LIST,
+        help="reuse cached neighbor candidate lists until a boid may have moved "
+        "half the skin distance (toggle with V)",
+    )
+    parser.add_argument(
+        "--neighbor-mode",
+        choices=NEIGHBOR_MODES,
+        default=NEIGHBOR_MODE,
+        help="use every boid within the visual range (metric), only the K nearest "
+        "(topological), or a random sample of K (sample)",
+    )
+    parser.add_argument(
+        "--neighbors",
+        type=int,
+        default=NEIGHBOR_LIMIT,
+        metavar="K",
+        help="neighbor limit of the topological and sample modes",
+    )
+    parser.add_argument(
+        "--export",
+        default=None,
+        metavar="PATH",
+        help="save rendered frames as a PNG sequence in the directory PATH, "
+        "or as an animation if PATH ends in .gif (needs Pillow)",
+    )
+    parser.add_argument(
+        "--export-every",
+        type=int,
+        default=1,
+        metavar="N",
+        help="export every Nth frame (every Nth step in headless mode)",
+    )
+    parser.add_argument(
+        "--export-format",
+        choices=EXPORT_IMAGE_FORMATS,
+        default=EXPORT_IMAGE_FORMAT,
+        help="image format of an exported frame sequence "
+        "(tga encodes several times faster than png)",
+    )
+    args = parser.parse_args(argv)
+    if args.world_size and min(args.world_size) <= 0:
+        parser.error("--world-size must be positive")
+    if args.neighbors < 1:
+        parser.error("--neighbors must be at least 1")
+    if args.export_every < 1:
+        parser.error("--export-every must be at least 1")
+    if args.export and args.export.lower().endswith(".gif"):
+        if not GIF_EXPORT_AVAILABLE:
+            parser.error("exporting a GIF requires Pillow (pip install pillow)")
+        if args.headless and args.steps // args.export_every > GIF_MAX_FRAMES:
+            parser.error(
+                f"a GIF holds at most {GIF_MAX_FRAMES} frames; raise --export-every "
+                f"or export an image sequence instead"
+            )
+    if not 0 <= args.predators <= MAX_PREDATORS:
+        parser.error(f"--predators must be between 0 and {MAX_PREDATORS}")
+    return args
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    config = dataclasses.replace(
+        DEFAULT_CONFIG, neighbor_mode=args.neighbor_mode, neighbor_limit=args.neighbors
+    )
+    if args.world_size:
+        config = dataclasses.replace(
+            config, world_width=args.world_size[0], world_height=args.world_size[1]
+        )
+    if args.replay:
+        replay(args.replay, speed=args.replay_speed, start=args.start)
+    elif args.headless:
+        exporter = on_step = None
+        if args.export:
+            exporter, on_step = headless_exporter(
+                args.export, args.export_every, config, args.export_format
+            )
+        result = run_headless(
+            boid_count=args.boids,
+            steps=args.steps,
+            seed=args.seed,
+            output=args.output,
+            engine=args.engine,
+            predators=args.predators,
+            can_eat=args.eat,
+            config=config,
+            synchronous=args.synchronous,
+            record=args.record,
+            profile=args.profile,
+            on_step=on_step,
+            use_verlet_list=args.verlet,
+            obstacle_field=args.obstacle_field,
+        )
+        if exporter is not None:
+            print(f"exported {exporter.close()} frames to {args.export}")
+        print(
+            f"{result['steps']} steps, {result['survivors']} boids left, "
+            f"{result['steps_per_second']:.1f} steps/s"
+        )
+        if "verlet_rebuilds" in result:
+            print(
+                f"neighbor lists rebuilt {result['verlet_rebuilds']} times "
+                f"in {result['steps']} steps"
+            )
+    else:
+        main(
+            boid_count=args.boids,
+            seed=args.seed,
+            engine=args.engine,
+            synchronous=args.synchronous,
+            profile=args.profile is not None,
+            predators=args.predators,
+            can_eat=args.eat,
+            config=config,
+            obstacle_field=args.obstacle_field,
+            export=args.export,
+            export_every=args.export_every,
+            export_format=args.export_format,
+            use_verlet_list=args.verlet,
+        )
@@ -0,0 +1,607 @@
+import argparse
+import copy
+import math
+import random
+import time
+
+import numpy as np
+import pygame
+
+from profiling import PROFILER
+from simulation import (
+    BOID_SIZE,
+    DEFAULT_CONFIG,
+    EDGE_MARGIN,
+    MAX_SPEED,
+    MIN_SPEED,
+    OBSTACLE_AVOIDANCE_FACTOR,
+    OBSTACLE_DETECTION_BUFFER,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    TURN_FACTOR,
+    Boid,
+    ObstacleStore,
+    Predator,
+    hunt_prey,
+    obstacle_arrays,
+    prey_index,
+)
+
+# --- 鄰居配對 ---
+# 只取一半的相鄰格子 (自己的格子加上右、左下、下、右下)，每一對只出現一次
+HALF_NEIGHBOR_OFFSETS = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+def neighbor_pairs(positions, cell_size):
+    # 依格子排序後，一次產生所有相鄰格子內的 (i, j) 配對，每一對只出現一次
+    count = len(positions)
+    empty = np.empty(0, dtype=np.intp)
+    if count == 0:
+        return empty, empty
+
+    cells = np.floor(positions / cell_size).astype(np.intp)
+    cells -= cells.min(axis=0)
+    # 四周各留一格空白，鄰居格子的索引就不會超出範圍
+    columns = int(cells[:, 0].max()) + 3
+    rows = int(cells[:, 1].max()) + 3
+    keys = (cells[:, 1] + 1) * columns + (cells[:, 0] + 1)
+
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    counts = np.bincount(keys, minlength=rows * columns)
+    starts = np.cumsum(counts) - counts
+
+    all_i = []
+    all_j = []
+    for dx, dy in HALF_NEIGHBOR_OFFSETS:
+        neighbor_keys = sorted_keys + dy * columns + dx
+        neighbor_counts = counts[neighbor_keys]
+        neighbor_starts = starts[neighbor_keys]
+        if dx == 0 and dy == 0:
+            # 同一格內只跟排在自己後面的配對
+            slot = np.arange(count)
+            neighbor_counts = neighbor_starts + neighbor_counts - slot - 1
+            neighbor_starts = slot + 1
+        total = int(neighbor_counts.sum())
+        if total == 0:
+            continue
+        i = np.repeat(order, neighbor_counts)
+        # 每個配對在鄰居格子中的位置
+        offsets = np.arange(total) - np.repeat(
+            np.cumsum(neighbor_counts) - neighbor_counts, neighbor_counts
+        )
+        j = order[np.repeat(neighbor_starts, neighbor_counts) + offsets]
+        all_i.append(i)
+        all_j.append(j)
+
+    if not all_i:
+        return empty, empty
+    return np.concatenate(all_i), np.concatenate(all_j)
+
+
+def cell_index(others, cell_size, bounds=None):
+    # 把 others 依格子排序，回傳 indexed_pairs 使用的索引。
+    # bounds (左上, 右下) 必須涵蓋之後查詢的所有點，預設為 others 的範圍
+    if bounds is None:
+        bounds = (others.min(axis=0), others.max(axis=0))
+    low, high = bounds
+    other_cells = np.floor((others - low) / cell_size).astype(np.intp)
+    columns = math.floor((high[0] - low[0]) / cell_size) + 3
+    rows = math.floor((high[1] - low[1]) / cell_size) + 3
+    other_keys = (other_cells[:, 1] + 1) * columns + (other_cells[:, 0] + 1)
+    order = np.argsort(other_keys, kind="stable")
+    counts = np.bincount(other_keys, minlength=rows * columns)
+    starts = np.cumsum(counts) - counts
+    return low, cell_size, columns, order, counts, starts
+
+
+def indexed_pairs(points, index):
+    # points 中每一點與索引中位於相鄰 3x3 格子內的點配對
+    # (i 指向 points，j 指向 others)
+    empty = np.empty(0, dtype=np.intp)
+    if len(points) == 0:
+        return empty, empty
+    origin, cell_size, columns, order, counts, starts = index
+    point_cells = np.floor((points - origin) / cell_size).astype(np.intp)
+    point_keys = (point_cells[:, 1] + 1) * columns + (point_cells[:, 0] + 1)
+
+    all_i = []
+    all_j = []
+    indices = np.arange(len(points))
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            neighbor_keys = point_keys + dy * columns + dx
+            neighbor_counts = counts[neighbor_keys]
+            total = int(neighbor_counts.sum())
+            if total == 0:
+                continue
+            offsets = np.arange(total) - np.repeat(
+                np.cumsum(neighbor_counts) - neighbor_counts, neighbor_counts
+            )
+            all_i.append(np.repeat(indices, neighbor_counts))
+            all_j.append(
+                order[np.repeat(starts[neighbor_keys], neighbor_counts) + offsets]
+            )
+
+    if not all_i:
+        return empty, empty
+    return np.concatenate(all_i), np.concatenate(all_j)
+
+
+def cross_pairs(points, others, cell_size):
+    # points 中每一點與 others 中位於相鄰 3x3 格子內的點配對
+    # (i 指向 points，j 指向 others)
+    empty = np.empty(0, dtype=np.intp)
+    if len(points) == 0 or len(others) == 0:
+        return empty, empty
+    bounds = (
+        np.minimum(points.min(axis=0), others.min(axis=0)),
+        np.maximum(points.max(axis=0), others.max(axis=0)),
+    )
+    return indexed_pairs(points, cell_index(others, cell_size, bounds))
+
+
+def _pair_sum(i, j, weights_i, weights_j, count):
+    # 對稱累加: i 收到 j 的值，j 收到 i 的值
+    return np.bincount(i, weights=weights_j, minlength=count) + np.bincount(
+        j, weights=weights_i, minlength=count
+    )
+
+
+def _scale_rows(vectors, length):
+    # 等同於對每一列呼叫 Vector2.scale_to_length，長度為 0 的向量保持不變
+    norms = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+    safe = np.where(norms > 0, norms, 1.0)
+    scale = np.where(norms > 0, length / safe, 1.0)
+    return vectors * scale[:, None]
+
+
+# select_pairs 先用「預期約有 limit 的幾倍個配對」的門檻篩選候選，只排序候選
+CANDIDATE_FACTOR = 4
+
+
+def select_pairs(i, j, dist_sq, config, rng=None):
+    # 有方向的配對 (i 收到 j 的影響) 中，每個 i 依 neighbor_mode
+    # 最多保留 neighbor_limit 個，回傳保留的配對索引 (依原本的順序)。
+    # "topological" 保留距離最小的，距離相同時取 j 較小的
+    # (與 Boid.select_neighbors 相同)；
+    # "sample" 保留隨機鍵最小的，也就是不重複的隨機抽樣
+    limit = config.neighbor_limit
+    if config.neighbor_mode == "topological":
+        keys = dist_sq
+        full = config.visual_range**2
+    else:
+        keys = rng.random(len(i))
+        full = 1.0
+    counts = np.bincount(i)
+    # 假設鄰居分布均勻時，最小的 limit 個鍵大約落在 full * limit / 鄰居數 以下
+    threshold = full * np.minimum(1.0, CANDIDATE_FACTOR * limit / np.maximum(counts, 1))
+    candidate = keys < threshold[i]
+    # 候選不到 limit 個的 boid 改用全部配對 (分布不均勻時)
+    short = np.bincount(i[candidate], minlength=len(counts)) < np.minimum(counts, limit)
+    candidate |= short[i]
+    pairs = np.flatnonzero(candidate)
+    order = pairs[np.lexsort((j[pairs], keys[pairs], i[pairs]))]
+    sorted_i = i[order]
+    # 每個配對在同一個 i 之中的名次
+    rank = np.arange(len(order)) - np.searchsorted(sorted_i, sorted_i)
+    return np.sort(order[rank < limit])
+
+
+def directed_sums(i, j, dx, dy, dist_sq, count, columns, separation_distance):
+    # 有方向配對的鄰居總和: 分離方向與數量、鄰居速度與位置的總和、鄰居數量
+    x, y, vx, vy = columns
+    separation = np.zeros((count, 2))
+    alignment = np.zeros((count, 2))
+    cohesion = np.zeros((count, 2))
+
+    close = dist_sq < separation_distance**2
+    ci = i[close]
+    dist = np.sqrt(dist_sq[close])
+    separation_count = np.bincount(ci, minlength=count)
+    separation[:, 0] = np.bincount(ci, weights=dx[close] / dist, minlength=count)
+    separation[:, 1] = np.bincount(ci, weights=dy[close] / dist, minlength=count)
+
+    visible_count = np.bincount(i, minlength=count)
+    alignment[:, 0] = np.bincount(i, weights=vx[j], minlength=count)
+    alignment[:, 1] = np.bincount(i, weights=vy[j], minlength=count)
+    cohesion[:, 0] = np.bincount(i, weights=x[j], minlength=count)
+    cohesion[:, 1] = np.bincount(i, weights=y[j], minlength=count)
+    return separation, separation_count, alignment, cohesion, visible_count
+
+
+def finish_flock_forces(
+    separation,
+    separation_count,
+    alignment,
+    cohesion,
+    visible_count,
+    positions,
+    velocities,
+):
+    # 由鄰居的總和算出平均與轉向 (直接修改傳入的陣列)
+    has_close = separation_count > 0
+    separation[has_close] /= separation_count[has_close, None]
+
+    has_visible = visible_count > 0
+    divisor = visible_count[has_visible, None]
+    alignment[has_visible] /= divisor
+    alignment[has_visible] = _scale_rows(alignment[has_visible], MAX_SPEED)
+    alignment[has_visible] -= velocities[has_visible]
+
+    cohesion[has_visible] /= divisor
+    cohesion[has_visible] -= positions[has_visible]
+    cohesion[has_visible] = _scale_rows(cohesion[has_visible], MAX_SPEED)
+    cohesion[has_visible] -= velocities[has_visible]
+
+
+def clamp_speeds(velocities):
+    # 與 Boid.update 相同的速度上下限 (直接修改傳入的陣列)
+    speed = np.sqrt(np.einsum("ij,ij->i", velocities, velocities))
+    too_fast = speed > MAX_SPEED
+    too_slow = (speed < MIN_SPEED) & (speed > 0)
+    velocities[too_fast] *= (MAX_SPEED / speed[too_fast])[:, None]
+    velocities[too_slow] *= (MIN_SPEED / speed[too_slow])[:, None]
+
+
+# --- NumPy 版的 boids 群體 (structure of arrays) ---
+class NumpyFlock:
+    def __init__(self, positions=None, velocities=None, config=DEFAULT_CONFIG):
+        self.config = config
+        if positions is None:
+            positions = np.empty((0, 2))
+        if velocities is None:
+            velocities = np.zeros_like(positions)
+        self.positions = np.ascontiguousarray(positions, dtype=np.float64).reshape(
+            -1, 2
+        )
+        self.velocities = np.ascontiguousarray(velocities, dtype=np.float64).reshape(
+            -1, 2
+        )
+        self.accelerations = np.zeros_like(self.positions)
+        # 上一步的位置，繪製時可以在兩步之間插值
+        self.previous_positions = self.positions.copy()
+        # 每個 boid 不會改變的 ID (依加入順序遞增，與 BoidStore 相同)
+        self.ids = np.arange(len(self.positions), dtype=np.int64)
+        self.next_id = len(self.positions)
+        # "sample" 鄰居模式抽樣用 (World 會以種子重新建立)
+        self.rng = np.random.default_rng()
+        # 不為 None 時是 verlet.VerletPairs，鄰居配對改用快取的候選
+        self.verlet = None
+
+    @classmethod
+    def from_boids(cls, boids, config=DEFAULT_CONFIG):
+        flock = cls(config=config)
+        flock.add_boids(boids)
+        return flock
+
+    def __len__(self):
+        return len(self.positions)
+
+    def set_state(self, positions, velocities):
+        # 以給定的位置與速度取代整個群體
+        self.positions = np.array(positions, dtype=np.float64).reshape(-1, 2)
+        self.velocities = np.array(velocities, dtype=np.float64).reshape(-1, 2)
+        self.accelerations = np.zeros_like(self.positions)
+        self.previous_positions = self.positions.copy()
+        self.ids = self.new_ids(len(self.positions))
+
+    def new_ids(self, count):
+        ids = np.arange(self.next_id, self.next_id + count, dtype=np.int64)
+        self.next_id += count
+        return ids
+
+    def add_boids(self, boids):
+        if not boids:
+            return
+        positions = np.array([(b.position.x, b.position.y) for b in boids])
+        velocities = np.array([(b.velocity.x, b.velocity.y) for b in boids])
+        self.positions = np.concatenate([self.positions, positions])
+        self.velocities = np.concatenate([self.velocities, velocities])
+        self.accelerations = np.zeros_like(self.positions)
+        self.previous_positions = np.concatenate([self.previous_positions, positions])
+        self.ids = np.concatenate([self.ids, self.new_ids(len(positions))])
+
+    def remove_oldest(self, count):
+        # 陣列維持加入順序，最早加入的就是最前面的 count 個
+        count = min(count, len(self))
+        self.positions = self.positions[count:].copy()
+        self.velocities = self.velocities[count:].copy()
+        self.accelerations = self.accelerations[count:].copy()
+        self.previous_positions = self.previous_positions[count:].copy()
+        self.ids = self.ids[count:].copy()
+
+    def remove(self, mask):
+        keep = ~mask
+        self.positions = self.positions[keep]
+        self.velocities = self.velocities[keep]
+        self.accelerations = self.accelerations[keep]
+        self.previous_positions = self.previous_positions[keep]
+        self.ids = self.ids[keep]
+
+    def flock_forces(self):
+        # 一次算出所有 boids 的分離、對齊、凝聚力
+        positions = self.positions
+        velocities = self.velocities
+        count = len(positions)
+        separation = np.zeros_like(positions)
+        alignment = np.zeros_like(positions)
+        cohesion = np.zeros_like(positions)
+        if count < 2:
+            return separation, alignment, cohesion
+
+        visual_range = self.config.visual_range
+        if self.verlet is not None:
+            i, j = self.verlet.pairs(positions, self.ids)
+        else:
+            i, j = neighbor_pairs(positions, visual_range)
+        if PROFILER.enabled:
+            # 每一對各算一次距離，相當於兩次鄰居檢查
+            PROFILER.add_count("neighbor_checks", 2 * len(i))
+        x = positions[:, 0]
+        y = positions[:, 1]
+        dx = x[i] - x[j]
+        dy = y[i] - y[j]
+        dist_sq = dx * dx + dy * dy
+
+        # 只保留在視野內的配對
+        visible = (dist_sq > 0) & (dist_sq < visual_range**2)
+        i = i[visible]
+        j = j[visible]
+        dx = dx[visible]
+        dy = dy[visible]
+        dist_sq = dist_sq[visible]
+
+        config = self.config
+        if config.neighbor_mode != "metric":
+            # 每個 boid 各自挑選鄰居，配對不再對稱: 展開成雙向後只保留挑中的
+            i, j = np.concatenate([i, j]), np.concatenate([j, i])
+            dx = np.concatenate([dx, -dx])
+            dy = np.concatenate([dy, -dy])
+            dist_sq = np.concatenate([dist_sq, dist_sq])
+            keep = select_pairs(i, j, dist_sq, config, self.rng)
+            columns = (x, y, velocities[:, 0], velocities[:, 1])
+            sums = directed_sums(
+                i[keep],
+                j[keep],
+                dx[keep],
+                dy[keep],
+                dist_sq[keep],
+                count,
+                columns,
+                config.separation_distance,
+            )
+            finish_flock_forces(*sums, positions, velocities)
+            return sums[0], sums[2], sums[3]
+
+        # 分離 (j 收到的方向與 i 相反)
+        close = dist_sq < self.config.separation_distance**2
+        ci = i[close]
+        cj = j[close]
+        dist = np.sqrt(dist_sq[close])
+        ux = dx[close] / dist
+        uy = dy[close] / dist
+        separation_count = np.bincount(ci, minlength=count) + np.bincount(
+            cj, minlength=count
+        )
+        separation[:, 0] = np.bincount(ci, weights=ux, minlength=count) - np.bincount(
+            cj, weights=ux, minlength=count
+        )
+        separation[:, 1] = np.bincount(ci, weights=uy, minlength=count) - np.bincount(
+            cj, weights=uy, minlength=count
+        )
+
+        # 對齊與凝聚
+        visible_count = np.bincount(i, minlength=count) + np.bincount(
+            j, minlength=count
+        )
+        for axis in (0, 1):
+            column = velocities[:, axis]
+            alignment[:, axis] = _pair_sum(i, j, column[i], column[j], count)
+            column = positions[:, axis]
+            cohesion[:, axis] = _pair_sum(i, j, column[i], column[j], count)
+
+        finish_flock_forces(
+            separation,
+            separation_count,
+            alignment,
+            cohesion,
+            visible_count,
+            positions,
+            velocities,
+        )
+        return separation, alignment, cohesion
+
+    # 以下各種力道預設對整個群體計算，也可以只傳入一部分 boids 的位置
+    def edge_forces(self, positions=None):
+        if positions is None:
+            positions = self.positions
+        x = positions[:, 0]
+        y = positions[:, 1]
+        steering = np.zeros_like(positions)
+        steering[:, 0] = np.where(
+            x < EDGE_MARGIN,
+            1.0,
+            np.where(x > self.config.world_width - EDGE_MARGIN, -1.0, 0.0),
+        )
+        steering[:, 1] = np.where(
+            y < EDGE_MARGIN,
+            1.0,
+            np.where(y > self.config.world_height - EDGE_MARGIN, -1.0, 0.0),
+        )
+        return steering
+
+    def predator_forces(self, predators, positions=None):
+        if positions is None:
+            positions = self.positions
+        steering = np.zeros_like(positions)
+        for predator in predators:
+            diff = positions - (predator.position.x, predator.position.y)
+            dist = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+            near = (dist > 0) & (dist < self.config.predator_detection_range)
+            steering[near] += diff[near] / dist[near, None]
+        return steering
+
+    def obstacle_forces(self, obstacles, positions=None):
+        # 只配對位於附近格子的 (boid, 障礙物)，不用每個障礙物都掃過整個群體
+        if positions is None:
+            positions = self.positions
+        if isinstance(obstacles, ObstacleStore) and obstacles.field is not None:
+            # 直接讀預先算好的避障網格
+            return obstacles.field.sample_many(positions)
+        steering = np.zeros_like(positions)
+        if isinstance(obstacles, ObstacleStore):
+            centers, radii = obstacles.arrays()
+        else:
+            centers, radii = obstacle_arrays(obstacles)
+        if len(centers) == 0 or len(positions) == 0:
+            return steering
+
+        reach = radii.max() + OBSTACLE_DETECTION_BUFFER
+        i, j = cross_pairs(positions, centers, reach)
+        diff = positions[i] - centers[j]
+        dist = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+        detection_radius = radii[j] + OBSTACLE_DETECTION_BUFFER
+        near = dist < detection_radius
+        i = i[near]
+        diff = diff[near]
+        d = dist[near]
+        detection_radius = detection_radius[near]
+        strength = (detection_radius - d) / detection_radius
+        # 與 Boid 相同: 距離為 0 時力道也為 0
+        scale = np.where(d > 0, strength * MAX_SPEED / np.where(d > 0, d, 1.0), 0.0)
+        count = len(positions)
+        steering[:, 0] = np.bincount(i, weights=diff[:, 0] * scale, minlength=count)
+        steering[:, 1] = np.bincount(i, weights=diff[:, 1] * scale, minlength=count)
+        return steering
+
+    def step(self, predators, obstacles, dt=1.0):
+        # 所有 boids 同時以上一幀的狀態計算力道，dt 以 1/60 秒為單位
+        with PROFILER.phase("flock_rules"):
+            separation, alignment, cohesion = self.flock_forces()
+
+        config = self.config
+        acceleration = self.accelerations
+        acceleration[:] = 0
+        with PROFILER.phase("obstacle_avoidance"):
+            acceleration += self.obstacle_forces(obstacles) * OBSTACLE_AVOIDANCE_FACTOR
+        acceleration += separation * config.separation_factor
+        acceleration += alignment * config.alignment_factor
+        acceleration += cohesion * config.cohesion_factor
+        acceleration += self.edge_forces() * TURN_FACTOR
+        with PROFILER.phase("predator_avoidance"):
+            acceleration += (
+                self.predator_forces(predators) * config.predator_avoidance_factor
+            )
+
+        if dt != 1.0:
+            acceleration *= dt
+        self.velocities += acceleration
+        clamp_speeds(self.velocities)
+
+        self.previous_positions[:] = self.positions
+        if dt != 1.0:
+            self.positions += self.velocities * dt
+        else:
+            self.positions += self.velocities
+
+    def update_predators(self, predators, obstacles, dt=1.0):
+        # 捕食者追最近的 boid，被吃掉的 boids 在所有捕食者更新後才一起移除
+        if not predators:
+            return 0
+        eaten = hunt_prey(
+            predators, prey_index(self.positions, len(predators)), obstacles, dt
+        )
+        if len(eaten):
+            mask = np.zeros(len(self), dtype=bool)
+            mask[eaten] = True
+            self.remove(mask)
+        return len(eaten)
+
+    def render_positions(self, alpha=1.0):
+        # alpha 為 0 時是上一步的位置，1 時是目前的位置
+        if alpha >= 1.0:
+            return self.positions
+        return (
+            self.previous_positions + (self.positions - self.previous_positions) * alpha
+        )
+
+    def triangles(self, size=BOID_SIZE, alpha=1.0, camera=None):
+        # 與 Boid.draw 相同的三角形，一次算出所有頂點。
+        # camera 不為 None 時只算畫面內的 boids，並轉換成畫面座標
+        positions = self.render_positions(alpha)
+        velocities = self.velocities
+        if camera is not None:
+            visible = camera.visible_mask(positions, size * 2)
+            positions = camera.to_screen_array(positions[visible])
+            velocities = velocities[visible]
+            size *= camera.zoom
+        speed = np.sqrt(np.einsum("ij,ij->i", velocities, velocities))
+        safe = np.where(speed > 0, speed, 1.0)
+        cos = np.where(speed > 0, velocities[:, 0] / safe, 1.0)
+        sin = np.where(speed > 0, velocities[:, 1] / safe, 0.0)
+        local = np.array([(size * 2, 0), (-size, size), (-size, -size)], dtype=float)
+        x = local[None, :, 0] * cos[:, None] - local[None, :, 1] * sin[:, None]
+        y = local[None, :, 0] * sin[:, None] + local[None, :, 1] * cos[:, None]
+        return np.stack([x, y], axis=2) + positions[:, None, :]
+
+    def draw(self, screen, alpha=1.0, camera=None):
+        for triangle in self.triangles(alpha=alpha, camera=camera).tolist():
+            pygame.draw.polygon(screen, (255, 255, 255), triangle)
+
+
+# --- 與 Boid 類別的一致性檢查 ---
+def check_parity(count=300, predator_count=1, obstacle_count=40, seed=0):
+    # 以同一份上一幀狀態各跑一步，回傳位置與速度的最大誤差
+    random.seed(seed)
+    boids = [Boid() for _ in range(count)]
+    predators = [Predator() for _ in range(predator_count)]
+    obstacles = ObstacleStore()
+    obstacles.add_many(
+        (random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT))
+        for _ in range(obstacle_count)
+    )
+
+    flock = NumpyFlock.from_boids(boids)
+    flock.step(predators, obstacles)
+
+    # NumPy 版本是同步更新，所以 Boid 要對照上一幀的快照
+    snapshot = copy.deepcopy(boids)
+    for boid in boids:
+        boid.update(snapshot, predators, obstacles)
+
+    expected_positions = np.array([(b.position.x, b.position.y) for b in boids])
+    expected_velocities = np.array([(b.velocity.x, b.velocity.y) for b in boids])
+    return (
+        float(np.abs(flock.positions - expected_positions).max()),
+        float(np.abs(flock.velocities - expected_velocities).max()),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the NumPy flock engine against Boid and time it."
+    )
+    parser.add_argument("--count", type=int, default=300)
+    parser.add_argument("--bench-count", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    position_error, velocity_error = check_parity(args.count, seed=args.seed)
+    print(f"parity: max position error {position_error:.3e}")
+    print(f"parity: max velocity error {velocity_error:.3e}")
+    if max(position_error, velocity_error) > 1e-9:
+        raise SystemExit("NumPy engine does not match Boid.update")
+
+    random.seed(args.seed)
+    flock = NumpyFlock.from_boids([Boid() for _ in range(args.bench_count)])
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        flock.step([], [])
+    elapsed = (time.perf_counter() - start) / args.steps
+    print(f"{args.bench_count} boids: {elapsed * 1000:.2f} ms/step")
+
+
+if __name__ == "__main__":
+    main()
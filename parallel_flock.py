@@ -0,0 +1,255 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from numpy_flock import (
+    NumpyFlock,
+    cell_index,
+    clamp_speeds,
+    directed_sums,
+    finish_flock_forces,
+    indexed_pairs,
+    select_pairs,
+)
+from profiling import PROFILER
+from simulation import (
+    DEFAULT_CONFIG,
+    OBSTACLE_AVOIDANCE_FACTOR,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    TURN_FACTOR,
+    Boid,
+    ObstacleStore,
+    Predator,
+)
+
+# 預設的 worker 執行緒數量 (每個核心一個)
+PARALLEL_WORKERS = os.cpu_count() or 1
+# 每個 worker 分到的區塊數，多切幾塊可以平衡各區塊 boids 數量的差異
+SHARDS_PER_WORKER = 2
+
+
+# --- 分區平行的 NumPy 群體 ---
+class ShardedFlock(NumpyFlock):
+    # 依 x 座標把群體切成數個直條區塊，交給執行緒池平行計算。
+    # 所有區塊只讀取上一步的位置與速度 (前緩衝區)，結果寫進後緩衝區中各自的列，
+    # 全部完成後再交換緩衝區，所以讀寫不會互相干擾。
+    # 大型陣列的 NumPy 運算會釋放 GIL，執行緒可以同時使用多個核心。
+    def __init__(
+        self,
+        positions=None,
+        velocities=None,
+        config=DEFAULT_CONFIG,
+        workers=PARALLEL_WORKERS,
+    ):
+        super().__init__(positions, velocities, config)
+        self.workers = max(1, workers)
+        self.shard_count = self.workers * SHARDS_PER_WORKER
+        self.pool = ThreadPoolExecutor(self.workers) if self.workers > 1 else None
+        self.next_positions = np.empty_like(self.positions)
+        self.next_velocities = np.empty_like(self.velocities)
+
+    @classmethod
+    def from_boids(cls, boids, config=DEFAULT_CONFIG, workers=PARALLEL_WORKERS):
+        flock = cls(config=config, workers=workers)
+        flock.add_boids(boids)
+        return flock
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def shards(self):
+        # 依 x 座標排序後切成 boids 數量相近的區塊
+        order = np.argsort(self.positions[:, 0], kind="stable")
+        count = min(self.shard_count, len(order))
+        if count == 0:
+            return []
+        return np.array_split(order, count)
+
+    def step_shard(self, shard, columns, index, predators, obstacles, dt, rng=None):
+        # 計算一個區塊內 boids 的下一步，只寫入後緩衝區中這些 boids 的列。
+        # index 是整個群體共用的格子索引 (在主執行緒建立一次)
+        positions = self.positions
+        velocities = self.velocities
+        config = self.config
+        own = positions[shard]
+        count = len(shard)
+        x, y = columns[:2]
+
+        # 區塊內每個 boid 與整個群體中相鄰格子內的 boids 配對
+        visual_range = config.visual_range
+        i, j = indexed_pairs(own, index)
+        if PROFILER.enabled:
+            PROFILER.add_count("neighbor_checks", len(i))
+        dx = x[shard][i] - x[j]
+        dy = y[shard][i] - y[j]
+        dist_sq = dx * dx + dy * dy
+        visible = (dist_sq > 0) & (dist_sq < visual_range**2)
+        i = i[visible]
+        j = j[visible]
+        dx = dx[visible]
+        dy = dy[visible]
+        dist_sq = dist_sq[visible]
+        if config.neighbor_mode != "metric":
+            keep = select_pairs(i, j, dist_sq, config, rng)
+            i = i[keep]
+            j = j[keep]
+            dx = dx[keep]
+            dy = dy[keep]
+            dist_sq = dist_sq[keep]
+
+        separation, separation_count, alignment, cohesion, visible_count = (
+            directed_sums(
+                i, j, dx, dy, dist_sq, count, columns, config.separation_distance
+            )
+        )
+        own_velocities = velocities[shard]
+        finish_flock_forces(
+            separation,
+            separation_count,
+            alignment,
+            cohesion,
+            visible_count,
+            own,
+            own_velocities,
+        )
+
+        # 與 NumpyFlock.step 相同的加總順序
+        acceleration = self.obstacle_forces(obstacles, own) * OBSTACLE_AVOIDANCE_FACTOR
+        acceleration += separation * config.separation_factor
+        acceleration += alignment * config.alignment_factor
+        acceleration += cohesion * config.cohesion_factor
+        acceleration += self.edge_forces(own) * TURN_FACTOR
+        acceleration += (
+            self.predator_forces(predators, own) * config.predator_avoidance_factor
+        )
+
+        if dt != 1.0:
+            acceleration *= dt
+        own_velocities += acceleration
+        clamp_speeds(own_velocities)
+        self.next_velocities[shard] = own_velocities
+        if dt != 1.0:
+            self.next_positions[shard] = own + own_velocities * dt
+        else:
+            self.next_positions[shard] = own + own_velocities
+
+    def step(self, predators, obstacles, dt=1.0):
+        if self.next_positions.shape != self.positions.shape:
+            # boids 數量改變後重新配置後緩衝區
+            self.next_positions = np.empty_like(self.positions)
+            self.next_velocities = np.empty_like(self.velocities)
+        if isinstance(obstacles, ObstacleStore):
+            obstacles.arrays()  # 先在主執行緒建好快取，各區塊只讀取
+
+        # 連續的一維欄位，各區塊取鄰居的值時比二維索引快
+        columns = tuple(
+            np.ascontiguousarray(array[:, axis])
+            for array in (self.positions, self.velocities)
+            for axis in (0, 1)
+        )
+        shards = self.shards()
+        # 所有區塊共用同一份格子索引，每個區塊只取出自己 boids 周圍的格子
+        index = cell_index(self.positions, self.config.visual_range) if shards else None
+        if PROFILER.enabled:
+            PROFILER.set_count("shards", len(shards))
+        # 各區塊使用自己的亂數產生器 (在主執行緒建立)，結果與執行緒的執行順序無關
+        rngs = [None] * len(shards)
+        if self.config.neighbor_mode == "sample":
+            rngs = [
+                np.random.default_rng(seed)
+                for seed in self.rng.integers(2**63, size=len(shards))
+            ]
+        if self.pool is None:
+            for shard, rng in zip(shards, rngs):
+                self.step_shard(shard, columns, index, predators, obstacles, dt, rng)
+        else:
+            futures = [
+                self.pool.submit(
+                    self.step_shard,
+                    shard,
+                    columns,
+                    index,
+                    predators,
+                    obstacles,
+                    dt,
+                    rng,
+                )
+                for shard, rng in zip(shards, rngs)
+            ]
+            for future in futures:
+                future.result()
+
+        # 交換緩衝區: 目前的狀態變成上一步，後緩衝區變成目前的狀態
+        self.previous_positions, self.positions, self.next_positions = (
+            self.positions,
+            self.next_positions,
+            self.previous_positions,
+        )
+        self.velocities, self.next_velocities = self.next_velocities, self.velocities
+
+
+# --- 與 NumpyFlock 的一致性檢查 ---
+def check_parity(count=2000, predator_count=1, obstacle_count=40, workers=2, seed=0):
+    # 以同一份狀態各跑一步，回傳位置與速度的最大誤差
+    random.seed(seed)
+    boids = [Boid() for _ in range(count)]
+    predators = [Predator() for _ in range(predator_count)]
+    obstacles = ObstacleStore()
+    obstacles.add_many(
+        (random.uniform(0, SCREEN_WIDTH), random.uniform(0, SCREEN_HEIGHT))
+        for _ in range(obstacle_count)
+    )
+    expected = NumpyFlock.from_boids(boids)
+    expected.step(predators, obstacles)
+    flock = ShardedFlock.from_boids(boids, workers=workers)
+    flock.step(predators, obstacles)
+    flock.close()
+    return (
+        float(np.abs(flock.positions - expected.positions).max()),
+        float(np.abs(flock.velocities - expected.velocities).max()),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the sharded flock against NumpyFlock and time it."
+    )
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--bench-count", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=PARALLEL_WORKERS)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    position_error, velocity_error = check_parity(
+        args.count, workers=args.workers, seed=args.seed
+    )
+    print(f"parity: max position error {position_error:.3e}")
+    print(f"parity: max velocity error {velocity_error:.3e}")
+    if max(position_error, velocity_error) > 1e-9:
+        raise SystemExit("sharded engine does not match NumpyFlock.step")
+
+    random.seed(args.seed)
+    flock = ShardedFlock.from_boids(
+        [Boid() for _ in range(args.bench_count)], workers=args.workers
+    )
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        flock.step([], [])
+    elapsed = (time.perf_counter() - start) / args.steps
+    flock.close()
+    print(
+        f"{args.bench_count} boids, {args.workers} workers: "
+        f"{elapsed * 1000:.2f} ms/step"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import csv
+import itertools
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+
+# 畫面上的平均值取最近幾幀
+PROFILE_WINDOW = 60
+# 匯出時保留的幀數上限 (60 FPS 下約一分鐘)
+PROFILE_HISTORY = 3600
+
+_NO_PHASE = nullcontext()
+
+
+class _Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+
+
+# --- 各階段計時 ---
+class Profiler:
+    # 以幀為單位累積各階段的耗時與計數器。
+    # 停用時所有方法都立刻返回；每個 boid 都會經過的程式碼只檢查 enabled。
+    def __init__(self, window=PROFILE_WINDOW, history=PROFILE_HISTORY):
+        self.enabled = False
+        self.window = window
+        self.history = deque(maxlen=history)
+        self.times = {}
+        self.counts = {}
+        self.mark = time.perf_counter()
+
+    def reset(self):
+        self.history.clear()
+        self.times = {}
+        self.counts = {}
+        self.mark = time.perf_counter()
+
+    def add_time(self, name, seconds):
+        self.times[name] = self.times.get(name, 0.0) + seconds
+
+    def add_count(self, name, count):
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    def set_count(self, name, count):
+        self.counts[name] = count
+
+    def phase(self, name):
+        # with PROFILER.phase("name"): ... 計算區塊的耗時
+        if not self.enabled:
+            return _NO_PHASE
+        return _Phase(self, name)
+
+    def lap(self, name):
+        # 把上一次 lap (或 end_frame) 到現在的時間記在 name 底下
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.add_time(name, now - self.mark)
+        self.mark = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.history.append((self.times, self.counts))
+        self.times = {}
+        self.counts = {}
+        self.mark = time.perf_counter()
+
+    def names(self):
+        # 出現過的階段與計數器名稱，依第一次出現的順序
+        times = {}
+        counts = {}
+        for frame_times, frame_counts in self.history:
+            times.update(dict.fromkeys(frame_times))
+            counts.update(dict.fromkeys(frame_counts))
+        return list(times), list(counts)
+
+    def averages(self, window=None):
+        # 最近 window 幀的平均: 耗時以毫秒表示
+        start = max(0, len(self.history) - (window or self.window))
+        recent = list(itertools.islice(self.history, start, None))
+        if not recent:
+            return {}
+        time_names, count_names = self.names()
+        result = {
+            f"{name}_ms": sum(t.get(name, 0.0) for t, _ in recent) * 1000 / len(recent)
+            for name in time_names
+        }
+        for name in count_names:
+            # 計數器只平均有記錄的幀 (沒有跑物理的幀不算)
+            values = [c[name] for _, c in recent if name in c]
+            result[name] = sum(values) / len(values) if values else 0.0
+        return result
+
+    def rows(self):
+        time_names, count_names = self.names()
+        for index, (times, counts) in enumerate(self.history):
+            row = {"frame": index}
+            for name in time_names:
+                row[f"{name}_ms"] = times.get(name, 0.0) * 1000
+            for name in count_names:
+                row[name] = counts.get(name, 0)
+            yield row
+
+    def export(self, path):
+        # 副檔名為 .csv 時寫成表格，其他寫成 JSON (每幀一筆加上平均值)
+        rows = list(self.rows())
+        if path.endswith(".csv"):
+            time_names, count_names = self.names()
+            fieldnames = ["frame"] + [f"{name}_ms" for name in time_names] + count_names
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, "w") as f:
+                averages = self.averages(len(self.history))
+                json.dump({"averages": averages, "frames": rows}, f, indent=2)
+
+
+# 整個程式共用的計時器，預設停用
+PROFILER = Profiler()
@@ -0,0 +1,166 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from revision import git_commit
+from scenario import load_scenarios
+
+SCENARIO_DIR = "scenarios"
+BASELINE_FILE = "baselines.json"
+# 比對基準的指標與預設允許的相對誤差 (|測量值 - 基準| <= 誤差 * |基準|，
+# 場景檔的 "tolerance" 可以覆寫)。steps_per_second 只檢查變慢；其餘指標檢查兩個方向。
+# 同一台機器上同樣的種子結果完全相同；留一點空間給換了浮點運算順序的最佳化
+TOLERANCE = {
+    "steps_per_second": 0.25,
+    "survivors": 0.02,
+    "eaten": 0.2,
+    "mean_nearest_neighbor_distance": 0.05,
+    "polarization": 0.1,
+}
+METRICS = list(TOLERANCE)
+# 每個場景執行幾次，取最快的 steps_per_second (其他指標每次都相同)
+REPEAT = 3
+
+
+# --- 回歸測試 ---
+def run_one(job):
+    # 在 worker 行程中執行一個場景，只回傳要比對的指標。
+    # 取多次中最快的一次，減少其他行程干擾造成的誤判
+    scenario, repeat = job
+    result = scenario.run()
+    for _ in range(repeat - 1):
+        result["steps_per_second"] = max(
+            result["steps_per_second"], scenario.run()["steps_per_second"]
+        )
+    return {metric: result[metric] for metric in METRICS}
+
+
+def run_scenarios(scenarios, workers=None, repeat=REPEAT):
+    # 每個核心一個 worker。同時執行的場景會互相搶 CPU，
+    # 所以記錄與比對基準時要使用相同的 workers
+    jobs = [(scenario, repeat) for scenario in scenarios]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return dict(
+            zip((scenario.name for scenario in scenarios), pool.map(run_one, jobs))
+        )
+
+
+def compare(scenario, measured, baseline):
+    # 回傳超出容許範圍的指標說明 (空的 list 表示通過)
+    tolerance = {**TOLERANCE, **scenario.tolerance}
+    failures = []
+    for metric in METRICS:
+        expected = baseline.get(metric)
+        value = measured[metric]
+        if expected is None:
+            continue
+        allowed = tolerance[metric] * abs(expected)
+        # NaN 與任何值比較都是 False，只要有一邊是 NaN 就算失敗
+        if math.isnan(value) or math.isnan(expected):
+            off = True
+        elif metric == "steps_per_second":
+            off = value < expected - allowed
+        else:
+            off = abs(value - expected) > allowed
+        if off:
+            failures.append(f"{metric} {value:.4g} (baseline {expected:.4g})")
+    return failures
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {"scenarios": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_baselines(path, results, workers, previous):
+    # 只更新這次執行的場景，其他場景的基準保留
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "workers": workers,
+        "scenarios": {**previous.get("scenarios", {}), **results},
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run scenario files headless in a process pool and compare "
+        "throughput and flock metrics against stored baselines."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[SCENARIO_DIR],
+        help="scenario files or directories of *.json scenarios",
+    )
+    parser.add_argument("--baselines", default=BASELINE_FILE)
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="record the measured values as the new baselines instead of checking",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=REPEAT,
+        help="runs per scenario; the fastest one is compared",
+    )
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    try:
+        scenarios = load_scenarios(args.paths)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if not scenarios:
+        parser.error(f"no scenarios found in {', '.join(args.paths)}")
+
+    workers = args.workers or os.cpu_count()
+    baselines = load_baselines(args.baselines)
+    if not args.update and baselines.get("workers") not in (None, workers):
+        print(
+            f"warning: baselines were recorded with {baselines['workers']} workers, "
+            f"running with {workers}"
+        )
+    results = run_scenarios(scenarios, workers, args.repeat)
+
+    if args.update:
+        write_baselines(args.baselines, results, workers, baselines)
+        for name, measured in results.items():
+            print(f"{name:<24} {measured['steps_per_second']:>9.1f} steps/s")
+        print(f"{len(results)} baselines written to {args.baselines}")
+        return 0
+
+    failed = 0
+    for scenario in scenarios:
+        measured = results[scenario.name]
+        baseline = baselines["scenarios"].get(scenario.name)
+        if baseline is None:
+            failures = ["no baseline (record one with --update)"]
+        else:
+            failures = compare(scenario, measured, baseline)
+        status = "FAIL" if failures else "ok"
+        print(
+            f"{status:<4} {scenario.name:<24} "
+            f"{measured['steps_per_second']:>9.1f} steps/s"
+        )
+        for failure in failures:
+            print(f"       {failure}")
+        failed += bool(failures)
+    print(f"{len(scenarios) - failed}/{len(scenarios)} scenarios passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import pygame
+
+from numpy_flock import NumpyFlock
+from simulation import DEFAULT_CONFIG, Predator, SimConfig
+from trajectory import TrajectoryStream
+
+# 快轉倍率的上限 (每個畫面幀前進的紀錄數)
+MAX_REPLAY_SPEED = 64
+
+
+# --- 重播的一幀 ---
+class ReplayFrame:
+    # 與 World 相同的繪製介面 (boids, predators, flock, obstacles)，
+    # 可以直接交給 main.draw_world，不做任何物理計算
+    def __init__(self, record, config=DEFAULT_CONFIG):
+        boids = record["boids"][: record["boid_count"]]
+        self.boids = []
+        self.flock = NumpyFlock(boids[:, :2], boids[:, 2:4], config)
+        self.predators = [
+            Predator.from_state(p[:2], p[2:4], config, can_eat=bool(p[4]))
+            for p in record["predators"][: record["predator_count"]].tolist()
+        ]
+        self.obstacles = [
+            {"center": pygame.math.Vector2(x, y), "radius": radius}
+            for x, y, radius in record["obstacles"][: record["obstacle_count"]].tolist()
+        ]
+        self.frame = int(record["frame"])
+
+
+# --- 重播控制 ---
+class ReplayPlayer:
+    # 依照播放狀態決定下一個要顯示的紀錄，每次只讀一筆
+    def __init__(self, path, speed=1, start=0):
+        self.stream = TrajectoryStream(path)
+        if not len(self.stream):
+            self.stream.close()
+            raise ValueError(f"{path} contains no recorded frames")
+        config = self.stream.header.get("config")
+        self.config = SimConfig(**config) if config else DEFAULT_CONFIG
+        self.index = 0
+        self.speed = 1
+        self.playing = True
+        self.set_speed(speed)
+        self.seek(start)
+
+    def __len__(self):
+        return len(self.stream)
+
+    def close(self):
+        self.stream.close()
+
+    def seek(self, index):
+        self.index = max(0, min(int(index), len(self) - 1))
+
+    def set_speed(self, speed):
+        # speed 筆紀錄中只顯示最後一筆 (快轉時跳過中間的幀)
+        self.speed = max(1, min(int(speed), MAX_REPLAY_SPEED))
+
+    def step(self, count=1):
+        # 暫停時手動前進或後退
+        self.seek(self.index + count)
+
+    def advance(self):
+        # 每個畫面幀呼叫一次，播放中時前進 speed 筆，到結尾時停住
+        if self.playing:
+            self.seek(self.index + self.speed)
+            if self.index == len(self) - 1:
+                self.playing = False
+
+    def current(self):
+        return ReplayFrame(self.stream.read(self.index), self.config)
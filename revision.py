@@ -0,0 +1,14 @@
+import subprocess
+
+
+def git_commit():
+    # 目前 HEAD 的短雜湊，不在 git 倉庫中或沒有 git 時回傳 None
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
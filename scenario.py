@@ -0,0 +1,259 @@
+import dataclasses
+import json
+import math
+import os
+
+from headless import run_headless
+from simulation import (
+    BOID_COUNT,
+    DEFAULT_CONFIG,
+    ENGINES,
+    MAX_PREDATORS,
+    NEIGHBOR_MODES,
+    OBSTACLE_RADIUS,
+    SIMULATION_ENGINE,
+    SYNCHRONOUS_UPDATE,
+    USE_OBSTACLE_FIELD,
+    USE_VERLET_LIST,
+    SimConfig,
+)
+
+CONFIG_TYPES = {field.name: field.type for field in dataclasses.fields(SimConfig)}
+OBSTACLE_SHAPES = ("point", "line", "ring", "random")
+# 事件可以做的事 (同一個事件裡依這個順序套用)
+EVENT_ACTIONS = (
+    "predators",
+    "eat",
+    "add_boids",
+    "remove_boids",
+    "clear_obstacles",
+    "obstacles",
+)
+
+
+# --- 場景檔 ---
+@dataclasses.dataclass
+class Scenario:
+    # 一個 JSON 場景檔: 初始的群體、障礙物配置、依步數觸發的事件與總步數。
+    # 障礙物配置是 {"shape": ..., "radius": ...} 的 list (見 obstacle_centers)；
+    # 事件是 {"step": N, 動作: 值, ...}，在第 N 步之前套用 (0 表示開始之前)。
+    # tolerance 覆寫回歸測試中各項指標允許的相對誤差
+    name: str
+    boids: int = BOID_COUNT
+    seed: int = 0
+    steps: int = 1000
+    engine: str = SIMULATION_ENGINE
+    synchronous: bool = SYNCHRONOUS_UPDATE
+    use_verlet_list: bool = USE_VERLET_LIST
+    obstacle_field: bool = USE_OBSTACLE_FIELD
+    predators: int = 0
+    eat: bool = False
+    config: SimConfig = DEFAULT_CONFIG
+    obstacles: list = dataclasses.field(default_factory=list)
+    events: list = dataclasses.field(default_factory=list)
+    tolerance: dict = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data, name=None):
+        data = dict(data)
+        data.setdefault("name", name)
+        fields = {field.name for field in dataclasses.fields(cls)}
+        unknown = set(data) - fields
+        if unknown:
+            raise ValueError(
+                f"unknown scenario keys {sorted(unknown)}, "
+                f"expected: {', '.join(sorted(fields))}"
+            )
+        if not data["name"]:
+            raise ValueError("scenario needs a name")
+        data["config"] = parse_config(data.get("config", {}))
+        scenario = cls(**data)
+        scenario.validate()
+        return scenario
+
+    @classmethod
+    def load(cls, path):
+        # 沒有 "name" 時以檔名 (不含副檔名) 作為名稱
+        with open(path) as f:
+            data = json.load(f)
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            return cls.from_dict(data, name)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from None
+
+    def validate(self):
+        if self.engine not in ENGINES:
+            raise ValueError(
+                f"invalid engine {self.engine!r}, expected one of: {', '.join(ENGINES)}"
+            )
+        if self.boids < 0 or self.steps < 0:
+            raise ValueError("boids and steps must not be negative")
+        if not 0 <= self.predators <= MAX_PREDATORS:
+            raise ValueError(f"predators must be between 0 and {MAX_PREDATORS}")
+        for layout in self.obstacles:
+            validate_layout(layout)
+        for event in self.events:
+            if not isinstance(event.get("step"), int) or event["step"] < 0:
+                raise ValueError(f"event {event!r} needs a non-negative integer step")
+            actions = set(event) - {"step"}
+            if not actions or not actions <= set(EVENT_ACTIONS):
+                raise ValueError(
+                    f"invalid event {event!r}, expected actions: "
+                    f"{', '.join(EVENT_ACTIONS)}"
+                )
+            if not 0 <= event.get("predators", 0) <= MAX_PREDATORS:
+                raise ValueError(f"predators must be between 0 and {MAX_PREDATORS}")
+            for layout in event.get("obstacles", []):
+                validate_layout(layout)
+
+    def run(self, include_state=False, profile=None):
+        # 無畫面執行，回傳與 run_headless 相同的結果 (多了 "scenario" 名稱)
+        runner = ScenarioRunner(self)
+        result = run_headless(
+            boid_count=self.boids,
+            steps=self.steps,
+            seed=self.seed,
+            engine=self.engine,
+            predators=self.predators,
+            can_eat=self.eat,
+            config=self.config,
+            include_state=include_state,
+            synchronous=self.synchronous,
+            profile=profile,
+            on_step=runner.after_step,
+            use_verlet_list=self.use_verlet_list,
+            setup=runner.setup,
+            obstacle_field=self.obstacle_field,
+        )
+        return {"scenario": self.name, **result}
+
+
+def parse_config(overrides):
+    # {"separation_factor": 0.05} -> 覆寫預設值後的 SimConfig
+    unknown = set(overrides) - set(CONFIG_TYPES)
+    if unknown:
+        raise ValueError(
+            f"unknown config keys {sorted(unknown)}, "
+            f"expected: {', '.join(CONFIG_TYPES)}"
+        )
+    values = {name: CONFIG_TYPES[name](value) for name, value in overrides.items()}
+    if values.get("neighbor_mode", "metric") not in NEIGHBOR_MODES:
+        raise ValueError(
+            f"invalid neighbor_mode {values['neighbor_mode']!r}, "
+            f"expected one of: {', '.join(NEIGHBOR_MODES)}"
+        )
+    return dataclasses.replace(DEFAULT_CONFIG, **values)
+
+
+def validate_layout(layout):
+    shape = layout.get("shape")
+    if shape not in OBSTACLE_SHAPES:
+        raise ValueError(
+            f"invalid obstacle layout {layout!r}, "
+            f"expected shape one of: {', '.join(OBSTACLE_SHAPES)}"
+        )
+    required = {
+        "point": ("center",),
+        "line": ("start", "end", "count"),
+        "ring": ("center", "ring_radius", "count"),
+        "random": ("count",),
+    }[shape]
+    missing = [key for key in required if key not in layout]
+    if missing:
+        raise ValueError(f"obstacle layout {layout!r} is missing {missing}")
+
+
+# --- 障礙物配置 ---
+def obstacle_centers(layout, world):
+    # point: 一個在 center 的障礙物
+    # line: count 個平均分布在 start 到 end 之間 (包含兩端)
+    # ring: count 個平均分布在以 center 為圓心、ring_radius 為半徑的圓上
+    # random: count 個隨機分布在整個世界 (使用世界的亂數，同樣的種子位置相同)
+    shape = layout["shape"]
+    if shape == "point":
+        return [tuple(layout["center"])]
+    count = layout["count"]
+    if shape == "line":
+        (x0, y0), (x1, y1) = layout["start"], layout["end"]
+        span = max(count - 1, 1)
+        return [
+            (x0 + (x1 - x0) * k / span, y0 + (y1 - y0) * k / span) for k in range(count)
+        ]
+    if shape == "ring":
+        cx, cy = layout["center"]
+        r = layout["ring_radius"]
+        return [
+            (
+                cx + r * math.cos(2 * math.pi * k / count),
+                cy + r * math.sin(2 * math.pi * k / count),
+            )
+            for k in range(count)
+        ]
+    rng = world.rng
+    return [
+        (
+            rng.uniform(0, world.config.world_width),
+            rng.uniform(0, world.config.world_height),
+        )
+        for _ in range(count)
+    ]
+
+
+def place_obstacles(world, layouts):
+    for layout in layouts:
+        world.obstacles.add_many(
+            obstacle_centers(layout, world), layout.get("radius", OBSTACLE_RADIUS)
+        )
+
+
+class ScenarioRunner:
+    # 把場景的障礙物與事件套用到 run_headless 的 world 上
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self.events = {}
+        for event in scenario.events:
+            self.events.setdefault(event["step"], []).append(event)
+        self.can_eat = scenario.eat
+
+    def setup(self, world):
+        place_obstacles(world, self.scenario.obstacles)
+        self.apply(world, 0)
+
+    def after_step(self, world):
+        # world.frame 是已經完成的步數，也就是下一步的編號
+        self.apply(world, world.frame)
+
+    def apply(self, world, step):
+        for event in self.events.get(step, ()):
+            if "eat" in event:
+                self.can_eat = bool(event["eat"])
+            count = event.get("predators", len(world.predators))
+            world.set_predators(count, self.can_eat)
+            if "add_boids" in event:
+                world.add_boids(event["add_boids"])
+            if "remove_boids" in event:
+                world.remove_oldest_boids(event["remove_boids"])
+            if event.get("clear_obstacles"):
+                world.obstacles.clear()
+            place_obstacles(world, event.get("obstacles", ()))
+
+
+def load_scenarios(paths):
+    # 檔案直接讀取，目錄則讀取其中所有的 *.json (依檔名排序)
+    scenarios = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(path, name)
+                for name in os.listdir(path)
+                if name.endswith(".json")
+            )
+        else:
+            files = [path]
+        scenarios.extend(Scenario.load(file) for file in files)
+    names = [scenario.name for scenario in scenarios]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate scenario names: {', '.join(duplicates)}")
+    return scenarios
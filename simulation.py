@@ -0,0 +1,1127 @@
+import heapq
+import math
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+import pygame
+
+from profiling import PROFILER
+
+# --- 常數設定 ---
+SCREEN_WIDTH = 1280
+SCREEN_HEIGHT = 720
+# 模擬世界的大小，可以比視窗大 (以攝影機平移與縮放檢視)
+WORLD_WIDTH = SCREEN_WIDTH
+WORLD_HEIGHT = SCREEN_HEIGHT
+BOID_COUNT = 75
+BOID_SIZE = 5
+MAX_SPEED = 4
+MIN_SPEED = 2
+
+# Boids 演算法參數
+VISUAL_RANGE = 75
+SEPARATION_DISTANCE = 25
+
+# 鄰居查詢: True 使用空間網格，False 使用原本的暴力搜尋 (方便比較兩者)
+USE_SPATIAL_GRID = True
+# True 時使用 Verlet 鄰居清單 (verlet.py): 候選清單多留一段距離，
+# 只在 boids 可能移動超過該距離的一半時才重建，優先於 USE_SPATIAL_GRID
+USE_VERLET_LIST = False
+# True 時在同一個迴圈裡一次算完分離、對齊、凝聚 (每對 boid 只算一次距離)
+USE_FUSED_NEIGHBOR_LOOP = True
+# 鄰居的選法: "metric" 使用視野內所有 boids；"topological" 只取視野內最近的
+# NEIGHBOR_LIMIT 個 (類似椋鳥群的模型)；"sample" 超過 NEIGHBOR_LIMIT 個時隨機抽出
+# NEIGHBOR_LIMIT 個。後兩者讓每個 boid 的計算量不會隨密度增加
+NEIGHBOR_MODE = "metric"
+NEIGHBOR_MODES = ("metric", "topological", "sample")
+NEIGHBOR_LIMIT = 7
+# "sample" 模式下物件引擎每個 boid 最多檢查 NEIGHBOR_LIMIT 的幾倍個候選 (從網格直接抽出)，
+# 密度再高，每個 boid 的計算量也有固定上限
+SAMPLE_CANDIDATE_FACTOR = 8
+# 模擬引擎: "objects" 使用 Boid 物件，"numpy" 使用 numpy_flock.NumpyFlock 陣列，
+# "parallel" 使用 parallel_flock.ShardedFlock (分區後以多個執行緒計算)
+SIMULATION_ENGINE = "objects"
+ENGINES = ("objects", "numpy", "parallel")
+# True 時 Boid 物件引擎也同步更新: 所有 boids 都以上一步的狀態計算，
+# 結果與串列順序無關 (NumPy 引擎本來就是這樣)
+SYNCHRONOUS_UPDATE = False
+
+# 規則權重
+SEPARATION_FACTOR = 0.05
+ALIGNMENT_FACTOR = 0.05
+COHESION_FACTOR = 0.0005
+EDGE_MARGIN = 50
+TURN_FACTOR = 0.2
+# 提高避障的權重，讓它成為更優先的行為
+OBSTACLE_AVOIDANCE_FACTOR = 0.5
+
+# 捕食者參數
+PREDATOR_SIZE = 10
+PREDATOR_SPEED = 4.5
+PREDATOR_COLOR = (255, 60, 60)
+PREDATOR_PEACEFUL_COLOR = (150, 0, 255)
+PREDATOR_DETECTION_RANGE = 150
+PREDATOR_AVOIDANCE_FACTOR = 0.25
+HUNTING_FACTOR = 0.05
+PREDATOR_EAT_DISTANCE = 7
+# 開啟捕食者時加入的數量 (介面和 --predators 可以調整)
+PREDATOR_COUNT = 1
+MAX_PREDATORS = 200
+# 捕食者查詢獵物用的網格大小
+PREY_CELL_SIZE = 32
+# 捕食者少於這個數量時直接掃描全部 boids，比建網格快
+PREY_GRID_MIN_PREDATORS = 4
+
+# 環境參數
+OBSTACLE_COLOR = (120, 120, 120)
+OBSTACLE_RADIUS = 20
+# 設定一個緩衝區，讓 boid 提早反應
+OBSTACLE_DETECTION_BUFFER = 40
+# True 時障礙物的避障力道改從預先算好的網格 (ObstacleField) 讀取
+USE_OBSTACLE_FIELD = False
+# 避障網格的間距 (像素)，以及是否在四個網格點之間雙線性內插
+OBSTACLE_FIELD_CELL_SIZE = 8
+OBSTACLE_FIELD_INTERPOLATE = True
+
+
+# --- 模擬設定 ---
+# 可調整的參數集中在一個設定物件中，預設值就是上面的常數。
+# 每個模擬都帶著自己的設定，參數掃描時不需要修改模組的全域變數。
+@dataclass(frozen=True)
+class SimConfig:
+    visual_range: float = VISUAL_RANGE
+    separation_distance: float = SEPARATION_DISTANCE
+    separation_factor: float = SEPARATION_FACTOR
+    alignment_factor: float = ALIGNMENT_FACTOR
+    cohesion_factor: float = COHESION_FACTOR
+    predator_speed: float = PREDATOR_SPEED
+    predator_detection_range: float = PREDATOR_DETECTION_RANGE
+    predator_avoidance_factor: float = PREDATOR_AVOIDANCE_FACTOR
+    hunting_factor: float = HUNTING_FACTOR
+    predator_eat_distance: float = PREDATOR_EAT_DISTANCE
+    world_width: float = WORLD_WIDTH
+    world_height: float = WORLD_HEIGHT
+    neighbor_mode: str = NEIGHBOR_MODE
+    neighbor_limit: int = NEIGHBOR_LIMIT
+
+
+DEFAULT_CONFIG = SimConfig()
+
+
+# --- 空間網格 (鄰居查詢) ---
+class SpatialGrid:
+    # 每幀開始時依照位置把 boids 放進格子裡。
+    # 格子大小多加 MAX_SPEED，因為同一幀內先更新的 boid 最多會移動 MAX_SPEED，
+    # 這樣查詢周圍 3x3 格仍然能找到所有在 VISUAL_RANGE 內的鄰居。
+    # (dt > 1 時 World.step 依 MAX_SPEED * dt 加大格子)
+    def __init__(self, cell_size=VISUAL_RANGE + MAX_SPEED):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def rebuild(self, boids):
+        self.cells = {}
+        for index, boid in enumerate(boids):
+            key = (
+                int(boid.position.x // self.cell_size),
+                int(boid.position.y // self.cell_size),
+            )
+            self.cells.setdefault(key, []).append((index, boid))
+
+    def neighbors(self, boid):
+        # Boid.steer 使用的介面 (與 verlet.VerletList 相同)
+        return self.query(boid.position)
+
+    def query(self, position):
+        cx = int(position.x // self.cell_size)
+        cy = int(position.y // self.cell_size)
+        found = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                cell = self.cells.get((cx + dx, cy + dy))
+                if cell:
+                    found.extend(cell)
+        # 依原本列表順序排列，讓浮點數加總的結果與暴力搜尋完全相同
+        found.sort(key=lambda item: item[0])
+        return [boid for _, boid in found]
+
+    def sample_neighbors(self, boid, count, rng):
+        # "sample" 鄰居模式用: 與 query 相同的 3x3 格子，但候選超過 count 個時
+        # 直接從各格的 list 抽出 count 個，只排序抽到的候選
+        cx = int(boid.position.x // self.cell_size)
+        cy = int(boid.position.y // self.cell_size)
+        cells = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                cell = self.cells.get((cx + dx, cy + dy))
+                if cell:
+                    cells.append(cell)
+        total = sum(len(cell) for cell in cells)
+        if total <= count:
+            found = [item for cell in cells for item in cell]
+        else:
+            found = []
+            for pick in rng.sample(range(total), count):
+                for cell in cells:
+                    if pick < len(cell):
+                        found.append(cell[pick])
+                        break
+                    pick -= len(cell)
+        found.sort(key=lambda item: item[0])
+        return [other for _, other in found]
+
+
+# --- 獵物索引 (所有捕食者共用) ---
+class PreyIndex:
+    # 每幀捕食者更新前，以所有 boids 的位置建一次網格 (依格子排序的索引 + 每格的起點)。
+    # 最近的 boid 與吃得到的 boids 都只查詢附近的格子，不需要每個捕食者各掃描一次全部。
+    # 距離的算法與 Vector2.distance_to 相同，距離相同時取索引較小的，
+    # 所以結果與依序走訪整個 list 完全一致。use_grid 為 False 時每次查詢都掃描全部。
+    def __init__(self, positions, cell_size=PREY_CELL_SIZE, use_grid=True):
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        self.cell_size = cell_size
+        self.use_grid = use_grid and len(self.positions) > 0
+        if not self.use_grid:
+            return
+        cells = np.floor(self.positions / cell_size).astype(np.int64)
+        self.origin = cells.min(axis=0)
+        cells -= self.origin
+        self.shape = cells.max(axis=0) + 1
+        keys = cells[:, 0] * self.shape[1] + cells[:, 1]
+        # 穩定排序: 同一格內維持原本的索引順序
+        self.order = np.argsort(keys, kind="stable")
+        self.starts = np.searchsorted(
+            keys[self.order], np.arange(self.shape[0] * self.shape[1] + 1)
+        )
+
+    def __len__(self):
+        return len(self.positions)
+
+    def cell_of(self, point):
+        # 網格外的點歸到最近的邊緣格子，距離的下限仍然成立
+        cx = math.floor(point[0] / self.cell_size) - self.origin[0]
+        cy = math.floor(point[1] / self.cell_size) - self.origin[1]
+        return (
+            min(max(cx, 0), self.shape[0] - 1),
+            min(max(cy, 0), self.shape[1] - 1),
+        )
+
+    def gather(self, cells):
+        starts = self.starts
+        height = self.shape[1]
+        chunks = [
+            self.order[starts[key] : starts[key + 1]]
+            for key in (cx * height + cy for cx, cy in cells)
+            if starts[key] < starts[key + 1]
+        ]
+        if not chunks:
+            return None
+        return np.concatenate(chunks)
+
+    def distances(self, candidates, point):
+        dx = self.positions[candidates, 0] - point[0]
+        dy = self.positions[candidates, 1] - point[1]
+        return np.sqrt(dx * dx + dy * dy)
+
+    def nearest(self, point):
+        # 回傳 (索引, 距離)，沒有 boids 時回傳 (None, inf)
+        best, best_distance = None, float("inf")
+        if not len(self):
+            return best, best_distance
+        if not self.use_grid:
+            dist = self.distances(slice(None), point)
+            best = int(np.argmin(dist))  # 相同距離時是第一個
+            return best, float(dist[best])
+        cx, cy = self.cell_of(point)
+        width, height = self.shape
+        # 第一次查中心周圍 3x3 格，之後每次多查外面一圈
+        ring = 1
+        while True:
+            # 與中心格的切比雪夫距離為 ring 的格子
+            x0, x1 = max(cx - ring, 0), min(cx + ring, width - 1)
+            y0, y1 = max(cy - ring, 0), min(cy + ring, height - 1)
+            cells = [
+                (x, y)
+                for x in range(x0, x1 + 1)
+                for y in range(y0, y1 + 1)
+                if ring == 1 or max(abs(x - cx), abs(y - cy)) == ring
+            ]
+            candidates = self.gather(cells)
+            if candidates is not None:
+                dist = self.distances(candidates, point)
+                closest = dist.min()
+                index = int(candidates[dist == closest].min())
+                if closest < best_distance or (
+                    closest == best_distance and index < best
+                ):
+                    best, best_distance = index, float(closest)
+            # 下一圈的點至少在 ring 個格子以外
+            if best_distance < ring * self.cell_size:
+                return best, best_distance
+            if ring >= max(cx, cy, width - 1 - cx, height - 1 - cy):
+                return best, best_distance
+            ring += 1
+
+    def within(self, point, radius):
+        # 距離小於 radius 的 boids，回傳依索引排序的 (索引, 距離)
+        if not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        if not self.use_grid:
+            dist = self.distances(slice(None), point)
+            inside = np.flatnonzero(dist < radius)
+            return inside, dist[inside]
+        x0, y0 = self.cell_of((point[0] - radius, point[1] - radius))
+        x1, y1 = self.cell_of((point[0] + radius, point[1] + radius))
+        candidates = self.gather(
+            (x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)
+        )
+        if candidates is None:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        dist = self.distances(candidates, point)
+        inside = dist < radius
+        candidates = candidates[inside]
+        dist = dist[inside]
+        order = np.argsort(candidates)
+        return candidates[order], dist[order]
+
+
+def prey_index(positions, predator_count):
+    return PreyIndex(positions, use_grid=predator_count >= PREY_GRID_MIN_PREDATORS)
+
+
+def hunt_prey(predators, prey, obstacles, dt=1.0):
+    # 依序更新所有捕食者，回傳這一步被吃掉的 boids 索引 (由小到大)。
+    # 同一個 boid 被多個捕食者抓到時算給最近的捕食者 (距離相同時取列表中較前面的)
+    caught_boids = []
+    caught_distances = []
+    caught_by = []
+    for number, predator in enumerate(predators):
+        eaten, distances = predator.update(prey, obstacles, dt)
+        if len(eaten):
+            caught_boids.append(eaten)
+            caught_distances.append(distances)
+            caught_by.append(np.full(len(eaten), number))
+    if not caught_boids:
+        return np.empty(0, dtype=np.int64)
+    boids = np.concatenate(caught_boids)
+    distances = np.concatenate(caught_distances)
+    hunters = np.concatenate(caught_by)
+    order = np.lexsort((hunters, distances, boids))
+    boids = boids[order]
+    first = np.ones(len(boids), dtype=bool)
+    first[1:] = boids[1:] != boids[:-1]
+    for number in hunters[order][first].tolist():
+        predators[number].kills += 1
+    return boids[first]
+
+
+# --- 障礙物 (空間網格) ---
+class ObstacleStore:
+    # 以障礙物中心所在的格子分組，查詢和移除都只需要看附近的格子。
+    # 障礙物仍然是 {"center": Vector2, "radius": ...} 的 dict，
+    # 走訪時依照加入的順序，與原本的 list 相同。
+    def __init__(self, cell_size=OBSTACLE_RADIUS + OBSTACLE_DETECTION_BUFFER):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.obstacles = {}
+        self.keys = {}
+        self.next_id = 0
+        self.max_radius = 0
+        self.cached_arrays = None
+        # 障礙物改變時通知的對象 (例如預先畫好的障礙物圖層)
+        self.listeners = []
+        # 附加的避障網格 (ObstacleField)，None 時逐一計算每個障礙物
+        self.field = None
+
+    def __len__(self):
+        return len(self.obstacles)
+
+    def __iter__(self):
+        return iter(self.obstacles.values())
+
+    def subscribe(self, listener):
+        # listener 需要有 obstacle_added(obs)、obstacle_removed(obs)、obstacles_cleared()
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+
+    def cell_key(self, point):
+        return (int(point[0] // self.cell_size), int(point[1] // self.cell_size))
+
+    def add(self, center, radius=OBSTACLE_RADIUS):
+        obs = {"center": pygame.math.Vector2(center), "radius": radius}
+        obstacle_id = self.next_id
+        self.next_id += 1
+        key = self.cell_key(obs["center"])
+        self.obstacles[obstacle_id] = obs
+        self.keys[obstacle_id] = key
+        self.cells.setdefault(key, {})[obstacle_id] = obs
+        self.max_radius = max(self.max_radius, radius)
+        self.cached_arrays = None
+        for listener in self.listeners:
+            listener.obstacle_added(obs)
+        return obs
+
+    def add_many(self, centers, radius=OBSTACLE_RADIUS):
+        return [self.add(center, radius) for center in centers]
+
+    def ids_near(self, point, reach):
+        # 中心在 point 周圍 reach + 最大半徑 範圍內的障礙物 id (依加入順序)
+        extent = reach + self.max_radius
+        x0, y0 = self.cell_key((point[0] - extent, point[1] - extent))
+        x1, y1 = self.cell_key((point[0] + extent, point[1] + extent))
+        found = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell:
+                    found.extend(cell)
+        found.sort()
+        return found
+
+    def query(self, point, reach):
+        # 邊緣在 point 的 reach 範圍內的候選障礙物
+        obstacles = self.obstacles
+        return [obstacles[obstacle_id] for obstacle_id in self.ids_near(point, reach)]
+
+    def remove_at(self, point):
+        # 移除第一個包含 point 的障礙物，回傳被移除的障礙物 (沒有則回傳 None)
+        point = pygame.math.Vector2(point)
+        for obstacle_id in self.ids_near(point, 0):
+            obs = self.obstacles[obstacle_id]
+            if point.distance_to(obs["center"]) < obs["radius"]:
+                del self.obstacles[obstacle_id]
+                key = self.keys.pop(obstacle_id)
+                cell = self.cells[key]
+                del cell[obstacle_id]
+                if not cell:
+                    del self.cells[key]
+                self.cached_arrays = None
+                for listener in self.listeners:
+                    listener.obstacle_removed(obs)
+                return obs
+        return None
+
+    def clear(self):
+        self.cells.clear()
+        self.obstacles.clear()
+        self.keys.clear()
+        self.max_radius = 0
+        self.cached_arrays = None
+        for listener in self.listeners:
+            listener.obstacles_cleared()
+
+    def arrays(self):
+        # 所有障礙物的中心 (M, 2) 與半徑 (M,)，障礙物改變前重複使用 (給 NumPy 引擎)
+        if self.cached_arrays is None:
+            self.cached_arrays = obstacle_arrays(self.obstacles.values())
+        return self.cached_arrays
+
+
+def obstacle_arrays(obstacles):
+    obstacles = list(obstacles)
+    centers = np.array([(o["center"].x, o["center"].y) for o in obstacles])
+    radii = np.array([o["radius"] for o in obstacles], dtype=float)
+    return centers.reshape(-1, 2), radii
+
+
+# --- 避障網格 ---
+class ObstacleField:
+    # 在世界範圍 (四周多留 OBSTACLE_DETECTION_BUFFER) 的網格點上預先加總所有障礙物的避障力道，
+    # 算法與 Boid.avoid_obstacles 相同。boid 查詢時只讀附近的網格點 (O(1))。
+    # 障礙物新增或移除時只重算它影響範圍內的網格點；範圍內依障礙物加入順序重新加總，
+    # 所以結果只由目前的障礙物決定，與增刪的過程無關。
+    def __init__(
+        self,
+        obstacles,
+        size=(WORLD_WIDTH, WORLD_HEIGHT),
+        cell_size=OBSTACLE_FIELD_CELL_SIZE,
+        interpolate=OBSTACLE_FIELD_INTERPOLATE,
+    ):
+        self.obstacles = obstacles
+        self.cell_size = cell_size
+        self.interpolate = interpolate
+        self.origin = -OBSTACLE_DETECTION_BUFFER
+        span_x = size[0] + 2 * OBSTACLE_DETECTION_BUFFER
+        span_y = size[1] + 2 * OBSTACLE_DETECTION_BUFFER
+        self.columns = math.ceil(span_x / cell_size) + 1
+        self.rows = math.ceil(span_y / cell_size) + 1
+        self.node_x = self.origin + np.arange(self.columns) * cell_size
+        self.node_y = self.origin + np.arange(self.rows) * cell_size
+        self.force_x = np.zeros((self.columns, self.rows))
+        self.force_y = np.zeros((self.columns, self.rows))
+        for obs in obstacles:
+            self.accumulate(obs, *self.node_range(obs["center"], self.reach(obs)))
+        obstacles.subscribe(self)
+        obstacles.field = self
+
+    def close(self):
+        self.obstacles.unsubscribe(self)
+        self.obstacles.field = None
+
+    def reach(self, obs):
+        return obs["radius"] + OBSTACLE_DETECTION_BUFFER
+
+    def node_range(self, center, reach):
+        # 與 center 距離 reach 以內的網格點的索引範圍 [i0, i1) x [j0, j1)
+        i0 = max(math.floor((center[0] - reach - self.origin) / self.cell_size), 0)
+        j0 = max(math.floor((center[1] - reach - self.origin) / self.cell_size), 0)
+        i1 = min(
+            math.ceil((center[0] + reach - self.origin) / self.cell_size) + 1,
+            self.columns,
+        )
+        j1 = min(
+            math.ceil((center[1] + reach - self.origin) / self.cell_size) + 1,
+            self.rows,
+        )
+        return i0, i1, j0, j1
+
+    def accumulate(self, obs, i0, i1, j0, j1):
+        # 把一個障礙物對 [i0, i1) x [j0, j1) 網格點的力道加上去
+        if i0 >= i1 or j0 >= j1:
+            return
+        center = obs["center"]
+        dx = self.node_x[i0:i1, None] - center.x
+        dy = self.node_y[None, j0:j1] - center.y
+        dist = np.sqrt(dx * dx + dy * dy)
+        detection_radius = obs["radius"] + OBSTACLE_DETECTION_BUFFER
+        strength = (detection_radius - dist) / detection_radius
+        scale = np.where(
+            dist < detection_radius,
+            np.where(
+                dist > 0, strength * MAX_SPEED / np.where(dist > 0, dist, 1.0), 1.0
+            ),
+            0.0,
+        )
+        self.force_x[i0:i1, j0:j1] += dx * scale
+        self.force_y[i0:i1, j0:j1] += dy * scale
+
+    def refresh(self, obs):
+        # 清空 obs 影響範圍內的網格點，再把所有會影響這些點的障礙物加回來
+        i0, i1, j0, j1 = self.node_range(obs["center"], self.reach(obs))
+        self.force_x[i0:i1, j0:j1] = 0.0
+        self.force_y[i0:i1, j0:j1] = 0.0
+        # 範圍邊緣的網格點可能比 reach 再遠一格
+        reach = self.reach(obs) + OBSTACLE_DETECTION_BUFFER + self.cell_size
+        for other in self.obstacles.query(obs["center"], reach):
+            self.accumulate(other, i0, i1, j0, j1)
+
+    def obstacle_added(self, obs):
+        self.refresh(obs)
+
+    def obstacle_removed(self, obs):
+        self.refresh(obs)
+
+    def obstacles_cleared(self):
+        self.force_x[:] = 0.0
+        self.force_y[:] = 0.0
+
+    def sample(self, x, y):
+        # 位置 (x, y) 的避障力道，網格外的點使用最近的邊緣網格點
+        fx = min(max((x - self.origin) / self.cell_size, 0.0), self.columns - 1)
+        fy = min(max((y - self.origin) / self.cell_size, 0.0), self.rows - 1)
+        if not self.interpolate:
+            i = int(fx + 0.5)
+            j = int(fy + 0.5)
+            return float(self.force_x[i, j]), float(self.force_y[i, j])
+        i = min(int(fx), self.columns - 2)
+        j = min(int(fy), self.rows - 2)
+        tx = fx - i
+        ty = fy - j
+        force_x = self.force_x
+        force_y = self.force_y
+        w00 = (1 - tx) * (1 - ty)
+        w10 = tx * (1 - ty)
+        w01 = (1 - tx) * ty
+        w11 = tx * ty
+        return (
+            float(
+                force_x[i, j] * w00
+                + force_x[i + 1, j] * w10
+                + force_x[i, j + 1] * w01
+                + force_x[i + 1, j + 1] * w11
+            ),
+            float(
+                force_y[i, j] * w00
+                + force_y[i + 1, j] * w10
+                + force_y[i, j + 1] * w01
+                + force_y[i + 1, j + 1] * w11
+            ),
+        )
+
+    def sample_many(self, positions):
+        # sample() 的陣列版本，回傳 (N, 2)
+        fx = np.clip(
+            (positions[:, 0] - self.origin) / self.cell_size, 0, self.columns - 1
+        )
+        fy = np.clip((positions[:, 1] - self.origin) / self.cell_size, 0, self.rows - 1)
+        steering = np.empty_like(positions, dtype=float)
+        if not self.interpolate:
+            i = (fx + 0.5).astype(np.intp)
+            j = (fy + 0.5).astype(np.intp)
+            steering[:, 0] = self.force_x[i, j]
+            steering[:, 1] = self.force_y[i, j]
+            return steering
+        i = np.minimum(fx.astype(np.intp), self.columns - 2)
+        j = np.minimum(fy.astype(np.intp), self.rows - 2)
+        tx = fx - i
+        ty = fy - j
+        w00 = (1 - tx) * (1 - ty)
+        w10 = tx * (1 - ty)
+        w01 = (1 - tx) * ty
+        w11 = tx * ty
+        for axis, force in enumerate((self.force_x, self.force_y)):
+            steering[:, axis] = (
+                force[i, j] * w00
+                + force[i + 1, j] * w10
+                + force[i, j + 1] * w01
+                + force[i + 1, j + 1] * w11
+            )
+        return steering
+
+
+# --- boids 容器 ---
+class BoidStore:
+    # 每個 boid 加入時得到一個不會改變、依加入順序遞增的整數 ID (boid.boid_id)。
+    # boids 是緊密排列的 list，可以直接交給 SpatialGrid 與各種力道計算；
+    # 移除時把最後一個 boid 搬到空出的位置 (O(1))，不移動其他元素。
+    # list 的順序因此不是加入順序，最舊的 ID 另外依序記在 spawn_order 中。
+    def __init__(self):
+        self.boids = []
+        self.slots = {}  # boid_id -> 在 boids 中的位置
+        self.spawn_order = deque()
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.boids)
+
+    def __iter__(self):
+        return iter(self.boids)
+
+    def __contains__(self, boid_id):
+        return boid_id in self.slots
+
+    def get(self, boid_id):
+        return self.boids[self.slots[boid_id]]
+
+    def add(self, boid):
+        boid.boid_id = boid_id = self.next_id
+        self.next_id += 1
+        self.slots[boid_id] = len(self.boids)
+        self.boids.append(boid)
+        self.spawn_order.append(boid_id)
+        return boid_id
+
+    def spawn(self, boids):
+        # 一次加入多個 boids，回傳它們的 ID (連續的 range)
+        start = self.next_id
+        for boid in boids:
+            self.add(boid)
+        return range(start, self.next_id)
+
+    def remove(self, boid):
+        # 把最後一個 boid 搬到被移除的位置；已經不在容器中時回傳 False
+        index = self.slots.pop(boid.boid_id, None)
+        if index is None:
+            return False
+        last = self.boids.pop()
+        if last is not boid:
+            self.boids[index] = last
+            self.slots[last.boid_id] = index
+        # 被移除的 ID 留在 spawn_order 中，累積太多時才一次清掉
+        if len(self.spawn_order) > 2 * len(self.slots) + 64:
+            self.spawn_order = deque(i for i in self.spawn_order if i in self.slots)
+        return True
+
+    def cull(self, boids):
+        # 移除多個 boids，依傳入的順序 (相同輸入得到相同的 list 順序)，回傳移除的數量
+        return sum(self.remove(boid) for boid in boids)
+
+    def remove_oldest(self, count):
+        # 移除最早加入、仍然存在的 count 個 boids
+        removed = 0
+        while removed < count and self.spawn_order:
+            boid_id = self.spawn_order.popleft()
+            index = self.slots.get(boid_id)
+            if index is not None:
+                self.remove(self.boids[index])
+                removed += 1
+        return removed
+
+    def clear(self):
+        self.boids.clear()
+        self.slots.clear()
+        self.spawn_order.clear()
+
+
+# 每個 boid 計算力道時共用的暫存向量 (模擬在單一執行緒中進行)
+_SCRATCH = [pygame.math.Vector2() for _ in range(6)]
+
+
+def _store(out, x, y):
+    if out is None:
+        return pygame.math.Vector2(x, y)
+    out.update(x, y)
+    return out
+
+
+# --- Boid 類別 (獵物) ---
+class Boid:
+    # 使用 __slots__ 而不是 __dict__，每個 boid 佔用的記憶體較少、屬性存取較快
+    __slots__ = (
+        "acceleration",
+        "boid_id",
+        "config",
+        "position",
+        "previous_position",
+        "velocity",
+    )
+
+    # rng 可傳入 random.Random 實例，讓初始狀態只由它的種子決定
+    def __init__(self, config=DEFAULT_CONFIG, rng=random):
+        self.config = config
+        self.position = pygame.math.Vector2(
+            rng.uniform(EDGE_MARGIN, config.world_width - EDGE_MARGIN),
+            rng.uniform(EDGE_MARGIN, config.world_height - EDGE_MARGIN),
+        )
+        angle = rng.uniform(0, 2 * math.pi)
+        self.velocity = pygame.math.Vector2(
+            math.cos(angle), math.sin(angle)
+        ) * rng.uniform(MIN_SPEED, MAX_SPEED)
+        self.acceleration = pygame.math.Vector2(0, 0)
+        # 上一步的位置，繪製時可以在兩步之間插值
+        self.previous_position = pygame.math.Vector2(self.position)
+        # 加入 BoidStore 時才分配
+        self.boid_id = None
+
+    @classmethod
+    def from_state(cls, position, velocity, config=DEFAULT_CONFIG):
+        # 以已知的位置與速度建立 (讀取存檔時使用)，不消耗隨機數
+        boid = cls.__new__(cls)
+        boid.config = config
+        boid.position = pygame.math.Vector2(position)
+        boid.velocity = pygame.math.Vector2(velocity)
+        boid.acceleration = pygame.math.Vector2(0, 0)
+        boid.previous_position = pygame.math.Vector2(position)
+        boid.boid_id = None
+        return boid
+
+    def update(self, boids, predators, obstacles, grid=None, dt=1.0, rng=None):
+        # dt 以 1/60 秒為單位，dt = 1 時與原本每幀更新一次的結果相同。
+        # 直接更新原本的向量，不建立新的 Vector2
+        vx, vy = self.steer(boids, predators, obstacles, grid, dt, rng)
+        position = self.position
+        self.previous_position.update(position)
+        self.velocity.update(vx, vy)
+        position.update(position.x + vx * dt, position.y + vy * dt)
+        return []  # Return empty list for consistency
+
+    def next_velocity(self, boids, predators, obstacles, grid=None, dt=1.0, rng=None):
+        # 只讀取目前的狀態算出下一步的速度，不移動自己
+        return pygame.math.Vector2(
+            self.steer(boids, predators, obstacles, grid, dt, rng)
+        )
+
+    def steer(self, boids, predators, obstacles, grid=None, dt=1.0, rng=None):
+        # 回傳下一步速度的 (x, y)。力道寫進共用的暫存向量，
+        # 加總與限速都用浮點數計算 (運算順序與 Vector2 相同，結果完全一致)。
+        # rng 是 "sample" 鄰居模式抽樣用的 random.Random
+        separation_force, alignment_force, cohesion_force = _SCRATCH[:3]
+        edge_force, predator_force, obstacle_force = _SCRATCH[3:]
+        # 計時只在啟用時進行，停用時每個 boid 只多一次布林判斷
+        profiling = PROFILER.enabled
+        if profiling:
+            start = time.perf_counter()
+
+        # 有網格 (或 Verlet 清單) 時只檢查附近的候選；
+        # "sample" 模式直接從網格抽出固定數量的候選
+        if grid is None:
+            neighbors = boids
+        elif self.config.neighbor_mode == "sample":
+            budget = self.config.neighbor_limit * SAMPLE_CANDIDATE_FACTOR
+            neighbors = grid.sample_neighbors(self, budget, rng or random)
+        else:
+            neighbors = grid.neighbors(self)
+        if self.config.neighbor_mode != "metric":
+            neighbors = self.select_neighbors(neighbors, rng)
+        if profiling:
+            PROFILER.add_count("neighbor_checks", len(neighbors))
+            lap = time.perf_counter()
+            PROFILER.add_time("neighbor_search", lap - start)
+            start = lap
+        if USE_FUSED_NEIGHBOR_LOOP:
+            self.flock_forces(
+                neighbors, out=(separation_force, alignment_force, cohesion_force)
+            )
+        else:
+            separation_force = self.separation(neighbors)
+            alignment_force = self.alignment(neighbors)
+            cohesion_force = self.cohesion(neighbors)
+        self.avoid_edges(out=edge_force)
+        if profiling:
+            lap = time.perf_counter()
+            PROFILER.add_time("flock_rules", lap - start)
+            start = lap
+        self.avoid_predators(predators, out=predator_force)
+        if profiling:
+            lap = time.perf_counter()
+            PROFILER.add_time("predator_avoidance", lap - start)
+            start = lap
+        self.avoid_obstacles(obstacles, out=obstacle_force)
+        if profiling:
+            PROFILER.add_time("obstacle_avoidance", time.perf_counter() - start)
+
+        # 將避障力道的權重設為最高
+        config = self.config
+        ax = 0.0 + obstacle_force.x * OBSTACLE_AVOIDANCE_FACTOR
+        ay = 0.0 + obstacle_force.y * OBSTACLE_AVOIDANCE_FACTOR
+        ax += separation_force.x * config.separation_factor
+        ay += separation_force.y * config.separation_factor
+        ax += alignment_force.x * config.alignment_factor
+        ay += alignment_force.y * config.alignment_factor
+        ax += cohesion_force.x * config.cohesion_factor
+        ay += cohesion_force.y * config.cohesion_factor
+        ax += edge_force.x * TURN_FACTOR
+        ay += edge_force.y * TURN_FACTOR
+        ax += predator_force.x * config.predator_avoidance_factor
+        ay += predator_force.y * config.predator_avoidance_factor
+        self.acceleration.update(ax, ay)
+
+        velocity = self.velocity
+        vx = velocity.x + ax * dt
+        vy = velocity.y + ay * dt
+
+        # 與 Vector2.scale_to_length 相同: 乘上 (新長度 / 舊長度)
+        speed = math.sqrt(vx * vx + vy * vy)
+        if speed > MAX_SPEED:
+            fraction = MAX_SPEED / speed
+            vx *= fraction
+            vy *= fraction
+        elif speed < MIN_SPEED:
+            fraction = MIN_SPEED / speed
+            vx *= fraction
+            vy *= fraction
+        return vx, vy
+
+    def move(self, velocity, dt=1.0):
+        self.previous_position.update(self.position)
+        self.velocity = velocity
+        self.position += velocity * dt
+
+    # 以下各種力道都以浮點數計算，只在最後寫入一個向量；
+    # 傳入 out 時寫進 out (重複使用)，否則建立新的 Vector2
+    def avoid_obstacles(self, obstacles, out=None):
+        if isinstance(obstacles, ObstacleStore):
+            if obstacles.field is not None:
+                # 直接讀預先算好的避障網格
+                return _store(
+                    out, *obstacles.field.sample(self.position.x, self.position.y)
+                )
+            # 只檢查附近格子裡的障礙物
+            obstacles = obstacles.query(self.position, OBSTACLE_DETECTION_BUFFER)
+        px = self.position.x
+        py = self.position.y
+        steering_x = steering_y = 0.0
+        for obs in obstacles:
+            center = obs["center"]
+            dx = px - center.x
+            dy = py - center.y
+            dist = math.sqrt(dx * dx + dy * dy)
+            detection_radius = obs["radius"] + OBSTACLE_DETECTION_BUFFER
+
+            if dist < detection_radius:
+                # 計算一個遠離障礙物中心的力
+                # 距離越近，力道越強
+                # 當 boid 在緩衝區邊緣時，力道為 0
+                # 當 boid 接觸到障礙物時，力道最強
+                if dist > 0:
+                    strength = (detection_radius - dist) / detection_radius
+                    fraction = strength * MAX_SPEED / dist
+                    dx *= fraction
+                    dy *= fraction
+
+                steering_x += dx
+                steering_y += dy
+        return _store(out, steering_x, steering_y)
+
+    def select_neighbors(self, boids, rng=None):
+        # 依 neighbor_mode 從視野內的 boids 中挑出最多 neighbor_limit 個，保持原本的順序。
+        # "topological" 距離相同時取排在前面的，結果與 NumpyFlock 相同。
+        # "sample" 先隨機抽出固定數量的候選再檢查距離 (候選中在視野內的是隨機抽樣)，
+        # 所以與 NumpyFlock 只在統計上相同
+        config = self.config
+        limit = config.neighbor_limit
+        rng = rng or random
+        if config.neighbor_mode == "sample":
+            budget = limit * SAMPLE_CANDIDATE_FACTOR
+            if len(boids) > budget:
+                picked = rng.sample(range(len(boids)), budget)
+                picked.sort()
+                boids = [boids[index] for index in picked]
+        visual_range_sq = config.visual_range**2
+        px = self.position.x
+        py = self.position.y
+        visible = []
+        for index, other in enumerate(boids):
+            if self is other:
+                continue
+            other_position = other.position
+            dx = px - other_position.x
+            dy = py - other_position.y
+            distance_sq = dx * dx + dy * dy
+            if 0 < distance_sq < visual_range_sq:
+                visible.append((distance_sq, index))
+        if len(visible) > limit:
+            if config.neighbor_mode == "topological":
+                visible = heapq.nsmallest(limit, visible)
+            else:
+                visible = rng.sample(visible, limit)
+            visible.sort(key=lambda item: item[1])
+        return [boids[index] for _, index in visible]
+
+    def flock_forces(self, boids, out=None):
+        # 與 separation / alignment / cohesion 結果相同，但只走訪一次鄰居，
+        # 並用距離平方比較，只有在分離距離內才開根號
+        visual_range_sq = self.config.visual_range**2
+        separation_distance_sq = self.config.separation_distance**2
+        px = self.position.x
+        py = self.position.y
+        separation_x = separation_y = 0.0
+        separation_count = 0
+        velocity_x = velocity_y = 0.0
+        center_x = center_y = 0.0
+        count = 0
+        for other in boids:
+            if self is other:
+                continue
+            other_position = other.position
+            dx = px - other_position.x
+            dy = py - other_position.y
+            distance_sq = dx * dx + dy * dy
+            # 分離距離小於視野範圍，所以分離的判斷放在視野內
+            if 0 < distance_sq < visual_range_sq:
+                other_velocity = other.velocity
+                velocity_x += other_velocity.x
+                velocity_y += other_velocity.y
+                center_x += other_position.x
+                center_y += other_position.y
+                count += 1
+                if distance_sq < separation_distance_sq:
+                    distance = math.sqrt(distance_sq)
+                    separation_x += dx / distance
+                    separation_y += dy / distance
+                    separation_count += 1
+
+        # 與 Vector2 的 /= n 相同: 乘上 1 / n
+        if separation_count > 0:
+            inverse = 1 / separation_count
+            separation_x *= inverse
+            separation_y *= inverse
+
+        alignment_x = velocity_x
+        alignment_y = velocity_y
+        cohesion_x = center_x
+        cohesion_y = center_y
+        if count > 0:
+            inverse = 1 / count
+            own_velocity = self.velocity
+            alignment_x *= inverse
+            alignment_y *= inverse
+            length = math.sqrt(alignment_x * alignment_x + alignment_y * alignment_y)
+            if length > 0:
+                fraction = MAX_SPEED / length
+                alignment_x *= fraction
+                alignment_y *= fraction
+            alignment_x -= own_velocity.x
+            alignment_y -= own_velocity.y
+
+            cohesion_x = cohesion_x * inverse - px
+            cohesion_y = cohesion_y * inverse - py
+            length = math.sqrt(cohesion_x * cohesion_x + cohesion_y * cohesion_y)
+            if length > 0:
+                fraction = MAX_SPEED / length
+                cohesion_x *= fraction
+                cohesion_y *= fraction
+            cohesion_x -= own_velocity.x
+            cohesion_y -= own_velocity.y
+
+        if out is None:
+            out = (pygame.math.Vector2(), pygame.math.Vector2(), pygame.math.Vector2())
+        separation, alignment, cohesion = out
+        separation.update(separation_x, separation_y)
+        alignment.update(alignment_x, alignment_y)
+        cohesion.update(cohesion_x, cohesion_y)
+        return separation, alignment, cohesion
+
+    def separation(self, boids):
+        steering = pygame.math.Vector2(0, 0)
+        count = 0
+        for other in boids:
+            if self is not other:
+                distance = self.position.distance_to(other.position)
+                if 0 < distance < self.config.separation_distance:
+                    diff = self.position - other.position
+                    diff /= distance
+                    steering += diff
+                    count += 1
+        if count > 0:
+            steering /= count
+        return steering
+
+    def alignment(self, boids):
+        steering = pygame.math.Vector2(0, 0)
+        count = 0
+        for other in boids:
+            if self is not other:
+                distance = self.position.distance_to(other.position)
+                if 0 < distance < self.config.visual_range:
+                    steering += other.velocity
+                    count += 1
+        if count > 0:
+            steering /= count
+            if steering.length() > 0:
+                steering.scale_to_length(MAX_SPEED)
+            steering -= self.velocity
+        return steering
+
+    def cohesion(self, boids):
+        steering = pygame.math.Vector2(0, 0)
+        count = 0
+        for other in boids:
+            if self is not other:
+                distance = self.position.distance_to(other.position)
+                if 0 < distance < self.config.visual_range:
+                    steering += other.position
+                    count += 1
+        if count > 0:
+            steering /= count
+            steering -= self.position
+            if steering.length() > 0:
+                steering.scale_to_length(MAX_SPEED)
+            steering -= self.velocity
+        return steering
+
+    def avoid_edges(self, out=None):
+        x = self.position.x
+        y = self.position.y
+        steering_x = steering_y = 0.0
+        if x < EDGE_MARGIN:
+            steering_x = 1.0
+        elif x > self.config.world_width - EDGE_MARGIN:
+            steering_x = -1.0
+        if y < EDGE_MARGIN:
+            steering_y = 1.0
+        elif y > self.config.world_height - EDGE_MARGIN:
+            steering_y = -1.0
+        return _store(out, steering_x, steering_y)
+
+    def avoid_predators(self, predators, out=None):
+        px = self.position.x
+        py = self.position.y
+        steering_x = steering_y = 0.0
+        detection_range = self.config.predator_detection_range
+        for predator in predators:
+            dx = px - predator.position.x
+            dy = py - predator.position.y
+            distance = math.sqrt(dx * dx + dy * dy)
+            if 0 < distance < detection_range:
+                inverse = 1 / distance
+                steering_x += dx * inverse
+                steering_y += dy * inverse
+        return _store(out, steering_x, steering_y)
+
+    def render_position(self, alpha=1.0):
+        # alpha 為 0 時是上一步的位置，1 時是目前的位置
+        if alpha >= 1.0:
+            return self.position
+        return self.previous_position.lerp(self.position, alpha)
+
+    def draw(self, screen, alpha=1.0, camera=None):
+        # camera 不為 None 時轉換成畫面座標，大小隨縮放改變
+        position = self.render_position(alpha)
+        size = BOID_SIZE
+        if camera is not None:
+            position = camera.to_screen(position)
+            size *= camera.zoom
+        angle = self.velocity.angle_to(pygame.math.Vector2(1, 0))
+        p1 = position + pygame.math.Vector2(size * 2, 0).rotate(-angle)
+        p2 = position + pygame.math.Vector2(-size, size).rotate(-angle)
+        p3 = position + pygame.math.Vector2(-size, -size).rotate(-angle)
+        pygame.draw.polygon(screen, (255, 255, 255), [p1, p2, p3])
+
+
+# --- Predator 類別 (捕食者) ---
+class Predator(Boid):
+    __slots__ = ("can_eat", "kills")
+
+    def __init__(self, config=DEFAULT_CONFIG, rng=random):
+        super().__init__(config, rng)
+        self.velocity = (
+            pygame.math.Vector2(rng.uniform(-1, 1), rng.uniform(-1, 1)).normalize()
+            * config.predator_speed
+        )
+        self.can_eat = False
+        self.kills = 0
+
+    @classmethod
+    def from_state(cls, position, velocity, config=DEFAULT_CONFIG, can_eat=False):
+        predator = super().from_state(position, velocity, config)
+        predator.can_eat = can_eat
+        predator.kills = 0
+        return predator
+
+    def update(self, prey, obstacles, dt=1.0):
+        # prey 是這一幀所有 boids 的 PreyIndex。
+        # 追最近的 boid，回傳吃得到的 boids 的 (索引, 距離)
+        closest, _ = prey.nearest(self.position)
+        target = None
+        if closest is not None:
+            target = pygame.math.Vector2(*prey.positions[closest])
+        self.hunt(target, obstacles, dt)
+
+        if self.can_eat:
+            return prey.within(self.position, self.config.predator_eat_distance)
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    def hunt(self, target, obstacles, dt=1.0):
+        # 朝目標位置 (最近的 boid) 追趕並移動一步，target 為 None 時只避開邊界和障礙物
+        self.acceleration = pygame.math.Vector2(0, 0)
+        self.previous_position.update(self.position)
+        config = self.config
+
+        seek_force = pygame.math.Vector2(0, 0)
+        if target is not None:
+            desired_velocity = target - self.position
+            if desired_velocity.length() > 0:
+                desired_velocity.scale_to_length(config.predator_speed)
+                seek_force = desired_velocity - self.velocity
+
+        edge_force = self.avoid_edges()
+        obstacle_force = self.avoid_obstacles(obstacles)
+
+        # 捕食者也需要避障
+        self.acceleration += obstacle_force * OBSTACLE_AVOIDANCE_FACTOR * 1.5
+        self.acceleration += edge_force * TURN_FACTOR * 2
+        self.acceleration += seek_force * config.hunting_factor
+
+        self.velocity += self.acceleration * dt
+        if self.velocity.length() > config.predator_speed:
+            self.velocity.scale_to_length(config.predator_speed)
+
+        self.position += self.velocity * dt
+
+    def draw(self, screen, alpha=1.0, camera=None):
+        current_color = PREDATOR_COLOR if self.can_eat else PREDATOR_PEACEFUL_COLOR
+        position = self.render_position(alpha)
+        size = PREDATOR_SIZE
+        if camera is not None:
+            position = camera.to_screen(position)
+            size *= camera.zoom
+        angle = self.velocity.angle_to(pygame.math.Vector2(1, 0))
+        p1 = position + pygame.math.Vector2(size * 2, 0).rotate(-angle)
+        p2 = position + pygame.math.Vector2(-size, size).rotate(-angle)
+        p3 = position + pygame.math.Vector2(-size, -size).rotate(-angle)
+        pygame.draw.polygon(screen, current_color, [p1, p2, p3])
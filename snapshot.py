@@ -0,0 +1,90 @@
+import dataclasses
+import json
+
+import numpy as np
+
+from parallel_flock import PARALLEL_WORKERS
+from simulation import Predator, SimConfig
+from world import World
+
+SNAPSHOT_VERSION = 1
+# 存檔中的浮點數陣列一律使用 float32
+SNAPSHOT_DTYPE = np.float32
+
+
+# --- 存檔 ---
+def save_snapshot(path, world, settings=None):
+    # 以未壓縮的 .npz 保存整個世界: 每種狀態一個扁平的 float32 陣列，不使用 pickle。
+    # settings 是 main() 中的介面開關等其他要一起保存的值 (必須能轉成 JSON)
+    positions, velocities = world.arrays()
+    predator_positions, predator_velocities, predator_can_eat = world.predator_arrays()
+    centers, radii = world.obstacles.arrays()
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "engine": world.engine,
+        "frame": world.frame,
+        "use_spatial_grid": world.use_spatial_grid,
+        "synchronous": world.synchronous,
+        "obstacle_field": world.obstacle_field,
+        "use_verlet_list": world.use_verlet_list,
+        "config": dataclasses.asdict(world.config),
+        "rng_state": world.rng.getstate(),
+        # NumPy 引擎 "sample" 鄰居模式的亂數狀態
+        "flock_rng_state": (
+            world.flock.rng.bit_generator.state if world.flock is not None else None
+        ),
+        "settings": settings or {},
+    }
+    # 傳入檔案物件，np.savez 就不會自動加上 .npz 副檔名
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            meta=np.array(json.dumps(meta)),
+            boid_positions=positions.astype(SNAPSHOT_DTYPE),
+            boid_velocities=velocities.astype(SNAPSHOT_DTYPE),
+            predator_positions=predator_positions.astype(SNAPSHOT_DTYPE),
+            predator_velocities=predator_velocities.astype(SNAPSHOT_DTYPE),
+            predator_can_eat=predator_can_eat,
+            obstacle_centers=centers.astype(SNAPSHOT_DTYPE).reshape(-1, 2),
+            obstacle_radii=radii.astype(SNAPSHOT_DTYPE),
+        )
+
+
+def load_snapshot(path, engine=None, workers=PARALLEL_WORKERS):
+    # 回傳 (World, settings)；engine 為 None 時使用存檔時的引擎
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"unsupported snapshot version {meta.get('version')!r} in {path}"
+            )
+        world = World(
+            0,
+            engine=engine or meta["engine"],
+            use_spatial_grid=meta["use_spatial_grid"],
+            config=SimConfig(**meta["config"]),
+            workers=workers,
+            synchronous=meta["synchronous"],
+            obstacle_field=meta.get("obstacle_field", False),
+            use_verlet_list=meta.get("use_verlet_list", False),
+        )
+        version, state, gauss = meta["rng_state"]
+        world.rng.setstate((version, tuple(state), gauss))
+        world.frame = meta["frame"]
+        if world.flock is not None and meta.get("flock_rng_state"):
+            world.flock.rng.bit_generator.state = meta["flock_rng_state"]
+        world.set_boids(data["boid_positions"], data["boid_velocities"])
+        world.predators = [
+            Predator.from_state(position, velocity, world.config, can_eat)
+            for position, velocity, can_eat in zip(
+                data["predator_positions"].astype(float).tolist(),
+                data["predator_velocities"].astype(float).tolist(),
+                data["predator_can_eat"].tolist(),
+            )
+        ]
+        for center, radius in zip(
+            data["obstacle_centers"].astype(float).tolist(),
+            data["obstacle_radii"].astype(float).tolist(),
+        ):
+            world.obstacles.add(center, radius)
+    return world, meta["settings"]
@@ -0,0 +1,199 @@
+import math
+
+import numpy as np
+import pygame
+
+from camera import pixel_points
+from simulation import (
+    BOID_SIZE,
+    OBSTACLE_COLOR,
+    PREDATOR_COLOR,
+    PREDATOR_PEACEFUL_COLOR,
+    PREDATOR_SIZE,
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+)
+
+# 預先畫好的方向數量，越多轉向越平滑
+HEADING_STEPS = 64
+BOID_COLOR = (255, 255, 255)
+BACKGROUND_COLOR = (10, 20, 40)
+# 透明色: 三角形不會使用這個顏色
+COLORKEY = (0, 0, 0)
+
+
+# --- 預先旋轉好的三角形 ---
+class HeadingSprites:
+    def __init__(self, size, color, steps=HEADING_STEPS):
+        self.steps = steps
+        # 三角形最遠的頂點在 size * 2，四周多留一個像素
+        self.half = size * 2 + 1
+        extent = self.half * 2 + 1
+        center = pygame.math.Vector2(self.half, self.half)
+        self.sprites = []
+        for k in range(steps):
+            angle = 360 * k / steps
+            # 與 Boid.draw 相同的三個頂點
+            points = [
+                center + pygame.math.Vector2(size * 2, 0).rotate(angle),
+                center + pygame.math.Vector2(-size, size).rotate(angle),
+                center + pygame.math.Vector2(-size, -size).rotate(angle),
+            ]
+            surface = pygame.Surface((extent, extent))
+            surface.fill(COLORKEY)
+            surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+            pygame.draw.polygon(surface, color, points)
+            self.sprites.append(surface)
+
+    def heading_index(self, velocity):
+        angle = math.atan2(velocity.y, velocity.x)
+        return round(angle * self.steps / (2 * math.pi)) % self.steps
+
+    def blit_item(self, position, velocity):
+        # position 是畫面座標
+        return (
+            self.sprites[self.heading_index(velocity)],
+            (int(position.x) - self.half, int(position.y) - self.half),
+        )
+
+    def blit_items(self, positions, velocities):
+        # 一次算出所有方向的索引與左上角位置 (給 NumPy 引擎使用)
+        angles = np.arctan2(velocities[:, 1], velocities[:, 0])
+        indices = np.rint(angles * self.steps / (2 * np.pi)).astype(int) % self.steps
+        corners = positions.astype(int) - self.half
+        sprites = self.sprites
+        return [
+            (sprites[index], corner)
+            for index, corner in zip(indices.tolist(), map(tuple, corners.tolist()))
+        ]
+
+
+# --- 批次繪製 ---
+class SpriteRenderer:
+    # 每幀只呼叫一次 Surface.fblits，取代每個 boid 一次 pygame.draw.polygon
+    def __init__(self, steps=HEADING_STEPS):
+        self.steps = steps
+        self.boid_sprites = HeadingSprites(BOID_SIZE, BOID_COLOR, steps)
+        self.predator_sprites = {
+            True: HeadingSprites(PREDATOR_SIZE, PREDATOR_COLOR, steps),
+            False: HeadingSprites(PREDATOR_SIZE, PREDATOR_PEACEFUL_COLOR, steps),
+        }
+        # 其他縮放倍率的三角形，第一次用到時才畫
+        self.zoomed = {1.0: (self.boid_sprites, self.predator_sprites)}
+
+    def sprites_for(self, zoom):
+        if zoom not in self.zoomed:
+            boid_size = max(1, round(BOID_SIZE * zoom))
+            predator_size = max(2, round(PREDATOR_SIZE * zoom))
+            self.zoomed[zoom] = (
+                HeadingSprites(boid_size, BOID_COLOR, self.steps),
+                {
+                    True: HeadingSprites(predator_size, PREDATOR_COLOR, self.steps),
+                    False: HeadingSprites(
+                        predator_size, PREDATOR_PEACEFUL_COLOR, self.steps
+                    ),
+                },
+            )
+        return self.zoomed[zoom]
+
+    def draw(self, screen, boids, predators, flock=None, alpha=1.0, camera=None):
+        # alpha 小於 1 時畫在上一步與這一步之間的位置
+        if camera is not None:
+            self.draw_view(screen, boids, predators, flock, alpha, camera)
+            return
+        if flock is not None:
+            items = self.boid_sprites.blit_items(
+                flock.render_positions(alpha), flock.velocities
+            )
+        else:
+            blit_item = self.boid_sprites.blit_item
+            items = [blit_item(b.render_position(alpha), b.velocity) for b in boids]
+        for p in predators:
+            items.append(
+                self.predator_sprites[p.can_eat].blit_item(
+                    p.render_position(alpha), p.velocity
+                )
+            )
+        screen.fblits(items)
+
+    def draw_view(self, screen, boids, predators, flock, alpha, camera):
+        # 只畫攝影機看得到的部分。縮得很小時 boids 畫成單一像素
+        boid_sprites, predator_sprites = self.sprites_for(camera.zoom)
+        margin = boid_sprites.half / camera.zoom
+        if flock is not None:
+            positions = flock.render_positions(alpha)
+            velocities = flock.velocities
+        else:
+            # 物件引擎: 先逐一排除畫面外的 boids，只有看得到的才取出位置
+            x0, y0, x1, y1 = camera.view(margin)
+            visible_positions = []
+            visible_velocities = []
+            for b in boids:
+                position = b.render_position(alpha)
+                if x0 <= position.x <= x1 and y0 <= position.y <= y1:
+                    visible_positions.append((position.x, position.y))
+                    visible_velocities.append((b.velocity.x, b.velocity.y))
+            positions = np.array(visible_positions).reshape(-1, 2)
+            velocities = np.array(visible_velocities).reshape(-1, 2)
+
+        if camera.pixel_lod:
+            points = pixel_points(camera, positions)
+            if len(points):
+                pixels = pygame.surfarray.pixels2d(screen)
+                pixels[points[:, 0], points[:, 1]] = screen.map_rgb(BOID_COLOR)
+                del pixels  # 解除畫面的鎖定
+            items = []
+        else:
+            visible = camera.visible_mask(positions, margin)
+            items = boid_sprites.blit_items(
+                camera.to_screen_array(positions[visible]), velocities[visible]
+            )
+        for p in predators:
+            position = p.render_position(alpha)
+            if camera.visible(position, predator_sprites[True].half / camera.zoom):
+                items.append(
+                    predator_sprites[p.can_eat].blit_item(
+                        camera.to_screen(position), p.velocity
+                    )
+                )
+        screen.fblits(items)
+
+
+# --- 預先畫好的障礙物背景 ---
+class ObstacleLayer:
+    # 背景顏色加上所有障礙物畫在同一張圖上，每幀只需要貼一次。
+    # 障礙物新增或移除時只重畫受影響的區域。
+    def __init__(self, obstacles, size=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+        self.obstacles = obstacles
+        self.surface = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+        self.redraw()
+        obstacles.subscribe(self)
+
+    def redraw(self):
+        self.surface.fill(BACKGROUND_COLOR)
+        for obs in self.obstacles:
+            self.obstacle_added(obs)
+
+    def obstacle_added(self, obs):
+        pygame.draw.circle(self.surface, OBSTACLE_COLOR, obs["center"], obs["radius"])
+
+    def obstacle_removed(self, obs):
+        # 清掉被移除的圓，再把與這個區域重疊的其他障礙物補畫回來
+        radius = obs["radius"]
+        area = pygame.Rect(0, 0, radius * 2 + 4, radius * 2 + 4)
+        area.center = (round(obs["center"].x), round(obs["center"].y))
+        self.surface.set_clip(area)
+        self.surface.fill(BACKGROUND_COLOR, area)
+        for other in self.obstacles.query(obs["center"], radius + 2):
+            pygame.draw.circle(
+                self.surface, OBSTACLE_COLOR, other["center"], other["radius"]
+            )
+        self.surface.set_clip(None)
+
+    def obstacles_cleared(self):
+        self.surface.fill(BACKGROUND_COLOR)
+
+    def draw(self, screen):
+        screen.blit(self.surface, (0, 0))
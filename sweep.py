@@ -0,0 +1,146 @@
+import argparse
+import csv
+import dataclasses
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from headless import run_headless
+from simulation import (
+    BOID_COUNT,
+    DEFAULT_CONFIG,
+    ENGINES,
+    NEIGHBOR_MODES,
+    SIMULATION_ENGINE,
+    SimConfig,
+)
+
+PARAMETERS = [field.name for field in dataclasses.fields(SimConfig)]
+PARAMETER_TYPES = {field.name: field.type for field in dataclasses.fields(SimConfig)}
+METRICS = [
+    "survivors",
+    "eaten",
+    "mean_nearest_neighbor_distance",
+    "polarization",
+    "steps_per_second",
+]
+
+
+# --- 參數網格 ---
+def parse_grid(specs):
+    # "separation_factor=0.03,0.05" -> {"separation_factor": [0.03, 0.05]}
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        if not sep or name not in PARAMETERS:
+            raise ValueError(
+                f"invalid grid entry {spec!r}, expected NAME=V1,V2,... "
+                f"with NAME one of: {', '.join(PARAMETERS)}"
+            )
+        # 依設定欄位宣告的型別轉換 (例如 neighbor_mode 是字串、neighbor_limit 是整數)
+        kind = PARAMETER_TYPES[name]
+        grid[name] = [kind(v) for v in values.split(",") if v]
+        if name == "neighbor_mode" and not set(grid[name]) <= set(NEIGHBOR_MODES):
+            raise ValueError(
+                f"invalid neighbor_mode in {spec!r}, "
+                f"expected one of: {', '.join(NEIGHBOR_MODES)}"
+            )
+    return grid
+
+
+def grid_configs(grid):
+    # 網格中每一種組合各產生一個獨立的 SimConfig
+    names = list(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield dataclasses.replace(DEFAULT_CONFIG, **dict(zip(names, values)))
+
+
+def run_one(job):
+    # 在 worker 行程中執行一次模擬，設定只從 job 傳入
+    config, seed, boid_count, steps, engine, predators, can_eat = job
+    result = run_headless(
+        boid_count=boid_count,
+        steps=steps,
+        seed=seed,
+        engine=engine,
+        predators=predators,
+        can_eat=can_eat,
+        config=config,
+        include_state=False,
+    )
+    row = dataclasses.asdict(config)
+    row["seed"] = seed
+    for metric in METRICS:
+        row[metric] = result[metric]
+    return row
+
+
+def run_sweep(
+    grid,
+    seeds=(0,),
+    boid_count=BOID_COUNT,
+    steps=1000,
+    engine=SIMULATION_ENGINE,
+    predators=0,
+    can_eat=False,
+    workers=None,
+):
+    jobs = [
+        (config, seed, boid_count, steps, engine, predators, can_eat)
+        for config in grid_configs(grid)
+        for seed in seeds
+    ]
+    # 每個核心一個 worker
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return list(pool.map(run_one, jobs))
+
+
+def write_table(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=PARAMETERS + ["seed"] + METRICS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a grid of headless simulations in a process pool."
+    )
+    parser.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2,...",
+        help=f"values to sweep for one parameter ({', '.join(PARAMETERS)})",
+    )
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--boids", type=int, default=BOID_COUNT)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--engine", choices=ENGINES, default=SIMULATION_ENGINE)
+    parser.add_argument("--predators", type=int, default=0, metavar="N")
+    parser.add_argument("--eat", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="sweep.csv")
+    args = parser.parse_args()
+
+    try:
+        grid = parse_grid(args.grid)
+    except ValueError as e:
+        parser.error(str(e))
+
+    rows = run_sweep(
+        grid,
+        seeds=args.seeds,
+        boid_count=args.boids,
+        steps=args.steps,
+        engine=args.engine,
+        predators=args.predators,
+        can_eat=args.eat,
+        workers=args.workers,
+    )
+    write_table(rows, args.output)
+    print(f"{len(rows)} runs written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
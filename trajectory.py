@@ -0,0 +1,279 @@
+import dataclasses
+import json
+
+import numpy as np
+
+TRAJECTORY_MAGIC = b"BOIDTRJ1"
+TRAJECTORY_VERSION = 1
+# 檔頭固定大小，錄製中可以原地更新幀數
+HEADER_SIZE = 4096
+# 檔案空間不夠時一次多配置的幀數
+GROW_FRAMES = 256
+# 每一幀預設可記錄的捕食者與障礙物數量 (不夠時錄製中會自動加大)
+PREDATOR_CAPACITY = 8
+OBSTACLE_CAPACITY = 256
+
+
+def frame_dtype(boid_capacity, predator_capacity, obstacle_capacity):
+    # 每一幀是一筆固定大小的紀錄，未使用的列保持為 0
+    return np.dtype(
+        [
+            ("frame", "<i8"),
+            ("boid_count", "<i4"),
+            ("predator_count", "<i4"),
+            ("obstacle_count", "<i4"),
+            ("boids", "<f4", (boid_capacity, 4)),  # x, y, vx, vy
+            ("predators", "<f4", (predator_capacity, 5)),  # x, y, vx, vy, can_eat
+            ("obstacles", "<f4", (obstacle_capacity, 3)),  # x, y, radius
+        ]
+    )
+
+
+def _read_header(f):
+    head = f.read(HEADER_SIZE)
+    if not head.startswith(TRAJECTORY_MAGIC):
+        raise ValueError("not a trajectory file")
+    header = json.loads(head[len(TRAJECTORY_MAGIC) :].decode())
+    if header.get("version") != TRAJECTORY_VERSION:
+        raise ValueError(f"unsupported trajectory version {header.get('version')!r}")
+    return header
+
+
+# --- 錄製 ---
+class TrajectoryRecorder:
+    # 每次 record() 把整個世界的狀態附加到記憶體映射檔的下一筆紀錄，
+    # 檔案以 GROW_FRAMES 為單位加大，不需要把整段軌跡留在記憶體中。
+    # boids、捕食者或障礙物超過容量時，容量 (至少) 加倍並把已錄製的紀錄改寫成新的大小。
+    def __init__(
+        self,
+        path,
+        boid_capacity,
+        predator_capacity=PREDATOR_CAPACITY,
+        obstacle_capacity=OBSTACLE_CAPACITY,
+        metadata=None,
+    ):
+        self.dtype = frame_dtype(boid_capacity, predator_capacity, obstacle_capacity)
+        self.header = {
+            "version": TRAJECTORY_VERSION,
+            "boid_capacity": boid_capacity,
+            "predator_capacity": predator_capacity,
+            "obstacle_capacity": obstacle_capacity,
+            "frames": 0,
+            **(metadata or {}),
+        }
+        self.file = open(path, "w+b")  # noqa: SIM115 -- 錄製期間一直開著，由 close() 關閉
+        self.frames = None
+        self.count = 0
+        self.allocated = 0
+        self.grow()
+
+    @classmethod
+    def for_world(cls, path, world, boid_capacity=None, **kwargs):
+        # 以世界目前的 boids 數量作為預設容量，並把設定寫進檔頭
+        metadata = {
+            "engine": world.engine,
+            "config": dataclasses.asdict(world.config),
+        }
+        capacity = boid_capacity or max(world.boid_count(), 1)
+        kwargs.setdefault(
+            "predator_capacity", max(PREDATOR_CAPACITY, len(world.predators))
+        )
+        kwargs.setdefault(
+            "obstacle_capacity", max(OBSTACLE_CAPACITY, len(world.obstacles))
+        )
+        return cls(path, capacity, metadata=metadata, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_header(self):
+        self.header["frames"] = self.count
+        data = TRAJECTORY_MAGIC + json.dumps(self.header).encode()
+        if len(data) > HEADER_SIZE:
+            raise ValueError("trajectory metadata does not fit in the header")
+        self.file.seek(0)
+        self.file.write(data.ljust(HEADER_SIZE))
+        self.file.flush()
+
+    def grow(self):
+        if self.frames is not None:
+            self.frames.flush()
+        self.allocated += GROW_FRAMES
+        self.file.truncate(HEADER_SIZE + self.allocated * self.dtype.itemsize)
+        self.frames = np.memmap(
+            self.file,
+            dtype=self.dtype,
+            mode="r+",
+            offset=HEADER_SIZE,
+            shape=(self.allocated,),
+        )
+        self.write_header()
+
+    def record(self, world):
+        positions, velocities = world.arrays()
+        predator_positions, predator_velocities, can_eat = world.predator_arrays()
+        centers, radii = world.obstacles.arrays()
+        counts = (len(positions), len(predator_positions), len(centers))
+        self.reserve(*counts)
+        if self.count == self.allocated:
+            self.grow()
+
+        index = self.count
+        boid_count, predator_count, obstacle_count = counts
+        frames = self.frames
+        frames["frame"][index] = world.frame
+        frames["boid_count"][index] = boid_count
+        frames["predator_count"][index] = predator_count
+        frames["obstacle_count"][index] = obstacle_count
+        frames["boids"][index, :boid_count, :2] = positions
+        frames["boids"][index, :boid_count, 2:] = velocities
+        frames["predators"][index, :predator_count, :2] = predator_positions
+        frames["predators"][index, :predator_count, 2:4] = predator_velocities
+        frames["predators"][index, :predator_count, 4] = can_eat
+        frames["obstacles"][index, :obstacle_count, :2] = centers
+        frames["obstacles"][index, :obstacle_count, 2] = radii
+        self.count += 1
+
+    def capacities(self):
+        return (
+            self.header["boid_capacity"],
+            self.header["predator_capacity"],
+            self.header["obstacle_capacity"],
+        )
+
+    def reserve(self, boids, predators, obstacles):
+        # 確保每一筆紀錄放得下這些數量。加大時從最後一筆往前搬，
+        # 新的紀錄比舊的大，所以第 k 筆只會覆寫已經搬完的第 k 筆之後的資料
+        old_capacities = self.capacities()
+        needed = (boids, predators, obstacles)
+        if all(n <= c for n, c in zip(needed, old_capacities)):
+            return
+        capacities = tuple(
+            c if n <= c else max(n, 2 * c) for n, c in zip(needed, old_capacities)
+        )
+        old_dtype = self.dtype
+        self.frames.flush()
+        self.frames = None
+        self.dtype = frame_dtype(*capacities)
+        for key, capacity in zip(
+            ("boid_capacity", "predator_capacity", "obstacle_capacity"), capacities
+        ):
+            self.header[key] = capacity
+        self.file.truncate(HEADER_SIZE + self.allocated * self.dtype.itemsize)
+        frames = np.memmap(
+            self.file,
+            dtype=self.dtype,
+            mode="r+",
+            offset=HEADER_SIZE,
+            shape=(self.allocated,),
+        )
+        if self.count:
+            old = np.memmap(
+                self.file,
+                dtype=old_dtype,
+                mode="r",
+                offset=HEADER_SIZE,
+                shape=(self.count,),
+            )
+            record = np.zeros((), dtype=self.dtype)
+            for index in reversed(range(self.count)):
+                previous = old[index].copy()
+                record.fill(0)
+                for name in ("frame", "boid_count", "predator_count", "obstacle_count"):
+                    record[name] = previous[name]
+                for name, capacity in zip(
+                    ("boids", "predators", "obstacles"), old_capacities
+                ):
+                    record[name][:capacity] = previous[name]
+                frames[index] = record
+            del old
+        self.frames = frames
+        self.write_header()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.frames.flush()
+        # 先釋放 memmap 才能把檔案截到實際的長度
+        self.frames = None
+        self.file.truncate(HEADER_SIZE + self.count * self.dtype.itemsize)
+        self.write_header()
+        self.file.close()
+
+
+# --- 讀取 ---
+class Trajectory:
+    # 以唯讀 memmap 開啟錄製檔，取出的陣列都是不複製資料的 NumPy view
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.header = _read_header(f)
+        header = self.header
+        self.dtype = frame_dtype(
+            header["boid_capacity"],
+            header["predator_capacity"],
+            header["obstacle_capacity"],
+        )
+        if header["frames"]:
+            self.frames = np.memmap(
+                path,
+                dtype=self.dtype,
+                mode="r",
+                offset=HEADER_SIZE,
+                shape=(header["frames"],),
+            )
+        else:
+            self.frames = np.empty(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def boids(self, index):
+        # (N, 4) 的 x, y, vx, vy
+        return self.frames["boids"][index, : self.frames["boid_count"][index]]
+
+    def predators(self, index):
+        # (P, 5) 的 x, y, vx, vy, can_eat
+        return self.frames["predators"][index, : self.frames["predator_count"][index]]
+
+    def obstacles(self, index):
+        # (M, 3) 的 x, y, radius
+        return self.frames["obstacles"][index, : self.frames["obstacle_count"][index]]
+
+
+# --- 逐筆讀取 ---
+class TrajectoryStream:
+    # 每次只把一筆紀錄讀進同一個緩衝區，不管檔案多長記憶體用量都固定 (給重播使用)
+    def __init__(self, path):
+        self.file = open(path, "rb")  # noqa: SIM115 -- 重播期間一直開著，由 close() 關閉
+        self.header = _read_header(self.file)
+        header = self.header
+        self.dtype = frame_dtype(
+            header["boid_capacity"],
+            header["predator_capacity"],
+            header["obstacle_capacity"],
+        )
+        self.buffer = bytearray(self.dtype.itemsize)
+        self.record = np.frombuffer(self.buffer, dtype=self.dtype)[0]
+
+    def __len__(self):
+        return self.header["frames"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def read(self, index):
+        # 回傳的紀錄會在下一次 read() 時被覆寫
+        if not 0 <= index < len(self):
+            raise IndexError(f"frame {index} out of range (0..{len(self) - 1})")
+        self.file.seek(HEADER_SIZE + index * self.dtype.itemsize)
+        self.file.readinto(self.buffer)
+        return self.record
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,231 @@
+import pygame
+
+from simulation import SCREEN_HEIGHT, SCREEN_WIDTH
+
+# UI 介面參數
+FONT_SIZE = 20
+BUTTON_TEXT_COLOR = (255, 255, 255)
+BUTTON_COLOR = (80, 80, 100)
+BUTTON_HOVER_COLOR = (120, 120, 150)
+INPUT_BOX_COLOR = (50, 50, 60)
+INPUT_BOX_ACTIVE_COLOR = (150, 150, 180)
+
+
+PREDATOR_BUTTON_RECT = pygame.Rect(10, 10, 180, 40)
+ADD_BOID_BUTTON_RECT = pygame.Rect(200, 10, 140, 40)
+REMOVE_BOID_BUTTON_RECT = pygame.Rect(350, 10, 140, 40)
+EAT_MODE_BUTTON_RECT = pygame.Rect(500, 10, 180, 40)
+OBSTACLE_MODE_BUTTON_RECT = pygame.Rect(690, 10, 220, 40)
+CONTINUOUS_PLACEMENT_BUTTON_RECT = pygame.Rect(920, 10, 200, 40)
+TOGGLE_UI_BUTTON_RECT = pygame.Rect(SCREEN_WIDTH - 150, 10, 140, 40)
+
+# 新增輸入框和其確認按鈕
+INPUT_BOX_RECT = pygame.Rect(200, 60, 140, 40)
+ADD_N_BOIDS_BUTTON_RECT = pygame.Rect(350, 60, 140, 40)
+# 調整開啟捕食者時的數量
+ADD_PREDATOR_BUTTON_RECT = pygame.Rect(500, 60, 120, 40)
+REMOVE_PREDATOR_BUTTON_RECT = pygame.Rect(630, 60, 120, 40)
+
+# 重播模式的進度列
+REPLAY_BAR_RECT = pygame.Rect(10, SCREEN_HEIGHT - 24, SCREEN_WIDTH - 20, 12)
+REPLAY_BAR_COLOR = (50, 50, 60)
+REPLAY_PROGRESS_COLOR = (150, 150, 180)
+
+# 效能資訊的位置、背景與更新間隔 (幀)
+PROFILER_OVERLAY_POSITION = (10, 110)
+PROFILER_OVERLAY_COLOR = (0, 0, 0, 160)
+PROFILER_OVERLAY_REFRESH = 15
+
+# 面板的透明色: 按鈕和文字不會使用這個顏色
+PANEL_COLORKEY = (0, 0, 0)
+# 文字快取的上限，超過時整個清空 (輸入框的內容會一直變)
+TEXT_CACHE_LIMIT = 256
+
+
+# --- 文字快取 ---
+class TextCache:
+    # 以 (文字, 顏色) 為 key 保存 font.render 的結果，只有文字改變時才重新 render
+    def __init__(self, font):
+        self.font = font
+        self.surfaces = {}
+
+    def render(self, text, color=BUTTON_TEXT_COLOR):
+        key = (text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            if len(self.surfaces) >= TEXT_CACHE_LIMIT:
+                self.surfaces.clear()
+            surface = self.font.render(text, True, color)
+            self.surfaces[key] = surface
+        return surface
+
+
+def button_labels(
+    ui_visible,
+    predator_active,
+    predator_can_eat,
+    mouse_mode,
+    continuous_obstacle_placement,
+    input_text,
+    predator_count=1,
+):
+    # 目前要顯示的按鈕文字，依照繪製順序排列 (切換 UI 的按鈕在最上層)
+    if not ui_visible:
+        return [(TOGGLE_UI_BUTTON_RECT, "Show UI")]
+    try:
+        num = int(input_text)
+        add_n_text = f"Remove {abs(num)} Boids" if num < 0 else f"Add {num} Boids"
+    except ValueError:
+        add_n_text = "Execute"
+    return [
+        (
+            PREDATOR_BUTTON_RECT,
+            ("Remove " if predator_active else "Add ")
+            + ("Predator" if predator_count == 1 else f"{predator_count} Predators"),
+        ),
+        (ADD_BOID_BUTTON_RECT, "+1 Boid"),
+        (REMOVE_BOID_BUTTON_RECT, "-1 Boid"),
+        (
+            EAT_MODE_BUTTON_RECT,
+            "Disable Eating" if predator_can_eat else "Enable Eating",
+        ),
+        (
+            OBSTACLE_MODE_BUTTON_RECT,
+            "Mouse: Remove Obstacle"
+            if mouse_mode == "remove_obstacle"
+            else "Mouse: Add Obstacle",
+        ),
+        (
+            CONTINUOUS_PLACEMENT_BUTTON_RECT,
+            "Place: Continuous" if continuous_obstacle_placement else "Place: Single",
+        ),
+        (ADD_N_BOIDS_BUTTON_RECT, add_n_text),
+        (ADD_PREDATOR_BUTTON_RECT, "+1 Predator"),
+        (REMOVE_PREDATOR_BUTTON_RECT, "-1 Predator"),
+        (TOGGLE_UI_BUTTON_RECT, "Hide UI"),
+    ]
+
+
+# --- 按鈕面板 ---
+class UIPanel:
+    # 所有按鈕預先畫在同一張面板上，每幀只貼一次；
+    # 只有按鈕文字或輸入框改變時才重畫面板，滑鼠懸停的按鈕另外畫在上面。
+    def __init__(self, font):
+        self.text_cache = TextCache(font)
+        self.panel = None
+        self.panel_key = None
+
+    def draw_button(self, surface, rect, text, color):
+        pygame.draw.rect(surface, color, rect, border_radius=5)
+        label = self.text_cache.render(text)
+        surface.blit(label, label.get_rect(center=rect.center))
+
+    def compose(self, labels, ui_visible, input_text, input_active):
+        panel = pygame.Surface((SCREEN_WIDTH, INPUT_BOX_RECT.bottom))
+        panel.fill(PANEL_COLORKEY)
+        panel.set_colorkey(PANEL_COLORKEY, pygame.RLEACCEL)
+        for rect, text in labels:
+            self.draw_button(panel, rect, text, BUTTON_COLOR)
+        if ui_visible:
+            # 輸入框
+            input_box_color = (
+                INPUT_BOX_ACTIVE_COLOR if input_active else INPUT_BOX_COLOR
+            )
+            pygame.draw.rect(panel, input_box_color, INPUT_BOX_RECT, border_radius=5)
+            panel.blit(
+                self.text_cache.render(input_text),
+                (INPUT_BOX_RECT.x + 10, INPUT_BOX_RECT.y + 10),
+            )
+        return panel
+
+    def draw(
+        self,
+        screen,
+        mouse_pos,
+        ui_visible,
+        predator_active,
+        predator_can_eat,
+        mouse_mode,
+        continuous_obstacle_placement,
+        input_text,
+        input_active,
+        predator_count=1,
+    ):
+        labels = button_labels(
+            ui_visible,
+            predator_active,
+            predator_can_eat,
+            mouse_mode,
+            continuous_obstacle_placement,
+            input_text,
+            predator_count,
+        )
+        key = (tuple(text for _, text in labels), input_text, input_active)
+        if key != self.panel_key:
+            self.panel = self.compose(labels, ui_visible, input_text, input_active)
+            self.panel_key = key
+        screen.blit(self.panel, (0, 0))
+
+        # 只重畫滑鼠懸停的按鈕
+        for rect, text in labels:
+            if rect.collidepoint(mouse_pos):
+                self.draw_button(screen, rect, text, BUTTON_HOVER_COLOR)
+                break
+
+
+# --- 重播狀態 ---
+def draw_replay_status(screen, text_cache, index, count, speed, playing, frame):
+    # 畫面下方的進度列與目前的播放狀態
+    pygame.draw.rect(screen, REPLAY_BAR_COLOR, REPLAY_BAR_RECT, border_radius=3)
+    progress = REPLAY_BAR_RECT.copy()
+    progress.width = round(REPLAY_BAR_RECT.width * (index + 1) / count)
+    pygame.draw.rect(screen, REPLAY_PROGRESS_COLOR, progress, border_radius=3)
+    status = f"frame {frame}  ({index + 1}/{count})  x{speed}"
+    if not playing:
+        status += "  paused"
+    screen.blit(
+        text_cache.render(status),
+        (REPLAY_BAR_RECT.x, REPLAY_BAR_RECT.y - FONT_SIZE),
+    )
+
+
+def replay_seek_index(mouse_pos, count):
+    # 點在進度列上的位置對應到第幾筆紀錄，不在進度列上時回傳 None
+    if not REPLAY_BAR_RECT.collidepoint(mouse_pos):
+        return None
+    fraction = (mouse_pos[0] - REPLAY_BAR_RECT.x) / REPLAY_BAR_RECT.width
+    return min(int(fraction * count), count - 1)
+
+
+# --- 效能資訊 ---
+class ProfilerOverlay:
+    # 顯示各階段最近幾幀的平均耗時與計數器；
+    # 數字每 PROFILER_OVERLAY_REFRESH 幀才重新 render 一次
+    def __init__(self, font):
+        self.font = font
+        self.surface = None
+        self.frames = 0
+
+    def compose(self, averages):
+        lines = [
+            f"{name[:-3]:<20} {value:7.2f} ms"
+            if name.endswith("_ms")
+            else f"{name:<20} {value:10.0f}"
+            for name, value in averages.items()
+        ] or ["collecting..."]
+        labels = [self.font.render(line, True, BUTTON_TEXT_COLOR) for line in lines]
+        width = max(label.get_width() for label in labels) + 20
+        height = sum(label.get_height() for label in labels) + 20
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill(PROFILER_OVERLAY_COLOR)
+        y = 10
+        for label in labels:
+            surface.blit(label, (10, y))
+            y += label.get_height()
+        return surface
+
+    def draw(self, screen, profiler):
+        if self.surface is None or self.frames % PROFILER_OVERLAY_REFRESH == 0:
+            self.surface = self.compose(profiler.averages())
+        self.frames += 1
+        screen.blit(self.surface, PROFILER_OVERLAY_POSITION)
@@ -0,0 +1,122 @@
+import numpy as np
+
+from numpy_flock import neighbor_pairs
+from profiling import PROFILER
+from simulation import MAX_SPEED, VISUAL_RANGE
+
+# 候選清單比視野多出的距離。skin 越大重建越少，但每一步要檢查的候選越多
+VERLET_SKIN = 30
+
+
+def verlet_pairs(positions, cutoff):
+    # 距離小於 cutoff 的所有配對 (i, j)，每一對只出現一次
+    i, j = neighbor_pairs(positions, cutoff)
+    dx = positions[i, 0] - positions[j, 0]
+    dy = positions[i, 1] - positions[j, 1]
+    near = dx * dx + dy * dy < cutoff**2
+    return i[near], j[near]
+
+
+# --- Verlet 鄰居清單 ---
+class _Verlet:
+    # 重建時記下每個 boid 的位置 (anchors) 與距離在 visual_range + skin 內的候選。
+    # 兩個 boid 各自移動不超過 skin / 2 時，視野內的鄰居一定還在候選中，
+    # 所以只有在某個 boid 可能移動超過 skin / 2 時才需要重建。
+    # rebuilds / steps 是重建次數與總步數 (攤提後每步的成本)
+    def __init__(self, visual_range=VISUAL_RANGE, skin=VERLET_SKIN):
+        self.visual_range = visual_range
+        self.skin = skin
+        self.anchors = None
+        self.rebuilds = 0
+        self.steps = 0
+
+    @property
+    def cutoff(self):
+        return self.visual_range + self.skin
+
+    def stale(self, positions, margin=0.0):
+        # margin 是使用清單之前還會移動的距離 (非同步更新時同一步內就會移動)
+        if self.anchors is None or len(positions) != len(self.anchors):
+            return True
+        if len(positions) == 0:
+            return False
+        moved = positions - self.anchors
+        farthest = np.sqrt(np.einsum("ij,ij->i", moved, moved).max())
+        return farthest + margin > self.skin / 2
+
+    def count(self, rebuilt):
+        self.steps += 1
+        if rebuilt:
+            self.rebuilds += 1
+        if PROFILER.enabled:
+            PROFILER.set_count("verlet_rebuilds", int(rebuilt))
+
+
+class VerletList(_Verlet):
+    # 物件引擎用: 每個 boid 的候選是依索引順序的 Boid list，
+    # 取代 SpatialGrid 作為 Boid.steer 的 grid (介面為 neighbors(boid))。
+    # 篩選後的鄰居與順序都與網格查詢相同，所以結果完全一致
+    def __init__(self, visual_range=VISUAL_RANGE, skin=VERLET_SKIN):
+        super().__init__(visual_range, skin)
+        self.members = None
+        self.lists = {}
+
+    def update(self, boids, dt=1.0, synchronous=False):
+        # 每一步開始時呼叫；boids 增減或順序改變時也會重建
+        positions = np.array([(b.position.x, b.position.y) for b in boids])
+        positions = positions.reshape(-1, 2)
+        margin = 0.0 if synchronous else MAX_SPEED * dt
+        rebuilt = self.members != boids or self.stale(positions, margin)
+        if rebuilt:
+            self.rebuild(boids, positions)
+        self.count(rebuilt)
+
+    def rebuild(self, boids, positions):
+        i, j = verlet_pairs(positions, self.cutoff)
+        receivers = np.concatenate([i, j])
+        others = np.concatenate([j, i])
+        order = np.lexsort((others, receivers))
+        counts = np.bincount(receivers, minlength=len(boids)).tolist()
+        flat = [boids[index] for index in others[order].tolist()]
+        lists = []
+        start = 0
+        for count in counts:
+            lists.append(flat[start : start + count])
+            start += count
+        self.lists = dict(zip(boids, lists))
+        self.members = list(boids)
+        self.anchors = positions
+
+    def neighbors(self, boid):
+        return self.lists[boid]
+
+    def sample_neighbors(self, boid, count, rng):
+        # 與 SpatialGrid.sample_neighbors 相同的介面，保持清單中的順序
+        candidates = self.lists[boid]
+        if len(candidates) <= count:
+            return candidates
+        picked = sorted(rng.sample(range(len(candidates)), count))
+        return [candidates[index] for index in picked]
+
+
+class VerletPairs(_Verlet):
+    # NumPy 引擎用: 快取所有候選配對 (i, j)，每一步只計算這些配對的距離。
+    # 配對的順序與 neighbor_pairs 不同，加總的結果只在浮點誤差內相同
+    def __init__(self, visual_range=VISUAL_RANGE, skin=VERLET_SKIN):
+        super().__init__(visual_range, skin)
+        self.ids = None
+        self.i = self.j = np.empty(0, dtype=np.intp)
+
+    def pairs(self, positions, ids):
+        # ids 改變 (加入或移除 boids) 時重建
+        rebuilt = (
+            self.ids is None
+            or not np.array_equal(ids, self.ids)
+            or self.stale(positions)
+        )
+        if rebuilt:
+            self.i, self.j = verlet_pairs(positions, self.cutoff)
+            self.ids = ids.copy()
+            self.anchors = positions.copy()
+        self.count(rebuilt)
+        return self.i, self.j
@@ -0,0 +1,280 @@
+import random
+
+import numpy as np
+
+from numpy_flock import NumpyFlock
+from parallel_flock import PARALLEL_WORKERS, ShardedFlock
+from profiling import PROFILER
+from simulation import (
+    BOID_COUNT,
+    DEFAULT_CONFIG,
+    MAX_SPEED,
+    SIMULATION_ENGINE,
+    SYNCHRONOUS_UPDATE,
+    USE_OBSTACLE_FIELD,
+    USE_SPATIAL_GRID,
+    USE_VERLET_LIST,
+    Boid,
+    BoidStore,
+    ObstacleField,
+    ObstacleStore,
+    Predator,
+    SpatialGrid,
+    hunt_prey,
+    prey_index,
+)
+from verlet import VerletList, VerletPairs
+
+# 物理更新頻率 (每秒步數)，與畫面幀率無關
+PHYSICS_RATE = 60
+# 每個畫面幀最多補跑的物理步數，避免運算跟不上時越積越多
+MAX_SUBSTEPS = 5
+
+
+# --- 世界狀態 (與畫面無關) ---
+class World:
+    # 保存所有 boids、捕食者與障礙物，step() 推進一幀。
+    # 不使用任何 pygame 顯示功能，可以在沒有螢幕的伺服器上執行。
+    # 所有隨機數都來自自己的 random.Random(seed)，同樣的種子一定得到同樣的結果。
+    def __init__(
+        self,
+        boid_count=BOID_COUNT,
+        engine=SIMULATION_ENGINE,
+        use_spatial_grid=USE_SPATIAL_GRID,
+        config=DEFAULT_CONFIG,
+        workers=PARALLEL_WORKERS,
+        seed=None,
+        synchronous=SYNCHRONOUS_UPDATE,
+        obstacle_field=USE_OBSTACLE_FIELD,
+        use_verlet_list=USE_VERLET_LIST,
+    ):
+        self.config = config
+        self.engine = engine
+        self.rng = random.Random(seed)
+        self.synchronous = synchronous
+        # 物件引擎的 boids (NumPy 引擎時是空的)
+        self.store = BoidStore()
+        boids = [Boid(config, self.rng) for _ in range(boid_count)]
+        self.flock = None
+        if engine == "numpy":
+            # NumPy 引擎: 所有 boids 都存放在 flock 的陣列中
+            self.flock = NumpyFlock.from_boids(boids, config)
+        elif engine == "parallel":
+            # 分區平行引擎: 與 NumPy 引擎相同的陣列，各區塊交給 workers 個執行緒
+            self.flock = ShardedFlock.from_boids(boids, config, workers)
+        else:
+            self.store.spawn(boids)
+        if self.flock is not None:
+            # "sample" 鄰居模式抽樣用 (物件引擎直接用 self.rng)
+            self.flock.rng = np.random.default_rng(seed)
+        self.predators = []
+        self.obstacles = ObstacleStore()
+        self.set_obstacle_field(obstacle_field)
+        self.use_spatial_grid = use_spatial_grid
+        self.grid = SpatialGrid(config.visual_range + MAX_SPEED)
+        self.verlet = None
+        self.set_verlet_list(use_verlet_list)
+        self.frame = 0
+
+    @property
+    def boids(self):
+        # 緊密排列的 boids list (順序不是加入順序)
+        return self.store.boids
+
+    def boid_count(self):
+        if self.flock is not None:
+            return len(self.flock)
+        return len(self.store)
+
+    def boid_ids(self):
+        # 目前所有 boids 的 ID，順序與 state() / arrays() 相同
+        if self.flock is not None:
+            return self.flock.ids.copy()
+        return np.array([boid.boid_id for boid in self.boids], dtype=np.int64)
+
+    def add_boids(self, count):
+        boids = [Boid(self.config, self.rng) for _ in range(count)]
+        if self.flock is not None:
+            self.flock.add_boids(boids)
+            return
+        self.store.spawn(boids)
+
+    def remove_oldest_boids(self, count):
+        if self.flock is not None:
+            self.flock.remove_oldest(count)
+            return
+        self.store.remove_oldest(count)
+
+    def set_boids(self, positions, velocities):
+        # 以 (N, 2) 的位置與速度取代所有 boids (讀取存檔時使用)
+        if self.flock is not None:
+            self.flock.set_state(positions, velocities)
+            return
+        self.store.clear()
+        self.store.spawn(
+            Boid.from_state(position, velocity, self.config)
+            for position, velocity in zip(
+                np.asarray(positions, dtype=float).tolist(),
+                np.asarray(velocities, dtype=float).tolist(),
+            )
+        )
+
+    def set_predators(self, count, can_eat):
+        # 增加或移除 (最後加入的) 捕食者，直到剛好 count 個
+        while len(self.predators) < count:
+            self.predators.append(Predator(self.config, self.rng))
+        del self.predators[count:]
+        for p in self.predators:
+            p.can_eat = can_eat
+
+    @property
+    def obstacle_field(self):
+        return self.obstacles.field is not None
+
+    def set_obstacle_field(self, enabled):
+        # 開啟時建立避障網格 (之後隨障礙物增減局部更新)，關閉時改回逐一計算
+        if enabled and self.obstacles.field is None:
+            ObstacleField(
+                self.obstacles, (self.config.world_width, self.config.world_height)
+            )
+        elif not enabled and self.obstacles.field is not None:
+            self.obstacles.field.close()
+
+    @property
+    def use_verlet_list(self):
+        return self.verlet is not None
+
+    def set_verlet_list(self, enabled):
+        # 物件引擎與 NumPy 引擎各有自己的清單；分區平行引擎仍然每一步重新配對
+        self.verlet = None
+        if enabled and self.flock is None:
+            self.verlet = VerletList(self.config.visual_range)
+        elif enabled and self.engine == "numpy":
+            self.verlet = VerletPairs(self.config.visual_range)
+        if self.flock is not None:
+            self.flock.verlet = self.verlet
+
+    def close(self):
+        # 釋放分區平行引擎的執行緒池 (不再使用這個 world 時呼叫)
+        if isinstance(self.flock, ShardedFlock):
+            self.flock.close()
+
+    def step(self, dt=1.0):
+        # 推進一步，回傳這一步被吃掉的 boids 數量。
+        # dt 以 1/60 秒為單位，dt = 1 時與原本每幀更新一次相同
+        eaten_count = 0
+        if self.flock is not None:
+            self.flock.step(self.predators, self.obstacles, dt)
+            with PROFILER.phase("predator_logic"):
+                eaten_count = self.flock.update_predators(
+                    self.predators, self.obstacles, dt
+                )
+        else:
+            # 每幀重建一次網格 (Verlet 清單只在需要時重建)
+            if self.verlet is not None:
+                with PROFILER.phase("grid_rebuild"):
+                    self.verlet.update(self.boids, dt, self.synchronous)
+                frame_grid = self.verlet
+            else:
+                if self.use_spatial_grid:
+                    with PROFILER.phase("grid_rebuild"):
+                        # 格子多留一步內最多移動的距離；dt > 1 (物理更新頻率低於 60)
+                        # 時先更新的 boid 會移動 MAX_SPEED * dt
+                        self.grid.cell_size = (
+                            self.config.visual_range + MAX_SPEED * max(dt, 1.0)
+                        )
+                        self.grid.rebuild(self.boids)
+                frame_grid = self.grid if self.use_spatial_grid else None
+
+            boids_to_update = self.boids
+            if self.synchronous:
+                # 先以上一步的狀態算出所有 boids 的新速度，全部算完後才一起移動
+                velocities = [
+                    boid.next_velocity(
+                        self.boids,
+                        self.predators,
+                        self.obstacles,
+                        frame_grid,
+                        dt,
+                        self.rng,
+                    )
+                    for boid in self.boids
+                ]
+                for boid, velocity in zip(self.boids, velocities):
+                    boid.move(velocity, dt)
+                boids_to_update = []
+
+            # 與原本相同的順序: 先更新所有 boids，再更新捕食者
+            for boid in boids_to_update:
+                boid.update(
+                    self.boids, self.predators, self.obstacles, frame_grid, dt, self.rng
+                )
+
+            # 被吃掉的 boids 在所有捕食者更新後才一起移除
+            # (依索引順序，結果不會因執行而不同)
+            if self.predators:
+                with PROFILER.phase("predator_logic"):
+                    prey = prey_index(self.arrays()[0], len(self.predators))
+                    eaten = hunt_prey(self.predators, prey, self.obstacles, dt)
+                boids = self.boids
+                eaten_count = self.store.cull([boids[i] for i in eaten.tolist()])
+        if PROFILER.enabled:
+            PROFILER.set_count("boids", self.boid_count())
+        self.frame += 1
+        return eaten_count
+
+    def state(self):
+        # 目前所有 boids 的 (x, y, vx, vy)
+        if self.flock is not None:
+            return [
+                (x, y, vx, vy)
+                for (x, y), (vx, vy) in zip(
+                    self.flock.positions.tolist(), self.flock.velocities.tolist()
+                )
+            ]
+        return [
+            (b.position.x, b.position.y, b.velocity.x, b.velocity.y) for b in self.boids
+        ]
+
+    def arrays(self):
+        # 目前所有 boids 的位置與速度，各為 (N, 2) 的陣列
+        if self.flock is not None:
+            return self.flock.positions.copy(), self.flock.velocities.copy()
+        positions = np.array([(b.position.x, b.position.y) for b in self.boids])
+        velocities = np.array([(b.velocity.x, b.velocity.y) for b in self.boids])
+        return positions.reshape(-1, 2), velocities.reshape(-1, 2)
+
+    def predator_arrays(self):
+        # 所有捕食者的位置 (P, 2)、速度 (P, 2) 與是否會吃 boids (P,)
+        positions = np.array([(p.position.x, p.position.y) for p in self.predators])
+        velocities = np.array([(p.velocity.x, p.velocity.y) for p in self.predators])
+        can_eat = np.array([p.can_eat for p in self.predators], dtype=bool)
+        return positions.reshape(-1, 2), velocities.reshape(-1, 2), can_eat
+
+
+# --- 固定時間步長 ---
+class FixedTimestep:
+    # 累積實際經過的時間，每滿一個物理步長就跑一步；
+    # 剩下不到一步的時間用來在兩步之間插值繪製 (alpha)。
+    def __init__(self, rate=PHYSICS_RATE, max_substeps=MAX_SUBSTEPS):
+        self.step_seconds = 1.0 / rate
+        # 傳給 World.step 的 dt，以 1/60 秒為單位
+        self.dt = 60.0 / rate
+        self.max_substeps = max_substeps
+        self.accumulator = 0.0
+
+    def advance(self, elapsed):
+        # 回傳這一幀需要跑的物理步數
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.step_seconds)
+        if steps > self.max_substeps:
+            # 跟不上時丟掉積欠的時間，讓模擬變慢而不是讓畫面卡住
+            steps = self.max_substeps
+            self.accumulator %= self.step_seconds
+        else:
+            self.accumulator -= steps * self.step_seconds
+        return steps
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.step_seconds, 1.0)